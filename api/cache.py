@@ -0,0 +1,225 @@
+"""
+Anthra Center — Tenant-scoped response cache
+
+The dashboard reads (/api/findings, /api/alerts, /api/ssp/families,
+/api/stats) run far more often than the tables change. Results are cached
+under a key built from the tenant and the query parameters, and tagged
+"<namespace>:<tenant_id>". Write paths invalidate exactly the tags they
+touch (e.g. a new alert drops "alerts:tenant-1" and "stats:tenant-1"), with
+"stats:*" standing for the cross-tenant totals. TTL bounds staleness for
+writes that bypass the API (the Go ingest service, other replicas).
+
+Misses go through SingleFlight: concurrent identical reads (a whole agency
+opening the dashboard at once) share one database computation.
+
+CACHE_BACKEND selects the backend: "memory" (per-process LRU + TTL),
+"none", or "package.module:ClassName" for a shared cache implementing
+CacheBackend in multi-worker deployments.
+"""
+
+import abc
+import asyncio
+import importlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+GLOBAL_TENANT = "*"
+
+
+def cache_key(namespace, tenant_id, **params):
+    """Stable string key: namespace, tenant and sorted query parameters."""
+    return f"{namespace}:{tenant_id or GLOBAL_TENANT}:" + json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def tenant_tag(namespace, tenant_id):
+    return f"{namespace}:{tenant_id or GLOBAL_TENANT}"
+
+
+class CacheBackend(abc.ABC):
+    """Interface for response cache backends.
+
+    Tags carry a generation number bumped by invalidate(). Callers take
+    snapshot(tags) before computing a value and pass it to set(), which
+    drops the value if any tag was invalidated meanwhile, so a write racing
+    a slow read cannot leave a stale entry behind.
+    """
+
+    @abc.abstractmethod
+    def get(self, key):
+        """Return the cached value or MISSING."""
+
+    @abc.abstractmethod
+    def snapshot(self, tags):
+        """Current generation of each tag, to pass to set()."""
+
+    @abc.abstractmethod
+    def set(self, key, value, tags, snapshot):
+        """Store value unless a tag was invalidated since snapshot."""
+
+    @abc.abstractmethod
+    def invalidate(self, *tags):
+        """Bump the generation of each tag, dropping its entries."""
+
+    @abc.abstractmethod
+    def stats(self):
+        """Counters for /api/metrics."""
+
+
+class NullCache(CacheBackend):
+    """Caching disabled: every read goes to the database."""
+
+    def __init__(self, **_options):
+        self._misses = 0
+        self._generations = {}  # still tracked so single-flight keys change on writes
+
+    def get(self, key):
+        self._misses += 1
+        return MISSING
+
+    def snapshot(self, tags):
+        return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def set(self, key, value, tags, snapshot):
+        pass
+
+    def invalidate(self, *tags):
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def stats(self):
+        return {"backend": "none", "hits": 0, "misses": self._misses}
+
+
+class MemoryCache(CacheBackend):
+    """Per-process LRU cache with a TTL on every entry."""
+
+    def __init__(self, max_entries=10000, ttl=30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, tags, value), LRU order
+        self._tagged = {}               # tag -> set of keys
+        self._generations = {}          # tag -> invalidation count
+        self._hits = self._misses = self._evictions = self._expirations = self._invalidations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return MISSING
+            if entry[0] <= now:
+                self._drop(key)
+                self._expirations += 1
+                self._misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[2]
+
+    def snapshot(self, tags):
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def set(self, key, value, tags, snapshot):
+        with self._lock:
+            if snapshot is not None and snapshot != tuple(self._generations.get(tag, 0) for tag in tags):
+                return  # invalidated while the value was being computed
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, tuple(tags), value)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in self._tagged.pop(tag, ()):
+                    if key in self._entries:
+                        self._drop(key)
+                        self._invalidations += 1
+
+    def _drop(self, key):
+        _, tags, _ = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one computation.
+
+    The first caller starts the work as a task; callers arriving while it
+    runs await the same task and get its result (or exception). A waiter
+    that disconnects does not cancel the work for the others. Nothing is
+    kept once the task finishes, so this never serves stale data: include
+    the cache snapshot in the key and a read that starts after a write
+    will not join a flight that started before it.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    async def do(self, key, compute):
+        task = self._flights.get(key)
+        if task is None:
+            self._leaders += 1
+            task = asyncio.ensure_future(compute())
+            self._flights[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self._coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every waiter went away
+
+    def stats(self):
+        return {"in_flight": len(self._flights), "leaders": self._leaders, "coalesced": self._coalesced}
+
+
+BACKENDS = {"memory": MemoryCache, "none": NullCache}
+
+
+def create_cache(name, **options):
+    """Build the backend named by CACHE_BACKEND."""
+    if ":" in name:
+        module, _, attr = name.partition(":")
+        return getattr(importlib.import_module(module), attr)(**options)
+    try:
+        return BACKENDS[name](**options)
+    except KeyError:
+        raise ValueError(f"unknown CACHE_BACKEND {name!r}; expected one of {sorted(BACKENDS)} or module:Class")
@@ -0,0 +1,200 @@
+"""
+Anthra Center — SSP control catalog and POA&M (NIST 800-53 Rev 5, FedRAMP Moderate)
+
+The catalog is static, so it is frozen once at import: controls and POA&M
+items are read-only mappings, indexed by control_id and by family, with
+family totals and compliance percentages precomputed. Handlers never write
+to it. Per-tenant finding counts are merged into fresh copies
+(with_findings), so one tenant's overlay cannot leak into another's
+response or race with a concurrent request.
+"""
+
+from types import MappingProxyType
+
+SSP_CONTROLS = [
+    # AC - Access Control
+    {"control_id": "AC-1",  "family": "AC", "title": "Policy and Procedures", "status": "Implemented", "description": "Access control policy documented in SSP Section 9. Updated annually."},
+    {"control_id": "AC-2",  "family": "AC", "title": "Account Management", "status": "Implemented", "description": "RBAC audit complete. ServiceAccounts dedicated per service. automountServiceAccountToken: false on app pods. Evidence: rbac_audit, kube_bench."},
+    {"control_id": "AC-3",  "family": "AC", "title": "Access Enforcement", "status": "Partially Implemented", "description": "Kyverno enforces non-root, drop ALL caps. PSS restricted on anthra namespace. Missing: application-level RBAC middleware. Evidence: kyverno_nonroot, polaris."},
+    {"control_id": "AC-6",  "family": "AC", "title": "Least Privilege", "status": "Partially Implemented", "description": "K8s pods run as non-root (UID 10001). Capabilities dropped. PSS restricted enforced. Missing: fine-grained RBAC roles. Evidence: kyverno_drop_caps, rbac_audit."},
+    {"control_id": "AC-7",  "family": "AC", "title": "Unsuccessful Logon Attempts", "status": "Not Implemented", "description": "No account lockout after failed attempts. No rate limiting on /api/auth/login."},
+    {"control_id": "AC-8",  "family": "AC", "title": "System Use Notification", "status": "Not Implemented", "description": "No login banner or acceptable use notice displayed before authentication."},
+    {"control_id": "AC-14", "family": "AC", "title": "Permitted Actions Without Identification", "status": "Not Implemented", "description": "All API endpoints accessible without authentication. No session management."},
+    {"control_id": "AC-17", "family": "AC", "title": "Remote Access", "status": "Partially Implemented", "description": "NetworkPolicy default-deny enforced on all namespaces. Service-aware allow rules. Missing: VPN/mTLS between services. Evidence: network_policy_check, conftest."},
+    # AU - Audit and Accountability
+    {"control_id": "AU-2",  "family": "AU", "title": "Event Logging", "status": "Partially Implemented", "description": "Falco DaemonSet on all nodes captures syscalls + K8s audit. 10 watchers run (apparmor, drift, events, network, pss, seccomp, secrets, supply-chain). Missing: application-level audit events. Evidence: falco, k8s_audit_logs."},
+    {"control_id": "AU-3",  "family": "AU", "title": "Content of Audit Records", "status": "Not Implemented", "description": "Falco captures who/what/when for syscalls. Missing: structured audit records with user identity, outcome, originating IP for application events. Evidence: none — gap."},
+    {"control_id": "AU-6",  "family": "AU", "title": "Audit Record Review", "status": "Implemented", "description": "Anthra Center dashboard provides real-time log review. Findings feed sorted by severity. NIST control mapping on each finding."},
+    {"control_id": "AU-8",  "family": "AU", "title": "Time Stamps", "status": "Implemented", "description": "All events use UTC timestamps via Python datetime.utcnow() and PostgreSQL NOW()."},
+    {"control_id": "AU-9",  "family": "AU", "title": "Protection of Audit Information", "status": "Implemented", "description": "RBAC restricts audit log access. Kube-bench validates API server audit settings. Evidence: rbac_audit, kube_bench."},
+    {"control_id": "AU-11", "family": "AU", "title": "Audit Record Retention", "status": "Not Implemented", "description": "No log retention policy. Logs lost on pod restart (ephemeral SQLite). FedRAMP requires 1-year online, 3-year archive."},
+    {"control_id": "AU-12", "family": "AU", "title": "Audit Record Generation", "status": "Not Implemented", "description": "Falco generates runtime audit events. Missing: application-level audit generation (CRUD operations, auth events). No centralized audit pipeline. Evidence: none — gap."},
+    # CA - Security Assessment
+    {"control_id": "CA-2",  "family": "CA", "title": "Control Assessments", "status": "Implemented", "description": "Automated scanning via Trivy, Kubescape, Checkov, Semgrep. Results mapped to NIST controls and displayed in Anthra Center."},
+    {"control_id": "CA-7",  "family": "CA", "title": "Continuous Monitoring", "status": "Partially Implemented", "description": "CI/CD pipeline runs security scans on push. Missing: scheduled production rescans, drift detection."},
+    # CM - Configuration Management
+    {"control_id": "CM-2",  "family": "CM", "title": "Baseline Configuration", "status": "Implemented", "description": "Kustomize base/overlays for all services. Images pinned to semver. ArgoCD syncs from git. Checkov: 785 passed, 70 failed. Evidence: kube_bench, checkov, polaris."},
+    {"control_id": "CM-3",  "family": "CM", "title": "Configuration Change Control", "status": "Implemented", "description": "ArgoCD GitOps — all changes via git PR. promote-image.sh tracks dev→staging→prod. Git history = audit trail. Evidence: argocd, git log."},
+    {"control_id": "CM-6",  "family": "CM", "title": "Configuration Settings", "status": "Partially Implemented", "description": "PSS restricted on app namespaces. Kyverno enforces resource limits, seccomp, non-root. Polaris 81/100. Missing: OS-level CIS hardening. Evidence: kube_bench, kyverno."},
+    {"control_id": "CM-7",  "family": "CM", "title": "Least Functionality", "status": "Partially Implemented", "description": "Capabilities dropped, read-only rootfs, non-root. Debug endpoint removed. Missing: 70 Checkov failures (image digest, imagePullPolicy). Evidence: checkov, conftest."},
+    {"control_id": "CM-8",  "family": "CM", "title": "System Component Inventory", "status": "Partially Implemented", "description": "Container SBOM generated by Trivy. 4 services tracked. Missing: full asset inventory with owners, classifications. Evidence: trivy_sbom."},
+    # CP - Contingency Planning
+    {"control_id": "CP-9",  "family": "CP", "title": "System Backup", "status": "Not Implemented", "description": "No automated database backups. No backup verification testing. PostgreSQL data on ephemeral volume."},
+    {"control_id": "CP-10", "family": "CP", "title": "System Recovery and Reconstitution", "status": "Partially Implemented", "description": "K8s deployments auto-restart on failure. No documented RTO/RPO. No disaster recovery runbook."},
+    # IA - Identification and Authentication
+    {"control_id": "IA-2",  "family": "IA", "title": "Identification and Authentication (Org Users)", "status": "Partially Implemented", "description": "Username/password login exists. Missing: MFA (IA-2(1)), network access (IA-2(2))."},
+    {"control_id": "IA-4",  "family": "IA", "title": "Identifier Management", "status": "Implemented", "description": "Unique user IDs assigned via auto-increment. Tenant isolation by tenant_id."},
+    {"control_id": "IA-5",  "family": "IA", "title": "Authenticator Management", "status": "Partially Implemented", "description": "Passwords hashed with bcrypt (cost 12). Missing: password complexity enforcement, credential rotation policy, MFA tokens."},
+    {"control_id": "IA-6",  "family": "IA", "title": "Authentication Feedback", "status": "Implemented", "description": "Generic 'Invalid username or password' message on failed login. No credential exposure in error responses."},
+    {"control_id": "IA-8",  "family": "IA", "title": "Identification and Authentication (Non-Org Users)", "status": "Not Implemented", "description": "No federated identity. No PIV/CAC support. Required for federal user access."},
+    # IR - Incident Response
+    {"control_id": "IR-1",  "family": "IR", "title": "Policy and Procedures", "status": "Not Implemented", "description": "No incident response plan documented. No defined roles, communication channels, or escalation paths."},
+    {"control_id": "IR-4",  "family": "IR", "title": "Incident Handling", "status": "Not Implemented", "description": "Falco detects runtime threats. Missing: automated containment, forensic capture, post-incident review, documented IRP. Evidence: none — gap."},
+    {"control_id": "IR-5",  "family": "IR", "title": "Incident Monitoring", "status": "Partially Implemented", "description": "Falco on all nodes. 10 watchers report drift, secrets, network, events. Anthra Center aggregates alerts. Missing: 24/7 automated response. Evidence: falco, jsa_infrasec."},
+    {"control_id": "IR-6",  "family": "IR", "title": "Incident Reporting", "status": "Not Implemented", "description": "No US-CERT/CISA incident reporting capability. FedRAMP requires reporting within 1 hour for significant incidents."},
+    # MP - Media Protection
+    {"control_id": "MP-2",  "family": "MP", "title": "Media Access", "status": "Not Implemented", "description": "No media access controls. S3 bucket encryption not enforced (finding: SC-28)."},
+    # PE - Physical (inherited from AWS)
+    {"control_id": "PE-1",  "family": "PE", "title": "Policy and Procedures", "status": "Inherited", "description": "Physical security controls inherited from AWS GovCloud. AWS FedRAMP High ATO covers PE family."},
+    # PL - Planning
+    {"control_id": "PL-2",  "family": "PL", "title": "System Security and Privacy Plans", "status": "Partially Implemented", "description": "SSP in progress. Appendix A findings documented. Missing: full SSP narrative, security architecture diagrams."},
+    # RA - Risk Assessment
+    {"control_id": "RA-3",  "family": "RA", "title": "Risk Assessment", "status": "Implemented", "description": "Automated risk assessment via multi-scanner pipeline. Findings ranked E through S. CVSS scores from NVD."},
+    {"control_id": "RA-5",  "family": "RA", "title": "Vulnerability Monitoring and Scanning", "status": "Implemented", "description": "Trivy (CVEs), Semgrep (SAST), Gitleaks (secrets), Kubescape (K8s), Checkov (IaC). CI/CD and on-demand scanning."},
+    # SA - System and Services Acquisition
+    {"control_id": "SA-3",  "family": "SA", "title": "System Development Life Cycle", "status": "Partially Implemented", "description": "Secure SDLC with pre-commit hooks and CI/CD gates. Missing: formal security requirements in design phase."},
+    {"control_id": "SA-4",  "family": "SA", "title": "Acquisition Process", "status": "Partially Implemented", "description": "Open-source dependencies scanned by Trivy/Grype. Missing: vendor security assessment for 3rd-party services."},
+    {"control_id": "SA-11", "family": "SA", "title": "Developer Testing and Evaluation", "status": "Implemented", "description": "14 custom Semgrep rules for FedRAMP. 8 pre-commit validators. Security pipeline with 9 jobs runs on every PR."},
+    # SC - System and Communications Protection
+    {"control_id": "SC-5",  "family": "SC", "title": "Denial of Service Protection", "status": "Implemented", "description": "K8s resource limits + LimitRange + ResourceQuota on all namespaces. Kyverno enforces resource limits on admission. Evidence: kyverno_resource_limits, polaris."},
+    {"control_id": "SC-7",  "family": "SC", "title": "Boundary Protection", "status": "Partially Implemented", "description": "NetworkPolicy default-deny on all namespaces. Service-aware allow rules (envoy→ui, envoy→api, api→db, api→ingest). 38 policies total. Missing: WAF, egress filtering. Evidence: network_policy_check."},
+    {"control_id": "SC-8",  "family": "SC", "title": "Transmission Confidentiality and Integrity", "status": "Partially Implemented", "description": "Envoy Gateway handles TLS termination. PostgreSQL sslmode=require. Missing: mTLS between services, cert-manager production certs. Evidence: checkov, conftest."},
+    {"control_id": "SC-12", "family": "SC", "title": "Cryptographic Key Establishment and Management", "status": "Not Implemented", "description": "No key management system. TLS certificates not yet provisioned. No HSM integration."},
+    {"control_id": "SC-13", "family": "SC", "title": "Cryptographic Protection", "status": "Implemented", "description": "bcrypt for passwords (cost 12). PostgreSQL SSL for data in transit. Missing: data at rest encryption for application data."},
+    {"control_id": "SC-28", "family": "SC", "title": "Protection of Information at Rest", "status": "Partially Implemented", "description": "K8s secrets base64 encoded (not encrypted). S3 bucket encryption not enforced. EBS encryption not verified."},
+    # SI - System and Information Integrity
+    {"control_id": "SI-2",  "family": "SI", "title": "Flaw Remediation", "status": "Implemented", "description": "CVE scanning via Trivy on every build. CI/CD blocks on CRITICAL/HIGH. Dependency updates tracked in findings."},
+    {"control_id": "SI-3",  "family": "SI", "title": "Malicious Code Protection", "status": "Partially Implemented", "description": "Falcon EDR on cluster nodes. Container image scanning. Missing: runtime file integrity monitoring."},
+    {"control_id": "SI-4",  "family": "SI", "title": "System Monitoring", "status": "Implemented", "description": "CrowdStrike Falcon for runtime threat detection. MITRE ATT&CK mapped. Alerts surfaced in Anthra Center dashboard."},
+    {"control_id": "SI-5",  "family": "SI", "title": "Security Alerts, Advisories, and Directives", "status": "Partially Implemented", "description": "NVD CVE data consumed via Trivy. Missing: US-CERT advisory integration, BOD compliance tracking."},
+    {"control_id": "SI-10", "family": "SI", "title": "Information Input Validation", "status": "Not Implemented", "description": "XSS vulnerability in search (dangerouslySetInnerHTML). No server-side input sanitization on log messages."},
+    {"control_id": "SI-11", "family": "SI", "title": "Error Handling", "status": "Implemented", "description": "Global exception handler returns generic errors. Stack traces logged internally only."},
+]
+
+POAM_ITEMS = [
+    # CRITICAL (3)
+    {"id": 1,  "control": "AC-14", "weakness": "All API endpoints accessible without authentication", "severity": "CRITICAL", "scheduled": "2026-03-25", "status": "In Progress", "milestone": "Deploy JWT middleware with RBAC enforcement"},
+    {"id": 2,  "control": "IA-5",  "weakness": "14 exposed API keys in findings JSON and secret.yaml (B-rank, human review)", "severity": "CRITICAL", "scheduled": "2026-03-20", "status": "Open", "milestone": "Rotate all exposed keys, migrate to AWS Secrets Manager via ExternalSecrets"},
+    {"id": 3,  "control": "IA-2",  "weakness": "No multi-factor authentication for federal users", "severity": "CRITICAL", "scheduled": "2026-03-30", "status": "In Progress", "milestone": "Integrate TOTP/WebAuthn for privileged users, Login.gov for federal SSO"},
+    # HIGH (14) — from real gap analysis
+    {"id": 4,  "control": "AC-3",  "weakness": "Application-level RBAC middleware not implemented", "severity": "HIGH", "scheduled": "2026-04-01", "status": "Planned", "milestone": "JWT + role-based route guards on all API endpoints"},
+    {"id": 5,  "control": "AC-6",  "weakness": "Fine-grained K8s RBAC roles not scoped per service", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Dedicated ClusterRoles per agent, remove wildcard permissions"},
+    {"id": 6,  "control": "AU-3",  "weakness": "No structured audit records (who/what/when/where/outcome)", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Implement structured audit logging with user identity, IP, outcome fields"},
+    {"id": 7,  "control": "AU-12", "weakness": "No application-level audit record generation", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Emit audit events for CRUD operations, auth events, privilege changes"},
+    {"id": 8,  "control": "CM-6",  "weakness": "70 Checkov failures (image digest, imagePullPolicy, secrets-as-files)", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Pin images to digest, set imagePullPolicy:Always, mount secrets as files"},
+    {"id": 9,  "control": "CM-7",  "weakness": "70 Checkov IaC failures: image digest pinning (8), SA token mounts (4)", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Apply Checkov remediation templates from GP-Copilot fixer-scripts"},
+    {"id": 10, "control": "IR-4",  "weakness": "No incident handling capability — no IRP, no containment, no forensics", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Document IRP with CISA reporting, deploy 03-DEPLOY-RUNTIME responders"},
+    {"id": 11, "control": "RA-5",  "weakness": "Trivy image scan not run on production images", "severity": "HIGH", "scheduled": "2026-03-25", "status": "Open", "milestone": "Run Trivy image scan on all 4 Anthra container images, add to CI gate"},
+    {"id": 12, "control": "SA-10", "weakness": "No formal security requirements in design phase", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Add threat modeling to SDLC, document in SSP Section 13"},
+    {"id": 13, "control": "SA-11", "weakness": "14 custom Semgrep rules deployed but coverage gaps remain", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Expand Semgrep rules to cover Go and React, add to pre-commit hooks"},
+    {"id": 14, "control": "SC-7",  "weakness": "No WAF or egress filtering beyond NetworkPolicy", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Deploy AWS WAF on ALB, add egress NetworkPolicy for external APIs only"},
+    {"id": 15, "control": "SC-8",  "weakness": "No mTLS between services, production TLS via cert-manager pending", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Deploy cert-manager, enforce TLS 1.2+, evaluate Istio mTLS"},
+    {"id": 16, "control": "SC-28", "weakness": "K8s secrets base64 only, S3/EBS encryption not verified", "severity": "HIGH", "scheduled": "2026-04-01", "status": "Planned", "milestone": "Enable EBS encryption, S3 SSE-KMS, ExternalSecrets for K8s"},
+    {"id": 17, "control": "SI-2",  "weakness": "CVE scanning CI gate exists but Trivy image scan empty", "severity": "HIGH", "scheduled": "2026-03-25", "status": "Open", "milestone": "Run Trivy image scan, fix CRITICAL/HIGH CVEs, block in CI"},
+    # MEDIUM (4)
+    {"id": 18, "control": "AC-17", "weakness": "No VPN or mTLS required for API access", "severity": "MEDIUM", "scheduled": "2026-05-01", "status": "Planned", "milestone": "Evaluate VPN gateway or Cloudflare Access for API protection"},
+    {"id": 19, "control": "CM-8",  "weakness": "Container SBOM exists but no full asset inventory with owners", "severity": "MEDIUM", "scheduled": "2026-05-01", "status": "Planned", "milestone": "Complete asset inventory in Backstage catalog with ownership and classification"},
+    {"id": 20, "control": "IR-5",  "weakness": "Falco monitoring active but no 24/7 automated response", "severity": "MEDIUM", "scheduled": "2026-04-15", "status": "In Progress", "milestone": "Enable jsa-infrasec autonomous agent for E/D rank auto-remediation"},
+    {"id": 21, "control": "SI-10", "weakness": "XSS vulnerability in search component (dangerouslySetInnerHTML)", "severity": "MEDIUM", "scheduled": "2026-03-20", "status": "Open", "milestone": "Replace dangerouslySetInnerHTML with DOMPurify sanitized rendering"},
+]
+
+FAMILY_NAMES = MappingProxyType({
+    "AC": "Access Control", "AU": "Audit and Accountability", "AT": "Awareness and Training",
+    "CA": "Security Assessment and Authorization", "CM": "Configuration Management",
+    "CP": "Contingency Planning", "IA": "Identification and Authentication",
+    "IR": "Incident Response", "MA": "Maintenance", "MP": "Media Protection",
+    "PE": "Physical and Environmental Protection", "PL": "Planning",
+    "PM": "Program Management", "PS": "Personnel Security", "RA": "Risk Assessment",
+    "SA": "System and Services Acquisition", "SC": "System and Communications Protection",
+    "SI": "System and Information Integrity",
+})
+
+_STATUS_KEYS = {
+    "Implemented": "implemented",
+    "Partially Implemented": "partial",
+    "Inherited": "inherited",
+}
+
+
+def _compliance_pct(implemented, inherited, total):
+    return round((implemented + inherited) / total * 100) if total else 0
+
+
+def _tally(controls):
+    counts = {"implemented": 0, "partial": 0, "not_implemented": 0, "inherited": 0}
+    for ctrl in controls:
+        counts[_STATUS_KEYS.get(ctrl["status"], "not_implemented")] += 1
+    return counts
+
+
+class Catalog:
+    """Read-only view over the SSP controls and POA&M items."""
+
+    def __init__(self, controls, poam_items):
+        self.controls = tuple(MappingProxyType(dict(c)) for c in controls)
+        self.poam_items = tuple(MappingProxyType(dict(i)) for i in poam_items)
+        self.by_id = MappingProxyType({c["control_id"]: c for c in self.controls})
+
+        grouped = {}
+        for ctrl in self.controls:
+            grouped.setdefault(ctrl["family"], []).append(ctrl)
+        self.by_family = MappingProxyType({fam: tuple(grouped[fam]) for fam in sorted(grouped)})
+
+        families = {}
+        for fam, members in self.by_family.items():
+            counts = _tally(members)
+            families[fam] = MappingProxyType({
+                "family": fam,
+                "name": FAMILY_NAMES.get(fam, fam),
+                "total_controls": len(members),
+                **counts,
+                "open_findings": 0,
+                "compliance_pct": _compliance_pct(counts["implemented"], counts["inherited"], len(members)),
+                "controls": members,
+            })
+        self.families = MappingProxyType(families)
+
+        counts = _tally(self.controls)
+        self.compliance_summary = MappingProxyType({
+            "total_controls": len(self.controls),
+            **counts,
+            "compliance_pct": _compliance_pct(counts["implemented"], counts["inherited"], len(self.controls)),
+        })
+        self.poam_summary = MappingProxyType({
+            "total": len(self.poam_items),
+            "open": sum(1 for i in self.poam_items if i["status"] == "Open"),
+            "in_progress": sum(1 for i in self.poam_items if i["status"] == "In Progress"),
+            "planned": sum(1 for i in self.poam_items if i["status"] == "Planned"),
+            "critical": sum(1 for i in self.poam_items if i["severity"] == "CRITICAL"),
+            "high": sum(1 for i in self.poam_items if i["severity"] == "HIGH"),
+        })
+
+    def control(self, control_id):
+        """Look up a control by id (case-insensitive); None if unknown."""
+        return self.by_id.get(control_id.upper())
+
+    def family(self, family):
+        """Precomputed summary for one family (case-insensitive); None if unknown."""
+        return self.families.get(family.upper())
+
+    @staticmethod
+    def control_with_findings(ctrl, finding_counts):
+        return {**ctrl, "open_findings": finding_counts.get(ctrl["control_id"], 0)}
+
+    def with_findings(self, summary, finding_counts):
+        """Copy of a family summary with a tenant's open-finding counts merged in."""
+        controls = [self.control_with_findings(c, finding_counts) for c in summary["controls"]]
+        return {**summary, "controls": controls, "open_findings": sum(c["open_findings"] for c in controls)}
+
+
+CATALOG = Catalog(SSP_CONTROLS, POAM_ITEMS)
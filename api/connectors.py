@@ -0,0 +1,295 @@
+"""
+Anthra Center — Vendor connector poller (NIST RA-5, SI-4, CA-7)
+
+Connected vendors are polled for new findings every VENDOR_POLL_INTERVAL
+seconds over one shared httpx.AsyncClient, so connections to each vendor API
+stay open (keep-alive) between pages and cycles. Concurrency is capped
+globally (VENDOR_POLL_CONCURRENCY) and per API host (VENDOR_POLL_PER_HOST),
+since many tenants' Falcon connectors all hit the same vendor endpoint, and
+a vendor whose previous poll is still running is skipped.
+
+Connector contract — GET <api_endpoint>/findings with a Bearer api_key:
+
+    ?since=<watermark>&limit=<page size>[&cursor=<next_cursor>]
+    -> {"findings": [...], "next_cursor": "...", "watermark": "..."}
+
+Items come oldest first (a bare JSON list is accepted too) and are mapped
+into the findings schema by map_finding(), which understands each vendor's
+native field names. The watermark (the response's, else the newest item
+timestamp) is stored in vendors.poll_watermark in the same transaction as
+the findings, so a failed poll re-fetches rather than skips.
+
+For local testing, scripts/stub_vendor.py serves this contract.
+"""
+
+import asyncio
+from datetime import datetime
+from urllib.parse import urlsplit
+
+import httpx
+
+from findings import UPSERT_COLUMNS
+
+FINDINGS_PATH = "/findings"
+
+# Columns filled by map_finding(): everything upserted except tenant_id, which the caller adds
+POLLED_FINDING_COLUMNS = UPSERT_COLUMNS[1:]
+
+# vendor_type -> (finding_type, asset_type, nist_control) when the payload doesn't say
+VENDOR_DEFAULTS = {
+    "falcon": ("RUNTIME_DETECTION", "container", "SI-4"),
+    "trivy": ("VULNERABILITY", "package", "SI-2"),
+    "kubescape": ("MISCONFIGURATION", "pod", "CM-6"),
+    "checkov": ("MISCONFIGURATION", "resource", "CM-6"),
+    "gitleaks": ("SECRET_EXPOSURE", "file", "IA-5"),
+    "semgrep": ("VULNERABILITY", "file", "SI-10"),
+}
+
+# Native field names per vendor, tried before the findings column name itself.
+# Dotted names reach into nested objects.
+VENDOR_FIELDS = {
+    "falcon": {
+        "severity": ("max_severity_displayname", "severity_name"),
+        "title": ("display_name", "scenario"),
+        "asset_id": ("device.hostname", "hostname"),
+        "mitre_tactic": ("tactic",),
+        "mitre_technique": ("technique_id",),
+        "timestamp": ("updated_timestamp", "created_timestamp"),
+    },
+    "trivy": {
+        "severity": ("Severity",),
+        "title": ("Title", "VulnerabilityID"),
+        "description": ("Description",),
+        "cve_id": ("VulnerabilityID",),
+        "asset_id": ("PkgName", "Target"),
+        "timestamp": ("LastModifiedDate", "PublishedDate"),
+    },
+    "kubescape": {
+        "title": ("controlName", "name"),
+        "asset_id": ("resourceID", "resource.name"),
+        "remediation": ("remediation", "fixPath"),
+    },
+    "checkov": {
+        "title": ("check_name",),
+        "asset_id": ("resource",),
+        "remediation": ("guideline",),
+    },
+    "gitleaks": {
+        "title": ("Description", "RuleID"),
+        "asset_id": ("File",),
+        "timestamp": ("Date",),
+    },
+    "semgrep": {
+        "severity": ("extra.severity",),
+        "title": ("check_id",),
+        "description": ("extra.message",),
+        "asset_id": ("path",),
+    },
+}
+
+TIMESTAMP_FIELDS = ("updated_at", "created_at", "timestamp")
+
+SEVERITIES = {
+    "CRITICAL": "CRITICAL", "HIGH": "HIGH", "MEDIUM": "MEDIUM", "LOW": "LOW",
+    "MODERATE": "MEDIUM", "ERROR": "HIGH", "WARNING": "MEDIUM",
+    "INFO": "LOW", "INFORMATIONAL": "LOW", "UNKNOWN": "LOW",
+}
+
+# Default automation rank by severity (see RANK_LABELS in the dashboard)
+SEVERITY_RANKS = {"CRITICAL": "B", "HIGH": "C", "MEDIUM": "D", "LOW": "E"}
+
+_ITEM_KEYS = ("findings", "resources", "results", "items", "data")
+
+
+def _lookup(item, name):
+    value = item
+    for part in name.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _field(item, vendor_type, column):
+    for name in VENDOR_FIELDS.get(vendor_type, {}).get(column, ()) + (column,):
+        value = _lookup(item, name)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def item_timestamp(vendor_type, item):
+    for name in VENDOR_FIELDS.get(vendor_type, {}).get("timestamp", ()) + TIMESTAMP_FIELDS:
+        value = _lookup(item, name)
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def map_finding(vendor_type, item):
+    """Map one vendor payload item to a POLLED_FINDING_COLUMNS tuple (None if unusable)."""
+    if not isinstance(item, dict):
+        return None
+    title = _field(item, vendor_type, "title")
+    if title is None:
+        return None
+    finding_type, asset_type, nist_control = VENDOR_DEFAULTS.get(vendor_type, ("VULNERABILITY", None, "RA-5"))
+    severity = SEVERITIES.get(str(_field(item, vendor_type, "severity") or "").upper(), "MEDIUM")
+    cve_id = _field(item, vendor_type, "cve_id")
+    if cve_id is None and str(title).startswith("CVE-"):
+        cve_id = str(title).split(":")[0]
+    values = {
+        "source": vendor_type,
+        "finding_type": _field(item, vendor_type, "finding_type") or finding_type,
+        "severity": severity,
+        "title": str(title),
+        "description": _field(item, vendor_type, "description"),
+        "asset_type": _field(item, vendor_type, "asset_type") or asset_type,
+        "asset_id": _field(item, vendor_type, "asset_id"),
+        "namespace": _field(item, vendor_type, "namespace") or "default",
+        "cve_id": cve_id,
+        "mitre_tactic": _field(item, vendor_type, "mitre_tactic"),
+        "mitre_technique": _field(item, vendor_type, "mitre_technique"),
+        "remediation": _field(item, vendor_type, "remediation"),
+        "nist_control": _field(item, vendor_type, "nist_control") or nist_control,
+        "rank": _field(item, vendor_type, "rank") or SEVERITY_RANKS[severity],
+        "status": "open",
+    }
+    return tuple(None if values[c] is None else str(values[c]) for c in POLLED_FINDING_COLUMNS)
+
+
+def _page_items(payload):
+    if isinstance(payload, list):
+        return payload, None, None
+    if not isinstance(payload, dict):
+        raise ValueError("connector response is not a JSON object or list")
+    items = next((payload[k] for k in _ITEM_KEYS if isinstance(payload.get(k), list)), [])
+    return items, payload.get("next_cursor") or payload.get("next"), payload.get("watermark")
+
+
+class VendorPoller:
+    """Periodically pull findings from every connected vendor.
+
+    load_vendors() -> list of vendor dicts (id, tenant_id, name, vendor_type,
+    api_endpoint, api_key, poll_watermark) and save(vendor, findings,
+    watermark) are coroutines supplied by the API. client_options go to
+    httpx.AsyncClient, e.g. transport= for a stub.
+    """
+
+    def __init__(self, load_vendors, save, interval=300.0, concurrency=8, per_host=2,
+                 timeout=30.0, page_size=500, max_pages=20, **client_options):
+        self._load_vendors = load_vendors
+        self._save = save
+        self.interval = interval
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._client_options = client_options
+        self._client = None
+        self._global = None
+        self._hosts = {}        # api host -> Semaphore(per_host)
+        self._active = set()    # vendor ids with a poll in progress
+        self._counters = {"cycles": 0, "polls": 0, "findings": 0, "errors": 0, "skipped": 0, "last_cycle": None}
+
+    def _http(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+                headers={"Accept": "application/json", "User-Agent": "anthra-center/2.0"},
+                **self._client_options,
+            )
+            self._global = asyncio.Semaphore(self.concurrency)
+            self._hosts = {}
+        return self._client
+
+    async def run(self):
+        """Poll forever, one cycle every `interval` seconds; cancel to stop."""
+        try:
+            while True:
+                try:
+                    await self.poll_all()
+                except Exception as exc:
+                    print(f"ERROR: vendor poll cycle failed: {exc}")
+                await asyncio.sleep(self.interval)
+        finally:
+            await self.aclose()
+
+    async def poll_all(self):
+        self._http()
+        vendors = await self._load_vendors()
+        await asyncio.gather(*(self._poll_guarded(vendor) for vendor in vendors))
+        self._counters["cycles"] += 1
+        self._counters["last_cycle"] = datetime.utcnow().isoformat()
+
+    async def _poll_guarded(self, vendor):
+        if vendor["id"] in self._active:
+            self._counters["skipped"] += 1
+            return
+        self._active.add(vendor["id"])
+        host = urlsplit(vendor["api_endpoint"]).netloc
+        limit = self._hosts.setdefault(host, asyncio.Semaphore(self.per_host))
+        try:
+            # Host slot first: vendors queued on one busy host must not hold global slots
+            # that other hosts could use
+            async with limit, self._global:
+                await self.poll_vendor(vendor)
+        except Exception as exc:
+            # Any failure (HTTP, bad payload, a save that hit the database) is this vendor's
+            # alone: it must not abort gather() and the rest of the cycle with it.
+            # Never log the request itself: it carries the vendor's API key
+            self._counters["errors"] += 1
+            print(f"WARN: poll of vendor {vendor['id']} ({vendor['vendor_type']} @ {host}) failed: "
+                  f"{type(exc).__name__}: {exc}")
+        finally:
+            self._active.discard(vendor["id"])
+
+    async def poll_vendor(self, vendor):
+        """Fetch everything newer than the vendor's watermark and save it; returns findings saved."""
+        client = self._http()
+        url = vendor["api_endpoint"].rstrip("/") + FINDINGS_PATH
+        headers = {"Authorization": f"Bearer {vendor['api_key']}"} if vendor.get("api_key") else {}
+        since = vendor.get("poll_watermark")
+        watermark, cursor, findings = since, None, []
+
+        for _ in range(self.max_pages):
+            params = {"limit": self.page_size}
+            if since:
+                params["since"] = since
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get(url, params=params, headers=headers)
+            response.raise_for_status()
+            items, cursor, page_watermark = _page_items(response.json())
+            for item in items:
+                mapped = map_finding(vendor["vendor_type"], item)
+                if mapped is not None:
+                    findings.append(mapped)
+                stamp = item_timestamp(vendor["vendor_type"], item) if isinstance(item, dict) else None
+                if stamp and (watermark is None or stamp > watermark):
+                    watermark = stamp
+            if page_watermark:
+                watermark = str(page_watermark)
+            if not cursor:
+                break
+
+        await self._save(vendor, findings, watermark)
+        self._counters["polls"] += 1
+        self._counters["findings"] += len(findings)
+        return len(findings)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self):
+        return {
+            **self._counters,
+            "interval_seconds": self.interval,
+            "concurrency": self.concurrency,
+            "per_host": self.per_host,
+            "in_flight": len(self._active),
+        }
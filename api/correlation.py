@@ -0,0 +1,272 @@
+"""
+Anthra Center — Streaming log correlation (NIST SI-4, AC-7, IR-4)
+
+Every log written through POST /api/logs or /api/logs/bulk is fed to a
+CorrelationEngine after it commits. Rules keep small per-(rule, tenant, key)
+state in memory, so matching never re-reads the logs table; when a rule
+fires, the API stores an alert with source "correlation".
+
+Rule types:
+    threshold       `count` matches within a fixed window that starts at the
+                    first match (fires once per window)
+    sliding_window  `count` matches within the trailing `window` seconds
+                    (re-arms after firing)
+    sequence        `steps` matched in order, each `count` times, within
+                    `window` seconds of the first
+
+Rules are plain dicts (DEFAULT_RULES, or a JSON list in
+CORRELATION_RULES_FILE). `match` filters on level, source and a message
+regex; `group_by` names a regex group (e.g. ip) or a log field to key the
+state by. State is per process and bounded by max_keys (LRU).
+"""
+
+import abc
+import json
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+
+_IP = r"(?P<ip>\d{1,3}(?:\.\d{1,3}){3})"
+_FAILED_LOGIN = r"(?i)\b(failed|invalid|unsuccessful)\W+(login|logon|authentication|password)\b.*?" + _IP
+
+DEFAULT_RULES = [
+    {
+        "name": "brute_force_login",
+        "type": "sliding_window",
+        "match": {"message": _FAILED_LOGIN},
+        "group_by": "ip",
+        "count": 5,
+        "window": 60,
+        "severity": "HIGH",
+        "nist_control": "AC-7",
+        "title": "Repeated failed logins from {key}",
+    },
+    {
+        "name": "login_after_failures",
+        "type": "sequence",
+        "steps": [
+            {"match": {"message": _FAILED_LOGIN}, "count": 3},
+            {"match": {"message": r"(?i)\b(successful|accepted|succeeded)\W+(login|logon|authentication|password)\b.*?" + _IP}},
+        ],
+        "group_by": "ip",
+        "window": 300,
+        "severity": "CRITICAL",
+        "nist_control": "AC-7",
+        "title": "Successful login from {key} after repeated failures",
+    },
+    {
+        "name": "runtime_detection_burst",
+        "type": "threshold",
+        "match": {"source": ["falcon"], "level": ["ERROR", "CRITICAL"], "message": r"(?i)\bdetection\b"},
+        "count": 3,
+        "window": 300,
+        "severity": "HIGH",
+        "nist_control": "SI-4",
+        "title": "Multiple runtime detections within 5 minutes",
+    },
+    {
+        "name": "error_spike",
+        "type": "threshold",
+        "match": {"level": ["ERROR", "CRITICAL"]},
+        "group_by": "source",
+        "count": 50,
+        "window": 60,
+        "severity": "MEDIUM",
+        "nist_control": "SI-4",
+        "title": "Error spike from {key}",
+    },
+]
+
+
+class Match:
+    """Event filter: level and source allow-lists plus a message regex."""
+
+    def __init__(self, level=None, source=None, message=None):
+        self.levels = {l.upper() for l in level} if level else None
+        self.sources = {s.lower() for s in source} if source else None
+        self.pattern = re.compile(message) if message else None
+
+    def __call__(self, event):
+        """Regex groups of a matching event ({} without a regex), or None."""
+        if self.levels is not None and (event["level"] or "").upper() not in self.levels:
+            return None
+        if self.sources is not None and (event["source"] or "").lower() not in self.sources:
+            return None
+        if self.pattern is None:
+            return {}
+        found = self.pattern.search(event["message"] or "")
+        return found.groupdict() if found else None
+
+
+class Rule(abc.ABC):
+    def __init__(self, name, title, count=1, window=60, group_by=None, severity="HIGH",
+                 nist_control="SI-4", match=None, **_spec):
+        self.name = name
+        self.title = title
+        self.count = int(count)
+        self.window = float(window)
+        self.group_by = group_by
+        self.severity = severity.upper()
+        self.nist_control = nist_control
+        self.match = Match(**(match or {}))
+
+    def key(self, event, groups):
+        """State key within the tenant; None when the event lacks the group_by value."""
+        if not self.group_by:
+            return "*"
+        return groups.get(self.group_by) or event.get(self.group_by)
+
+    def observe(self, event):
+        """(key, groups) if the event concerns this rule, else None."""
+        groups = self.match(event)
+        if groups is None:
+            return None
+        key = self.key(event, groups)
+        return None if key is None else (key, groups)
+
+    @abc.abstractmethod
+    def step(self, state, event, now):
+        """Advance state for a relevant event; returns (state, fired)."""
+
+
+class ThresholdRule(Rule):
+    def step(self, state, event, now):
+        if state is None or now - state[0] >= self.window:
+            state = [now, 0]
+        state[1] += 1
+        return state, state[1] == self.count
+
+
+class SlidingWindowRule(Rule):
+    def step(self, state, event, now):
+        seen = state if state is not None else deque()
+        while seen and now - seen[0] > self.window:
+            seen.popleft()
+        seen.append(now)
+        if len(seen) >= self.count:
+            seen.clear()
+            return seen, True
+        return seen, False
+
+
+class SequenceRule(Rule):
+    def __init__(self, steps=(), **spec):
+        super().__init__(**spec)
+        self.steps = [(Match(**step.get("match", {})), int(step.get("count", 1))) for step in steps]
+        self.count = len(self.steps)
+
+    def observe(self, event):
+        for matcher, _ in self.steps:
+            groups = matcher(event)
+            if groups is not None:
+                key = self.key(event, groups)
+                return None if key is None else (key, groups)
+        return None
+
+    def step(self, state, event, now):
+        # state: [started_at, step index, matches toward that step]
+        if state is None or now - state[0] > self.window:
+            state = [now, 0, 0]
+        matcher, needed = self.steps[state[1]]
+        if matcher(event) is None:
+            return state, False  # e.g. more failures while waiting for the success step
+        if state[1] == 0 and state[2] == 0:
+            state[0] = now  # the window starts at the first match, not at stray earlier events
+        state[2] += 1
+        if state[2] < needed:
+            return state, False
+        state[1], state[2] = state[1] + 1, 0
+        if state[1] == len(self.steps):
+            return None, True
+        return state, False
+
+
+RULE_TYPES = {"threshold": ThresholdRule, "sliding_window": SlidingWindowRule, "sequence": SequenceRule}
+
+
+def build_rules(specs):
+    rules = []
+    for spec in specs:
+        spec = dict(spec)
+        kind = spec.pop("type", "threshold")
+        try:
+            rules.append(RULE_TYPES[kind](**spec))
+        except KeyError:
+            raise ValueError(f"unknown correlation rule type {kind!r}; expected one of {sorted(RULE_TYPES)}")
+    names = [rule.name for rule in rules]
+    if len(names) != len(set(names)):
+        raise ValueError("correlation rule names must be unique")
+    return rules
+
+
+def load_rules(path=None):
+    """DEFAULT_RULES, or the JSON list of rule dicts at `path`."""
+    if not path:
+        return build_rules(DEFAULT_RULES)
+    with open(path) as handle:
+        return build_rules(json.load(handle))
+
+
+class CorrelationEngine:
+    """Evaluate rules against a stream of log events; thread-safe."""
+
+    def __init__(self, rules, max_keys=50000, clock=time.monotonic):
+        self.rules = list(rules)
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = OrderedDict()   # (rule name, tenant_id, key) -> rule state, LRU order
+        self._events = self._alerts = self._evictions = 0
+        self._fired = {rule.name: 0 for rule in self.rules}
+
+    def observe(self, tenant_id, level, message, source):
+        """Feed one written log; returns alert rows (tenant_id, severity, title, description, source, nist_control)."""
+        event = {"tenant_id": tenant_id, "level": level, "message": message, "source": source}
+        alerts = []
+        with self._lock:
+            now = self._clock()
+            self._events += 1
+            for rule in self.rules:
+                relevant = rule.observe(event)
+                if relevant is None:
+                    continue
+                key = (rule.name, tenant_id, relevant[0])
+                state, fired = rule.step(self._state.pop(key, None), event, now)
+                if state is not None:
+                    self._state[key] = state
+                if fired:
+                    self._fired[rule.name] += 1
+                    alerts.append(self._alert(rule, tenant_id, relevant[0]))
+            while len(self._state) > self.max_keys:
+                self._state.popitem(last=False)
+                self._evictions += 1
+            self._alerts += len(alerts)
+        return alerts
+
+    def observe_many(self, rows):
+        """observe() each (tenant_id, level, message, source) row; returns all alerts."""
+        alerts = []
+        for row in rows:
+            alerts.extend(self.observe(*row))
+        return alerts
+
+    @staticmethod
+    def _alert(rule, tenant_id, key):
+        window = f"{rule.window:g}s"
+        description = (f"Correlation rule {rule.name}: {rule.count} matching "
+                       f"{'steps' if isinstance(rule, SequenceRule) else 'events'} within {window}"
+                       + (f" for {rule.group_by} {key}." if rule.group_by else "."))
+        return (tenant_id, rule.severity, rule.title.format(key=key), description, "correlation", rule.nist_control)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rules": len(self.rules),
+                "events": self._events,
+                "alerts": self._alerts,
+                "fired": dict(self._fired),
+                "tracked_keys": len(self._state),
+                "max_keys": self.max_keys,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,679 @@
+"""
+Anthra Center — Database connection management
+
+PostgreSQL connections are served from a bounded pool with health checks on
+checkout and a wait timeout when the pool is exhausted. The SQLite demo/edge
+path reuses one connection per thread instead of reconnecting per request.
+A CircuitBreaker short-circuits to the fallback while the primary is down.
+Reads may be spread over read replicas with a ReplicaSet.
+
+Handlers keep the plain DB-API shape (get_db() ... conn.close()) and write
+queries with qmark ("?") placeholders on both backends. Blocking calls run on
+a bounded DatabaseExecutor so async handlers never stall the event loop.
+"""
+
+import asyncio
+import functools
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+
+class PoolTimeout(Exception):
+    """No pooled connection became available within the checkout timeout."""
+
+
+class PoolClosed(Exception):
+    """The pool has been shut down."""
+
+
+def _to_pyformat(sql):
+    """Rewrite qmark placeholders for psycopg2 (which uses %s)."""
+    return sql.replace("%", "%%").replace("?", "%s")
+
+
+class _PgCursor:
+    """psycopg2 cursor that accepts the qmark SQL the handlers are written in."""
+
+    def __init__(self, cur):
+        self._cur = cur
+
+    def execute(self, sql, params=None):
+        if params is None:
+            return self._cur.execute(sql)
+        return self._cur.execute(_to_pyformat(sql), params)
+
+    def executemany(self, sql, seq):
+        return self._cur.executemany(_to_pyformat(sql), seq)
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+
+class PooledConnection:
+    """Connection handed out by get_db().
+
+    close() gives the connection back to its pool (or thread slot) rather
+    than tearing down the socket. Any open transaction is rolled back first.
+    """
+
+    def __init__(self, raw, backend, release):
+        self.raw = raw
+        self.backend = backend
+        self._release = release
+        self._released = False
+
+    def cursor(self, *args, **kwargs):
+        cur = self.raw.cursor(*args, **kwargs)
+        return _PgCursor(cur) if self.backend == "postgres" else cur
+
+    def execute(self, sql, params=()):
+        cur = self.cursor()
+        cur.execute(sql, params)
+        return cur
+
+    def executemany(self, sql, seq):
+        cur = self.cursor()
+        cur.executemany(sql, seq)
+        return cur
+
+    def stream_cursor(self, itersize=1000):
+        """Cursor that streams rows instead of buffering the full result.
+
+        PostgreSQL gets a named (server-side) cursor fetching `itersize` rows
+        per round trip; sqlite3 cursors already step lazily. Note that
+        description is only populated after the first fetch on named cursors.
+        """
+        if self.backend == "postgres":
+            cur = self.raw.cursor(name=f"stream_{uuid.uuid4().hex}")
+            cur.itersize = itersize
+            return _PgCursor(cur)
+        return self.raw.cursor()
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._release(self.raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Bounded, thread-safe connection pool.
+
+    - minconn connections are opened by warm() and kept across idle periods
+    - at most maxconn connections exist at once; acquire() waits up to
+      `timeout` seconds for one to be returned, then raises PoolTimeout
+    - connections idle for longer than `check_after` seconds are verified
+      with SELECT 1 on checkout; dead ones are replaced transparently
+    """
+
+    def __init__(self, connect, minconn=1, maxconn=10, timeout=5.0,
+                 check_after=30.0, max_idle=300.0, backend="postgres"):
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError("pool requires 1 <= maxconn and minconn <= maxconn")
+        self._connect = connect
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_idle = max_idle
+        self.backend = backend
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw connection, monotonic time it was returned)
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._counters = {"checkouts": 0, "created": 0, "discarded": 0,
+                          "timeouts": 0, "wait_ms_total": 0.0}
+
+    # -- checkout -------------------------------------------------------------
+    def acquire(self, timeout=None):
+        started = time.monotonic()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        while True:
+            raw, idle_since = self._checkout(deadline)
+            if raw is None:
+                raw = self._open()
+            elif not self._healthy(raw, idle_since):
+                self._discard(raw)
+                continue
+            with self._cond:
+                self._counters["checkouts"] += 1
+                self._counters["wait_ms_total"] += (time.monotonic() - started) * 1000
+            return PooledConnection(raw, self.backend, self._put)
+
+    def _checkout(self, deadline):
+        """Reserve an idle connection or a slot for a new one (raw=None)."""
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise PoolClosed("connection pool is closed")
+                    if self._idle:
+                        return self._idle.pop()
+                    if self._size < self.maxconn:
+                        self._size += 1
+                        return None, None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"no database connection available within {self.timeout}s "
+                            f"(pool max {self.maxconn})"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+    def _open(self):
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._counters["created"] += 1
+        return raw
+
+    def _healthy(self, raw, idle_since):
+        if getattr(raw, "closed", 0):
+            return False
+        if time.monotonic() - idle_since < self.check_after:
+            return True
+        try:
+            cur = raw.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            cur.close()
+            raw.rollback()
+            return True
+        except Exception:
+            return False
+
+    # -- return ---------------------------------------------------------------
+    def _put(self, raw):
+        try:
+            if getattr(raw, "closed", 0):
+                raise ConnectionError("connection closed while checked out")
+            raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        now = time.monotonic()
+        stale = []
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                stale.append(raw)
+            else:
+                self._idle.append((raw, now))
+                # Trim connections that sat idle too long, down to minconn.
+                while (self._size > self.minconn and self._idle
+                       and now - self._idle[0][1] > self.max_idle):
+                    stale.append(self._idle.popleft()[0])
+                    self._size -= 1
+            self._cond.notify()
+        for conn in stale:
+            _quiet_close(conn)
+
+    def _discard(self, raw):
+        _quiet_close(raw)
+        with self._cond:
+            self._size -= 1
+            self._counters["discarded"] += 1
+            self._cond.notify()
+
+    # -- lifecycle ------------------------------------------------------------
+    def warm(self):
+        """Open connections until minconn are available."""
+        with self._cond:
+            missing = self.minconn - self._size
+            self._size += max(missing, 0)
+        opened = []
+        try:
+            for _ in range(max(missing, 0)):
+                opened.append(self._open())
+                missing -= 1
+        finally:
+            now = time.monotonic()
+            with self._cond:
+                self._size -= max(missing, 0)
+                self._idle.extend((conn, now) for conn in opened)
+                self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            _quiet_close(conn)
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._counters["checkouts"]
+            return {
+                "backend": self.backend,
+                "min": self.minconn,
+                "max": self.maxconn,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": checkouts,
+                "created": self._counters["created"],
+                "discarded": self._counters["discarded"],
+                "timeouts": self._counters["timeouts"],
+                "avg_wait_ms": round(self._counters["wait_ms_total"] / checkouts, 3) if checkouts else 0.0,
+            }
+
+
+class CircuitBreaker:
+    """Stops hammering an unreachable primary.
+
+    After `failure_threshold` consecutive connection failures the breaker
+    opens: allow() returns False and callers go straight to the fallback.
+    A background thread then probes the primary with exponential backoff
+    (backoff_initial .. backoff_max seconds) and closes the breaker as soon
+    as a probe succeeds. Errors are logged, never exposed in stats (SI-11).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, probe, failure_threshold=3, backoff_initial=1.0, backoff_max=60.0,
+                 on_recover=None, name="primary"):
+        self._probe = probe
+        self.failure_threshold = failure_threshold
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self._on_recover = on_recover
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._last_error = None
+        self._trips = 0
+        self._probes = 0
+
+    @property
+    def state(self):
+        return self._state
+
+    def allow(self):
+        return self._state == self.CLOSED
+
+    def record_success(self):
+        if self._failures:
+            with self._lock:
+                self._failures = 0
+
+    def record_failure(self, exc):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(exc).strip()
+            if self._state == self.OPEN or self._failures < self.failure_threshold:
+                return
+            self._open()
+
+    def trip(self, exc):
+        """Open immediately (e.g. primary unreachable at startup)."""
+        with self._lock:
+            self._last_error = str(exc).strip()
+            if self._state == self.CLOSED:
+                self._open()
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.time()
+        self._trips += 1
+        print(f"WARN: circuit breaker '{self.name}' opened: {self._last_error}")
+        threading.Thread(target=self._probe_loop, name=f"breaker-{self.name}", daemon=True).start()
+
+    def _probe_loop(self):
+        delay = self.backoff_initial
+        while not self._stop.wait(delay):
+            with self._lock:
+                self._probes += 1
+            try:
+                self._probe()
+            except Exception as exc:
+                with self._lock:
+                    self._last_error = str(exc).strip()
+                delay = min(delay * 2, self.backoff_max)
+                continue
+            with self._lock:
+                self._state = self.CLOSED
+                self._failures = 0
+                self._opened_at = None
+            print(f"INFO: circuit breaker '{self.name}' closed, primary reachable again")
+            if self._on_recover:
+                try:
+                    self._on_recover()
+                except Exception as exc:
+                    print(f"WARN: breaker '{self.name}' recovery hook failed: {exc}")
+            return
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "opened_at": datetime.fromtimestamp(self._opened_at, timezone.utc).isoformat() if self._opened_at else None,
+                "trips": self._trips,
+                "probes": self._probes,
+            }
+
+
+class ThreadLocalSQLite:
+    """One reusable SQLite connection per thread (sqlite3 objects are thread-bound).
+
+    The schema initializer runs once per process, before the first connection
+    is handed out. Every connection is opened with `pragmas` applied (WAL,
+    synchronous, cache/mmap sizing) and a busy timeout, so concurrent writers
+    wait for the lock instead of failing with "database is locked".
+    """
+
+    def __init__(self, path, initializer=None, pragmas=None, busy_timeout_ms=5000, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.pragmas = dict(pragmas or {})
+        self.busy_timeout_ms = busy_timeout_ms
+        self._initializer = initializer
+        self._initialized = False
+        self._init_lock = threading.Lock()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._checkouts = 0
+
+    def _connect(self):
+        if self.read_only:
+            # mode=ro fails on a missing file instead of creating an empty database
+            raw = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=self.busy_timeout_ms / 1000)
+        else:
+            raw = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000)
+        for name, value in self.pragmas.items():
+            raw.execute(f"PRAGMA {name} = {value}")
+        return raw
+
+    def initialize(self):
+        """Create/seed the schema once per process."""
+        with self._init_lock:
+            if self._initialized:
+                return
+            if self._initializer:
+                raw = self._connect()
+                try:
+                    self._initializer(raw)
+                finally:
+                    raw.close()
+            self._initialized = True
+
+    def acquire(self):
+        raw = getattr(self._local, "conn", None)
+        if raw is None:
+            self.initialize()
+            raw = self._connect()
+            self._local.conn = raw
+            with self._lock:
+                self._opened += 1
+        with self._lock:
+            self._checkouts += 1
+        return PooledConnection(raw, "sqlite", self._reset)
+
+    @staticmethod
+    def _reset(raw):
+        if raw.in_transaction:
+            raw.rollback()
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "sqlite", "path": self.path, "initialized": self._initialized,
+                    "pragmas": self.pragmas, "busy_timeout_ms": self.busy_timeout_ms,
+                    "connections": self._opened, "checkouts": self._checkouts}
+
+
+class Replica:
+    """One read replica: a connection source (ConnectionPool or ThreadLocalSQLite) and its breaker."""
+
+    def __init__(self, name, source, breaker, errors=(Exception,)):
+        self.name = name
+        self.source = source
+        self.breaker = breaker
+        self.errors = errors
+        self.in_flight = 0
+        self.reads = 0
+
+
+class ReplicaSet:
+    """Routes reads to healthy read replicas; writes never come here.
+
+    acquire() picks, among replicas whose breaker is closed, the one with the
+    fewest reads in flight (round-robin among ties). A replica whose checkout
+    fails counts a breaker failure and the next one is tried; an exhausted
+    pool is skipped without penalty. None means "use the primary": no
+    replica is available, or the tenant wrote within the last
+    `read_your_writes` seconds (note_write()), so a lagging replica cannot
+    hide that write from the tenant's next read.
+    """
+
+    def __init__(self, replicas, read_your_writes=0.0, clock=time.monotonic):
+        self.replicas = list(replicas)
+        self.read_your_writes = read_your_writes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._recent = {}     # tenant_id -> monotonic time its read-your-writes window ends
+        self._turn = 0
+        self._counters = {"replica_reads": 0, "primary_reads": 0, "pinned_reads": 0, "checkout_failures": 0}
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def note_write(self, tenant_id):
+        """Pin the tenant's reads to the primary for the read-your-writes window."""
+        if not self.read_your_writes or not self.replicas:
+            return
+        now = self._clock()
+        with self._lock:
+            self._recent[tenant_id] = now + self.read_your_writes
+            if len(self._recent) > 10000:
+                self._recent = {t: until for t, until in self._recent.items() if until > now}
+
+    def _pinned(self, tenant_id):
+        if tenant_id is None or not self.read_your_writes:
+            return False
+        until = self._recent.get(tenant_id)
+        return until is not None and until > self._clock()
+
+    def acquire(self, tenant_id=None):
+        """A replica connection for a read, or None to read from the primary."""
+        if self._pinned(tenant_id):
+            with self._lock:
+                self._counters["pinned_reads"] += 1
+            return None
+        with self._lock:
+            self._turn += 1
+            turn = self._turn
+            healthy = [r for r in self.replicas if r.breaker.allow()]
+            order = sorted(range(len(healthy)), key=lambda i: (healthy[i].in_flight, (i - turn) % len(healthy)))
+        for replica in (healthy[i] for i in order):
+            try:
+                conn = replica.source.acquire()
+            except PoolTimeout:
+                continue
+            except replica.errors as exc:
+                replica.breaker.record_failure(exc)
+                with self._lock:
+                    self._counters["checkout_failures"] += 1
+                continue
+            replica.breaker.record_success()
+            return self._track(replica, conn)
+        with self._lock:
+            self._counters["primary_reads"] += 1
+        return None
+
+    def _track(self, replica, conn):
+        with self._lock:
+            replica.in_flight += 1
+            replica.reads += 1
+            self._counters["replica_reads"] += 1
+
+        def release(raw):
+            try:
+                conn.close()
+            finally:
+                with self._lock:
+                    replica.in_flight -= 1
+
+        return PooledConnection(conn.raw, conn.backend, release)
+
+    def stop(self):
+        for replica in self.replicas:
+            replica.breaker.stop()
+            if hasattr(replica.source, "close"):
+                replica.source.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._counters,
+                "read_your_writes_s": self.read_your_writes,
+                "tenants_pinned": sum(1 for until in self._recent.values() if until > self._clock()),
+                "replicas": [
+                    {"name": r.name, "in_flight": r.in_flight, "reads": r.reads,
+                     "breaker": r.breaker.stats(), "pool": r.source.stats()}
+                    for r in self.replicas
+                ],
+            }
+
+
+def _quiet_close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class _StreamCancelled(Exception):
+    pass
+
+
+class _StreamFailed:
+    def __init__(self, exc):
+        self.exc = exc
+
+
+_STREAM_DONE = object()
+
+
+class DatabaseExecutor:
+    """Bounded thread pool that keeps blocking driver calls off the event loop.
+
+    Size it no larger than the connection pool so that worker threads never
+    queue on pool checkout while holding an executor slot.
+    """
+
+    def __init__(self, max_workers, thread_name_prefix="anthra-db"):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix=thread_name_prefix)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+
+    async def run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._pending += 1
+        try:
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    async def stream(self, produce, max_buffered=32):
+        """Run produce(emit) on one executor thread and yield each emitted chunk.
+
+        The whole producer runs on a single thread, which keeps thread-bound
+        SQLite connections valid for the life of a server-side cursor. At
+        most `max_buffered` chunks wait in memory; a slow client blocks the
+        producer, and a disconnected client stops it.
+        """
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue()
+        slots = threading.Semaphore(max_buffered)
+        cancelled = threading.Event()
+
+        def emit(chunk):
+            while not slots.acquire(timeout=0.5):
+                if cancelled.is_set():
+                    raise _StreamCancelled()
+            if cancelled.is_set():
+                raise _StreamCancelled()
+            loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+
+        def worker():
+            try:
+                produce(emit)
+                loop.call_soon_threadsafe(chunks.put_nowait, _STREAM_DONE)
+            except _StreamCancelled:
+                pass
+            except BaseException as exc:
+                loop.call_soon_threadsafe(chunks.put_nowait, _StreamFailed(exc))
+
+        task = asyncio.ensure_future(self.run(worker))
+        try:
+            while True:
+                item = await chunks.get()
+                if item is _STREAM_DONE:
+                    break
+                if isinstance(item, _StreamFailed):
+                    raise item.exc
+                slots.release()
+                yield item
+        finally:
+            cancelled.set()
+            await task
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.max_workers, "in_flight": self._pending,
+                    "completed": self._completed}
@@ -0,0 +1,53 @@
+"""
+Anthra Center — Streaming evidence exports (NIST AU-6, CA-7)
+
+3PAO evidence pulls stream rows from a server-side cursor to the client as
+NDJSON or CSV. Rows are encoded in small batches, so memory stays flat no
+matter how many findings or log lines the tenant has.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def parse_time_bound(value):
+    """Normalize an ISO-8601 since/until bound to naive UTC; raises ValueError if invalid."""
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return str(moment)
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_rows(rows, columns, fmt, batch_rows=500):
+    """Yield encoded chunks (bytes) of up to `batch_rows` rows each."""
+    buf = io.StringIO()
+    writer = csv.writer(buf) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+
+    pending = 0
+    for row in rows:
+        if writer:
+            writer.writerow([_plain(v) for v in row])
+        else:
+            buf.write(json.dumps({c: _plain(v) for c, v in zip(columns, row)}, separators=(",", ":")))
+            buf.write("\n")
+        pending += 1
+        if pending >= batch_rows:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
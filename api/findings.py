@@ -0,0 +1,115 @@
+"""
+Anthra Center — Finding fingerprints and upserts (NIST RA-5, SI-2)
+
+Every scan used to insert fresh rows, so re-scanning an unchanged
+environment grew the findings table and inflated /api/stats and
+/api/ssp/families. Each finding now carries a fingerprint over what makes it
+the same issue — tenant, source, finding type, CVE (or title when there is
+none) and asset — with a unique index on it. Scans and the connector poller
+write through upsert_findings(): a finding seen again bumps
+occurrence_count and last_seen, takes the scanner's latest severity and
+status, and keeps its id and first-seen created_at.
+
+Migration 008 adds the columns, backfills fingerprints, and folds existing
+duplicates into the oldest row before creating the index.
+
+Severity is also kept as an integer severity_rank (0 = CRITICAL ... 4 =
+anything else), a generated column from migration 010, so /api/findings
+reads its most-severe-first pages straight off
+(tenant_id, severity_rank, created_at DESC, id DESC).
+"""
+
+import hashlib
+
+# Most severe first; unknown severities sort after LOW
+SEVERITY_RANK = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3}
+UNRANKED = len(SEVERITY_RANK)
+# Definition of the findings.severity_rank generated column
+SEVERITY_RANK_SQL = (
+    "CASE upper(severity) "
+    + " ".join(f"WHEN '{name}' THEN {rank}" for name, rank in SEVERITY_RANK.items())
+    + f" ELSE {UNRANKED} END"
+)
+
+# Insert order for upsert_findings() rows
+UPSERT_COLUMNS = (
+    "tenant_id", "source", "finding_type", "severity", "title", "description",
+    "asset_type", "asset_id", "namespace", "cve_id", "mitre_tactic", "mitre_technique",
+    "remediation", "nist_control", "rank", "status",
+)
+
+# Refreshed from the latest sighting; everything else keeps its first-seen value
+_REFRESHED = ("severity", "description", "remediation", "status")
+
+UPSERT_SQL = (
+    f"INSERT INTO findings ({', '.join(UPSERT_COLUMNS)}, fingerprint, last_seen, occurrence_count)"
+    f" VALUES ({', '.join('?' for _ in UPSERT_COLUMNS)}, ?, CURRENT_TIMESTAMP, 1)"
+    " ON CONFLICT (fingerprint) DO UPDATE SET"
+    " last_seen = CURRENT_TIMESTAMP, occurrence_count = findings.occurrence_count + 1, "
+    + ", ".join(f"{c} = excluded.{c}" for c in _REFRESHED)
+)
+
+
+def fingerprint(tenant_id, source, finding_type, cve_id, title, asset_id):
+    """Stable identity of a finding: sha256 over tenant, source, type, CVE or title, and asset."""
+    parts = (tenant_id, source, finding_type, cve_id or title, asset_id)
+    key = "\x1f".join("" if p is None else str(p).strip() for p in parts)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def severity_rank(severity):
+    """Python side of severity_rank, e.g. for cursors and in-memory checks."""
+    return SEVERITY_RANK.get((severity or "").upper(), UNRANKED)
+
+
+def _row_fingerprint(row):
+    values = dict(zip(UPSERT_COLUMNS, row))
+    return fingerprint(values["tenant_id"], values["source"], values["finding_type"],
+                       values["cve_id"], values["title"], values["asset_id"])
+
+
+def upsert_findings(conn, rows):
+    """Insert or refresh findings (tuples in UPSERT_COLUMNS order) on a get_db() connection.
+
+    The caller commits. Returns the number of rows written.
+    """
+    conn.executemany(UPSERT_SQL, [tuple(row) + (_row_fingerprint(row),) for row in rows])
+    return len(rows)
+
+
+def backfill_fingerprints(conn, backend):
+    """Migration step: fingerprint existing rows and merge duplicates into the oldest one.
+
+    The survivor keeps its id and created_at, gets the group's total count and
+    latest created_at as last_seen, and stays open if any duplicate was open.
+    """
+    placeholder = "%s" if backend == "postgres" else "?"
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT id, tenant_id, source, finding_type, cve_id, title, asset_id, status, created_at"
+        " FROM findings ORDER BY id"
+    )
+    groups = {}  # fingerprint -> [survivor id, count, last_seen, status, duplicate ids]
+    for id_, tenant_id, source, finding_type, cve_id, title, asset_id, status, created_at in cur.fetchall():
+        key = fingerprint(tenant_id, source, finding_type, cve_id, title, asset_id)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [id_, 1, created_at, status, []]
+            continue
+        group[1] += 1
+        if created_at is not None and (group[2] is None or created_at > group[2]):
+            group[2] = created_at
+        if status == "open":
+            group[3] = "open"
+        group[4].append(id_)
+
+    cur.executemany(
+        f"DELETE FROM findings WHERE id = {placeholder}",
+        [(dup,) for group in groups.values() for dup in group[4]],
+    )
+    cur.executemany(
+        f"UPDATE findings SET fingerprint = {placeholder}, occurrence_count = {placeholder},"
+        f" last_seen = {placeholder}, status = {placeholder} WHERE id = {placeholder}",
+        [(key, count, last_seen, status, id_) for key, (id_, count, last_seen, status, _) in groups.items()],
+    )
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_findings_fingerprint ON findings (fingerprint)")
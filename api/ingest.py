@@ -0,0 +1,172 @@
+"""
+Anthra Center — Bulk log ingestion (NIST AU-2, AU-12)
+
+POST /api/logs accepts one event per request and commits it on its own, so
+forwarders pushing thousands of events a second pay a round trip and an
+fsync per event. POST /api/logs/bulk takes either
+
+- a JSON array of log objects (Content-Type: application/json), or
+- newline-delimited JSON (Content-Type: application/x-ndjson), parsed as
+  the body streams in
+
+Rows are validated as they are parsed and written in chunks of
+INGEST_CHUNK_ROWS, one transaction per chunk (execute_values on PostgreSQL,
+executemany on SQLite). Invalid rows are reported by index and never block
+the rest of the batch.
+"""
+
+import json
+import sqlite3
+
+import psycopg2
+from psycopg2.extras import execute_values
+from pydantic import ValidationError
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+LOG_INSERT_COLUMNS = ("tenant_id", "level", "message", "source")
+
+# Errors that condemn a row, not the connection; other DB errors abort the request
+_ROW_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError, sqlite3.IntegrityError)
+
+
+class BodyTooLarge(Exception):
+    """A buffered (JSON array) body exceeded the configured limit."""
+
+
+class ChunkInterrupted(Exception):
+    """A non-row error stopped insert_chunk's row-by-row retry; raised from that error.
+
+    `committed` holds the indexes of rows already committed, and `errors` the
+    rows rejected before the interruption, so the caller can still finish
+    their work (hooks, live events, correlation).
+    """
+
+    def __init__(self, committed, errors):
+        super().__init__(f"row-by-row insert interrupted after {len(committed)} committed rows")
+        self.committed = committed
+        self.errors = errors
+
+
+def is_ndjson(content_type):
+    return (content_type or "").split(";")[0].strip().lower() in NDJSON_TYPES
+
+
+async def ndjson_items(stream, max_line_bytes):
+    """Yield (index, obj | ValueError) for each non-blank line of a byte stream."""
+    buf = b""
+    index = 0
+    skipping = False  # inside an over-long line; drop bytes until its newline
+    async for chunk in stream:
+        buf += chunk
+        while True:
+            newline = buf.find(b"\n")
+            if newline < 0:
+                if len(buf) > max_line_bytes and not skipping:
+                    yield index, ValueError(f"line exceeds {max_line_bytes} bytes")
+                    index += 1
+                    skipping = True
+                if skipping:
+                    buf = b""
+                break
+            line, buf = buf[:newline], buf[newline + 1:]
+            if skipping:
+                skipping = False
+                continue
+            if len(line) > max_line_bytes:
+                yield index, ValueError(f"line exceeds {max_line_bytes} bytes")
+                index += 1
+            elif line.strip():
+                yield index, _decode(line)
+                index += 1
+    if buf.strip() and not skipping:
+        yield index, _decode(buf)
+
+
+async def json_array_items(stream, max_body_bytes):
+    """Buffer a JSON array body and yield (index, obj) for each element."""
+    body = bytearray()
+    async for chunk in stream:
+        body += chunk
+        if len(body) > max_body_bytes:
+            raise BodyTooLarge(f"body exceeds {max_body_bytes} bytes; send NDJSON to stream larger batches")
+    try:
+        items = json.loads(body)
+    except ValueError as exc:
+        raise ValueError("body is not valid JSON") from exc
+    if not isinstance(items, list):
+        raise ValueError("body must be a JSON array of log objects")
+    for index, item in enumerate(items):
+        yield index, item
+
+
+def _decode(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return ValueError("invalid JSON")
+
+
+def validate_row(model, item):
+    """Return the insert tuple for one parsed item, or raise ValueError."""
+    if isinstance(item, ValueError):
+        raise item
+    if not isinstance(item, dict):
+        raise ValueError("row must be a JSON object")
+    try:
+        entry = model(**item)
+    except ValidationError as exc:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()
+        )) from None
+    return tuple(getattr(entry, c) for c in LOG_INSERT_COLUMNS)
+
+
+def insert_chunk(conn, chunk, insert=None):
+    """Write one chunk of (index, row) pairs in a single transaction.
+
+    If the database rejects the chunk, it is retried row by row so only the
+    offending rows are reported. Returns (inserted, [(index, error)]).
+    insert(conn, rows) writes the rows; by default they are log rows. Any
+    other error during the retry raises ChunkInterrupted.
+    """
+    insert = insert or _insert_logs
+    rows = [row for _, row in chunk]
+    try:
+        insert(conn, rows)
+        conn.commit()
+        return len(rows), []
+    except _ROW_ERRORS:
+        conn.rollback()
+
+    committed, errors = [], []
+    for index, row in chunk:
+        try:
+            insert(conn, [row])
+            conn.commit()
+            committed.append(index)
+        except _ROW_ERRORS as exc:
+            conn.rollback()
+            errors.append((index, f"rejected by database ({type(exc).__name__})"))
+        except Exception as exc:
+            try:
+                conn.rollback()
+            except Exception:
+                pass  # the connection itself may be what failed
+            raise ChunkInterrupted(committed, errors) from exc
+    return len(committed), errors
+
+
+def insert_rows(conn, table, columns, rows):
+    """INSERT rows into table: one multi-row statement on PostgreSQL, executemany on SQLite."""
+    if conn.backend == "postgres":
+        # One multi-row INSERT per chunk instead of a statement per row
+        execute_values(conn.raw.cursor(), f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s",
+                       rows, page_size=len(rows))
+    else:
+        conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})", rows)
+
+
+def _insert_logs(conn, rows):
+    insert_rows(conn, "logs", LOG_INSERT_COLUMNS, rows)
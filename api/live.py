@@ -0,0 +1,221 @@
+"""
+Anthra Center — Live tail over Server-Sent Events (NIST SI-4, AU-6)
+
+GET /api/live streams a tenant's new logs, alerts and findings as they are
+written, so an open dashboard costs one publish per write instead of a
+stream of polling queries.
+
+LiveHub is an in-process fan-out:
+
+- write paths call publish(); it is safe from DB executor and scan worker
+  threads and hops onto the event loop with call_soon_threadsafe
+- each tenant keeps the last `buffer_events` events in a ring buffer, and a
+  client reconnecting with Last-Event-ID is replayed what it missed, from a
+  snapshot of the buffer rather than through its queue; if the
+  id has already left the buffer (or predates a restart) it gets a "reset"
+  event and should refetch
+- a tenant's buffer is dropped once nobody is subscribed and it has seen no
+  event for `idle_seconds`, and the least recently used unsubscribed buffers
+  go first when more than `max_tenants` are held
+- each subscriber has a bounded queue; a consumer that falls `queue_size`
+  events behind is disconnected rather than buffered without limit, and
+  resumes from the ring buffer when it reconnects
+
+Event ids are "<boot>-<sequence>", so ids from before a restart are
+recognised as stale. Sequences are per tenant, so they are gap-free within a
+tenant's stream and a missing number always means a missed event. A
+tenant's sequence starts at the hub's published count when its buffer is
+created. That count is at least every sequence the tenant had before an
+eviction, so its ids keep increasing. Multiple API workers each have their
+own hub; a subscriber sees the writes handled by its worker.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict, deque
+
+EVENT_TYPES = ("log", "alert", "finding")
+
+
+class Subscription:
+    def __init__(self, tenant_id, types, queue_size):
+        self.tenant_id = tenant_id
+        self.types = frozenset(types)
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.replay = []    # missed events, streamed ahead of the queue
+        self.dropped = False
+
+    def wants(self, event):
+        return event[1] in self.types or event[1] == "reset"
+
+    def offer(self, event):
+        """Queue an event; False if the subscriber is too far behind."""
+        if self.dropped:
+            return False
+        if not self.wants(event):
+            return True
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.dropped = True
+            # Make room for the end-of-stream marker; the client resumes via Last-Event-ID
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+
+class _Channel:
+    """One tenant's sequence and replay buffer."""
+
+    def __init__(self, seq, buffer_events, now):
+        self.seq = seq
+        self.events = deque(maxlen=buffer_events)   # (seq, type, data)
+        self.touched = now
+
+
+class LiveHub:
+    """Per-tenant fan-out of write events to SSE subscribers."""
+
+    def __init__(self, buffer_events=1000, queue_size=256, max_tenants=10000, idle_seconds=3600.0,
+                 clock=time.monotonic):
+        self.buffer_events = buffer_events
+        self.queue_size = queue_size
+        self.max_tenants = max_tenants
+        self.idle_seconds = idle_seconds
+        self.boot = os.urandom(4).hex()
+        self._clock = clock
+        self._loop = None
+        self._channels = OrderedDict()   # tenant_id -> _Channel, least recently published first
+        self._subscribers = {}           # tenant_id -> set of Subscription
+        self._published = self._dropped = self._evicted = 0
+
+    def bind(self, loop):
+        """Attach to the running event loop (lifespan startup)."""
+        self._loop = loop
+
+    def publish(self, tenant_id, event_type, items):
+        """Fan out one event per item; callable from any thread."""
+        if self._loop is None or not items or tenant_id is None:
+            return
+        items = list(items)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._publish(tenant_id, event_type, items)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._publish, tenant_id, event_type, items)
+
+    def _publish(self, tenant_id, event_type, items):
+        now = self._clock()
+        channel = self._channels.get(tenant_id)
+        if channel is None:
+            channel = self._channels[tenant_id] = _Channel(self._published, self.buffer_events, now)
+        else:
+            channel.touched = now
+            self._channels.move_to_end(tenant_id)
+        subscribers = self._subscribers.get(tenant_id, ())
+        for data in items:
+            channel.seq += 1
+            event = (channel.seq, event_type, data)
+            channel.events.append(event)
+            self._published += 1
+            for sub in list(subscribers):
+                if not sub.offer(event):
+                    self._drop(sub)
+        self._evict(now)
+
+    def _evict(self, now):
+        """Drop idle, unsubscribed tenant buffers, oldest first."""
+        excess = len(self._channels) - self.max_tenants
+        idle = []
+        for tenant_id, channel in self._channels.items():
+            if excess <= len(idle) and now - channel.touched < self.idle_seconds:
+                break
+            if tenant_id not in self._subscribers:
+                idle.append(tenant_id)
+        for tenant_id in idle:
+            del self._channels[tenant_id]
+        self._evicted += len(idle)
+
+    def _drop(self, sub):
+        subscribers = self._subscribers.get(sub.tenant_id)
+        if subscribers and sub in subscribers:
+            self.unsubscribe(sub)
+            self._dropped += 1
+
+    def event_id(self, seq):
+        return f"{self.boot}-{seq}"
+
+    def _resume_point(self, last_event_id):
+        """Sequence to replay after, or None when the id cannot be resumed from."""
+        boot, _, seq = (last_event_id or "").partition("-")
+        if boot != self.boot or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def subscribe(self, tenant_id, types=EVENT_TYPES, last_event_id=None):
+        """Register a subscriber (on the loop), replaying missed events when resuming."""
+        sub = Subscription(tenant_id, types, self.queue_size)
+        if last_event_id:
+            after = self._resume_point(last_event_id)
+            channel = self._channels.get(tenant_id)
+            # An evicted tenant's next sequence starts after the hub's published count
+            seq, buffer = (channel.seq, channel.events) if channel else (self._published, ())
+            oldest = buffer[0][0] if buffer else seq + 1
+            if after is None or after > seq or after + 1 < oldest:
+                sub.offer((seq, "reset", {"reason": "events since Last-Event-ID are no longer buffered"}))
+            else:
+                # Replayed from a snapshot in stream(), not through the bounded queue: a client
+                # up to buffer_events behind must be able to catch up
+                sub.replay = [event for event in buffer if event[0] > after and sub.wants(event)]
+        self._subscribers.setdefault(tenant_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        subscribers = self._subscribers.get(sub.tenant_id)
+        if subscribers is not None:
+            subscribers.discard(sub)
+            if not subscribers:
+                del self._subscribers[sub.tenant_id]
+
+    async def stream(self, sub, heartbeat=15.0):
+        """SSE body for a subscription: events, keep-alive comments, and cleanup on disconnect."""
+        try:
+            yield f"retry: 3000\n: subscribed {sub.tenant_id}\n\n"
+            replay, sub.replay = sub.replay, []
+            for event in replay:
+                yield self._frame(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return  # too slow; the client reconnects with Last-Event-ID
+                yield self._frame(event)
+        finally:
+            self.unsubscribe(sub)
+
+    def _frame(self, event):
+        seq, event_type, data = event
+        return f"id: {self.event_id(seq)}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    def stats(self):
+        return {
+            "subscribers": sum(len(subs) for subs in self._subscribers.values()),
+            "tenants_buffered": len(self._channels),
+            "tenants_evicted": self._evicted,
+            "published": self._published,
+            "dropped_subscribers": self._dropped,
+            "buffer_events": self.buffer_events,
+            "max_tenants": self.max_tenants,
+            "idle_seconds": self.idle_seconds,
+            "queue_size": self.queue_size,
+        }
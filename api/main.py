@@ -13,20 +13,47 @@ NIST 800-53 Control Mapping:
 - AC-6: Least Privilege (Credential management)
 """
 
+import asyncio
 import json
 import os
 import random
+import re
 import sqlite3
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional
+from urllib.parse import urlsplit
 
-import bcrypt
 import psycopg2
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+from cache import GLOBAL_TENANT, MISSING, SingleFlight, cache_key, create_cache, tenant_tag
+from catalog import CATALOG
+from correlation import CorrelationEngine, load_rules
+from connectors import VendorPoller
+from db import CircuitBreaker, ConnectionPool, DatabaseExecutor, PoolTimeout, Replica, ReplicaSet, ThreadLocalSQLite
+from exports import FORMATS as EXPORT_FORMATS
+from exports import encode_rows, parse_time_bound
+from findings import SEVERITY_RANK, UNRANKED, UPSERT_COLUMNS, severity_rank, upsert_findings
+from ingest import (LOG_INSERT_COLUMNS, BodyTooLarge, ChunkInterrupted, insert_chunk, is_ndjson, json_array_items,
+                    ndjson_items, validate_row)
+from live import EVENT_TYPES as LIVE_EVENT_TYPES
+from live import LiveHub
+from migrations import apply_migrations
+from pagination import InvalidCursor, decode_cursor, page_size, paginate
+from passwords import HasherBusy, PasswordHasher, hash_password
+from precompressed import PrecompressedJSON
+from retention import create_partitions, purge_logs
+from records import (ALERT_COLUMNS, FINDING_COLUMNS, LOG_COLUMNS, VENDOR_COLUMNS, FastJSONResponse,
+                     fetch_records, select_list)
+from scans import FAILED, QUEUED, RUNNING, SCAN_JOB_COLUMNS, SUCCEEDED, ScanWorkerPool, new_job_id, progress
+from search import build_search
+from stats import read_global_counters, read_tenant_counters, reconcile_counters
+from writebehind import WriteBehind
+
 # =============================================================================
 # Configuration - Credentials from environment variables (NIST AC-6)
 # =============================================================================
@@ -35,11 +62,150 @@ DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "anthra")
 DB_USER = os.getenv("DB_USER", "anthra")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "3"))
+
+# Connection pool sizing (see /api/metrics for live utilisation)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+DB_POOL_CHECK_AFTER = float(os.getenv("DB_POOL_CHECK_AFTER", "30"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+# Threads running blocking DB calls; defaults to the pool size so they never starve on checkout
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_MAX)))
+# Threads for /api/*/export downloads, apart from DB_EXECUTOR_WORKERS: each holds a pooled
+# connection for the whole download, so slow auditors never starve other endpoints' run_db
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+
+# Circuit breaker: after N failed connects serve from SQLite and probe Postgres in the background
+DB_BREAKER_THRESHOLD = int(os.getenv("DB_BREAKER_THRESHOLD", "3"))
+DB_BREAKER_BACKOFF_INITIAL = float(os.getenv("DB_BREAKER_BACKOFF_INITIAL", "1"))
+DB_BREAKER_BACKOFF_MAX = float(os.getenv("DB_BREAKER_BACKOFF_MAX", "60"))
+
+# Read replicas for GET handlers: comma-separated postgresql:// or sqlite:///path DSNs (empty: primary only).
+# A tenant's reads stay on the primary for DB_READ_YOUR_WRITES_SECONDS after it writes (0 disables).
+DB_REPLICA_DSNS = [dsn.strip() for dsn in os.getenv("DB_REPLICA_DSNS", "").split(",") if dsn.strip()]
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+SQLITE_PATH = os.getenv("SQLITE_PATH", "/tmp/anthra.db")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# WAL lets edge deployments serve readers while POST /api/logs and vendor scans write
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "65536")),  # negative value = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024))),
+    "temp_store": "MEMORY",
+}
+
+# bcrypt process pool (NIST IA-5(1)); requests beyond workers + queue get a 503
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", "32"))
+
+# POST /api/logs/bulk: rows per transaction, and limits on what gets buffered
+INGEST_CHUNK_ROWS = int(os.getenv("INGEST_CHUNK_ROWS", "1000"))
+INGEST_MAX_BODY_BYTES = int(os.getenv("INGEST_MAX_BODY_BYTES", str(16 * 1024 * 1024)))
+INGEST_MAX_LINE_BYTES = int(os.getenv("INGEST_MAX_LINE_BYTES", str(64 * 1024)))
+INGEST_MAX_REPORTED_ERRORS = int(os.getenv("INGEST_MAX_REPORTED_ERRORS", "100"))
+
+# Response cache for the hot dashboard reads (see cache.py)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+CACHE_TTL = float(os.getenv("CACHE_TTL", "30"))
+
+# Browser/CDN cache lifetime for the static SSP and POA&M documents (revalidated via ETag)
+SSP_CACHE_MAX_AGE = int(os.getenv("SSP_CACHE_MAX_AGE", "300"))
+
+# Seconds between recounts of the /api/stats counters (0 disables)
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+
+# Vendor scan jobs (see scans.py): worker threads, concurrent scans per vendor, findings per transaction
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "4"))
+SCAN_MAX_PER_VENDOR = int(os.getenv("SCAN_MAX_PER_VENDOR", "1"))
+SCAN_BATCH_ROWS = int(os.getenv("SCAN_BATCH_ROWS", "500"))
+
+# Connector poller (see connectors.py): off by default; concurrency is global and per vendor API host
+VENDOR_POLL_ENABLED = os.getenv("VENDOR_POLL_ENABLED", "false").lower() in ("1", "true", "yes")
+VENDOR_POLL_INTERVAL = float(os.getenv("VENDOR_POLL_INTERVAL", "300"))
+VENDOR_POLL_CONCURRENCY = int(os.getenv("VENDOR_POLL_CONCURRENCY", "8"))
+VENDOR_POLL_PER_HOST = int(os.getenv("VENDOR_POLL_PER_HOST", "2"))
+VENDOR_POLL_TIMEOUT = float(os.getenv("VENDOR_POLL_TIMEOUT", "30"))
+VENDOR_POLL_PAGE_SIZE = int(os.getenv("VENDOR_POLL_PAGE_SIZE", "500"))
+VENDOR_POLL_MAX_PAGES = int(os.getenv("VENDOR_POLL_MAX_PAGES", "20"))
+
+# Streaming alert correlation over written logs (see correlation.py); rules default to DEFAULT_RULES
+CORRELATION_ENABLED = os.getenv("CORRELATION_ENABLED", "true").lower() in ("1", "true", "yes")
+CORRELATION_RULES_FILE = os.getenv("CORRELATION_RULES_FILE")
+CORRELATION_MAX_KEYS = int(os.getenv("CORRELATION_MAX_KEYS", "50000"))
+
+# Log retention (NIST AU-11, see retention.py): default and floor in days, purge cadence (0 disables)
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "365"))
+LOG_RETENTION_MIN_DAYS = int(os.getenv("LOG_RETENTION_MIN_DAYS", "90"))
+LOG_PURGE_INTERVAL = float(os.getenv("LOG_PURGE_INTERVAL", "3600"))
+LOG_PURGE_BATCH_ROWS = int(os.getenv("LOG_PURGE_BATCH_ROWS", "5000"))
+# PostgreSQL monthly log partitions: months created ahead, at startup and every LOG_PARTITION_INTERVAL seconds
+LOG_PARTITION_MONTHS_AHEAD = int(os.getenv("LOG_PARTITION_MONTHS_AHEAD", "2"))
+LOG_PARTITION_INTERVAL = float(os.getenv("LOG_PARTITION_INTERVAL", "86400"))
+
+# Live tail (see live.py): events kept per tenant for Last-Event-ID resume, per-subscriber queue, heartbeat seconds
+LIVE_BUFFER_EVENTS = int(os.getenv("LIVE_BUFFER_EVENTS", "1000"))
+LIVE_SUBSCRIBER_QUEUE = int(os.getenv("LIVE_SUBSCRIBER_QUEUE", "256"))
+LIVE_HEARTBEAT = float(os.getenv("LIVE_HEARTBEAT", "15"))
+# Tenant replay buffers kept at most, and dropped after this many seconds without events or subscribers
+LIVE_BUFFER_TENANTS = int(os.getenv("LIVE_BUFFER_TENANTS", "10000"))
+LIVE_BUFFER_IDLE_SECONDS = float(os.getenv("LIVE_BUFFER_IDLE_SECONDS", "3600"))
+
+# Write-behind group commit for POST /api/logs, /api/alerts, /api/vendors (see writebehind.py)
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() in ("1", "true", "yes")
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "500"))
+WRITE_BEHIND_FLUSH_MS = float(os.getenv("WRITE_BEHIND_FLUSH_MS", "5"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DB_PASSWORD:
+        try:
+            pg_pool.warm()
+        except psycopg2.Error as exc:
+            print(f"WARN: PostgreSQL unavailable at startup, using SQLite fallback: {exc}")
+            pg_breaker.trip(exc)
+            sqlite_conns.initialize()
+        else:
+            _migrate_postgres()
+    else:
+        sqlite_conns.initialize()
+    live_hub.bind(asyncio.get_running_loop())
+    reconciler = asyncio.create_task(_reconcile_stats_loop()) if STATS_RECONCILE_INTERVAL > 0 else None
+    purger = asyncio.create_task(_purge_logs_loop()) if LOG_PURGE_INTERVAL > 0 else None
+    partitioner = asyncio.create_task(_partition_logs_loop())
+    scan_workers.start()
+    write_behind.start()
+    await run_db(_recover_scan_jobs)
+    poller = asyncio.create_task(vendor_poller.run()) if VENDOR_POLL_ENABLED else None
+    yield
+    if reconciler:
+        reconciler.cancel()
+    if purger:
+        purger.cancel()
+    partitioner.cancel()
+    if poller:
+        poller.cancel()
+        await asyncio.gather(poller, return_exceptions=True)
+    scan_workers.stop()
+    await write_behind.stop()
+    pg_breaker.stop()
+    db_replicas.stop()
+    password_hasher.shutdown()
+    export_executor.shutdown()
+    db_executor.shutdown()
+    pg_pool.close()
+
 
 app = FastAPI(
     title="Anthra Center",
     version="2.0.0",
     description="Centralized security monitoring and FedRAMP compliance platform",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 TRUSTED_ORIGINS = os.getenv("CORS_ORIGINS", "https://anthra.cloud,https://api.anthra.cloud").split(",")
@@ -62,133 +228,395 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"error": "Invalid pagination cursor"})
+
+
+@app.exception_handler(HasherBusy)
+async def hasher_busy_handler(request: Request, exc: HasherBusy):
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "1"},
+        content={"error": "Authentication service busy. Please retry shortly."},
+    )
+
+
 # =============================================================================
 # Database
 # =============================================================================
-def get_db():
+def _pg_connect():
+    return psycopg2.connect(
+        host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD,
+        connect_timeout=DB_CONNECT_TIMEOUT,
+    )
+
+
+pg_pool = ConnectionPool(
+    _pg_connect, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT,
+    check_after=DB_POOL_CHECK_AFTER, max_idle=DB_POOL_MAX_IDLE,
+)
+
+
+def _pg_probe():
+    _pg_connect().close()
+
+
+def _migrate_postgres():
+    with pg_pool.acquire() as conn:
+        apply_migrations(conn.raw, "postgres")
+
+
+def _pg_recovered():
     try:
-        if not DB_PASSWORD:
-            raise Exception("DB_PASSWORD not set")
-        return psycopg2.connect(
-            host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD,
+        pg_pool.warm()
+    except psycopg2.Error:
+        return
+    # Postgres may have been down when this release started; catch up on its schema
+    _migrate_postgres()
+
+
+pg_breaker = CircuitBreaker(
+    _pg_probe, failure_threshold=DB_BREAKER_THRESHOLD, backoff_initial=DB_BREAKER_BACKOFF_INITIAL,
+    backoff_max=DB_BREAKER_BACKOFF_MAX, on_recover=_pg_recovered, name="postgres",
+)
+sqlite_conns = ThreadLocalSQLite(
+    SQLITE_PATH, initializer=lambda conn: _init_sqlite_schema(conn),
+    pragmas=SQLITE_PRAGMAS, busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS,
+)
+db_executor = DatabaseExecutor(DB_EXECUTOR_WORKERS)
+export_executor = DatabaseExecutor(EXPORT_WORKERS, thread_name_prefix="anthra-export")
+
+
+def _replica(dsn):
+    """Pool and breaker for one DB_REPLICA_DSNS entry; names never include credentials (SI-11)."""
+    if dsn.startswith("sqlite:///"):
+        path = dsn[len("sqlite:///"):]
+        source = ThreadLocalSQLite(
+            path, busy_timeout_ms=SQLITE_BUSY_TIMEOUT_MS, read_only=True,
+            pragmas={k: v for k, v in SQLITE_PRAGMAS.items() if k not in ("journal_mode", "synchronous")},
         )
-    except Exception:
-        conn = sqlite3.connect("/tmp/anthra.db")
-        _init_sqlite(conn)
-        return conn
+        name, errors = f"sqlite:{path}", (sqlite3.Error,)
+
+        def probe():
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                conn.execute("SELECT 1")
+            finally:
+                conn.close()
+    elif dsn.startswith(("postgresql://", "postgres://")):
+        def connect():
+            return psycopg2.connect(dsn, connect_timeout=DB_CONNECT_TIMEOUT)
+
+        source = ConnectionPool(
+            connect, minconn=DB_POOL_MIN, maxconn=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT,
+            check_after=DB_POOL_CHECK_AFTER, max_idle=DB_POOL_MAX_IDLE,
+        )
+        url = urlsplit(dsn)
+        name, errors = f"postgres:{url.hostname}:{url.port or 5432}", (psycopg2.Error,)
 
+        def probe():
+            connect().close()
+    else:
+        raise ValueError(f"DB_REPLICA_DSNS entries must be postgresql:// or sqlite:/// URLs, got {dsn.split(':')[0]!r}")
+    breaker = CircuitBreaker(
+        probe, failure_threshold=DB_BREAKER_THRESHOLD, backoff_initial=DB_BREAKER_BACKOFF_INITIAL,
+        backoff_max=DB_BREAKER_BACKOFF_MAX, name=f"replica {name}",
+    )
+    return Replica(name, source, breaker, errors)
 
-def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt(rounds=12)
-    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
+db_replicas = ReplicaSet([_replica(dsn) for dsn in DB_REPLICA_DSNS], read_your_writes=DB_READ_YOUR_WRITES_SECONDS)
 
-def verify_password(password: str, hashed: str) -> bool:
+
+def get_db():
+    """Check out a connection; conn.close() returns it to the pool."""
+    if DB_PASSWORD and pg_breaker.allow():
+        try:
+            conn = pg_pool.acquire()
+        except PoolTimeout:
+            # Pool exhausted: shed load instead of splitting writes across backends
+            raise HTTPException(status_code=503, detail="Database busy, please retry")
+        except psycopg2.Error as exc:
+            pg_breaker.record_failure(exc)
+        else:
+            pg_breaker.record_success()
+            return conn
+    return sqlite_conns.acquire()
+
+
+def get_read_db(tenant_id=None):
+    """Connection for a read-only handler: a healthy replica when one may serve it, else get_db()."""
+    if not db_replicas or (DB_PASSWORD and not pg_breaker.allow()):
+        # Without the primary, writes land in the SQLite fallback; reads must follow them there
+        return get_db()
+    return db_replicas.acquire(tenant_id) or get_db()
+
+
+def db_backend_status():
+    """Which backend get_db() is currently serving from."""
+    if not DB_PASSWORD:
+        return {"backend": "sqlite", "mode": "demo"}
+    if pg_breaker.allow():
+        return {"backend": "postgres", "mode": "primary", "breaker": pg_breaker.stats()}
+    return {"backend": "sqlite", "mode": "fallback", "breaker": pg_breaker.stats()}
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run blocking database work on the DB executor, off the event loop."""
+    return await db_executor.run(fn, *args, **kwargs)
+
+
+stats_reconcile = {"runs": 0, "corrected": 0, "last_run": None}
+
+
+def reconcile_stats():
+    """Recount /api/stats counters on whichever backend is serving."""
+    with get_db() as conn:
+        corrected = reconcile_counters(conn.raw, conn.backend)
+    stats_reconcile["runs"] += 1
+    stats_reconcile["corrected"] += corrected
+    stats_reconcile["last_run"] = datetime.utcnow().isoformat()
+    if corrected:
+        print(f"WARN: corrected {corrected} drifted stats counters")
+    return corrected
+
+
+async def _reconcile_stats_loop():
+    while True:
+        await asyncio.sleep(STATS_RECONCILE_INTERVAL)
+        try:
+            await run_db(reconcile_stats)
+        except Exception as exc:
+            print(f"ERROR: stats reconciliation failed: {exc}")
+
+
+log_purges = {"runs": 0, "partitions_dropped": 0, "rows_deleted": 0, "last_run": None}
+
+
+def run_log_purge():
+    """Apply per-tenant log retention on whichever backend is serving."""
+    with get_db() as conn:
+        summary = purge_logs(conn, LOG_RETENTION_DAYS, batch_rows=LOG_PURGE_BATCH_ROWS)
+    log_purges["runs"] += 1
+    log_purges["partitions_dropped"] += len(summary["partitions_dropped"])
+    log_purges["rows_deleted"] += summary["rows_deleted"]
+    log_purges["last_run"] = datetime.utcnow().isoformat()
+    for tenant_id in summary["tenants_purged"]:
+        invalidate_tenant(tenant_id, "stats")
+    if summary["partitions_dropped"] or summary["rows_deleted"]:
+        response_cache.invalidate(tenant_tag("stats", GLOBAL_TENANT))
+        print(f"INFO: log retention dropped {summary['partitions_dropped']} and deleted "
+              f"{summary['rows_deleted']} rows")
+    return summary
+
+
+async def _purge_logs_loop():
+    while True:
+        await asyncio.sleep(LOG_PURGE_INTERVAL)
+        try:
+            await run_db(run_log_purge)
+        except Exception as exc:
+            print(f"ERROR: log retention purge failed: {exc}")
+
+
+log_partitions = {"runs": 0, "created": 0, "rows_moved": 0, "last_run": None}
+
+
+def run_partition_maintenance():
+    """Create upcoming monthly log partitions (PostgreSQL only)."""
+    with get_db() as conn:
+        created = create_partitions(conn, LOG_PARTITION_MONTHS_AHEAD)
+    log_partitions["runs"] += 1
+    log_partitions["created"] += len(created)
+    log_partitions["rows_moved"] += sum(moved for _, moved in created)
+    log_partitions["last_run"] = datetime.utcnow().isoformat()
+    for name, moved in created:
+        print(f"INFO: created log partition {name}" + (f", moved {moved} rows out of logs_default" if moved else ""))
+    return created
+
+
+async def _partition_logs_loop():
+    # Runs once at startup even with LOG_PARTITION_INTERVAL=0, so the configured months always exist
+    while True:
+        try:
+            await run_db(run_partition_maintenance)
+        except Exception as exc:
+            print(f"ERROR: log partition maintenance failed: {exc}")
+        if LOG_PARTITION_INTERVAL <= 0:
+            return
+        await asyncio.sleep(LOG_PARTITION_INTERVAL)
+
+
+def _time_range_clause(since, until):
+    clause, params = "", []
     try:
-        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
-    except Exception:
-        return False
+        if since:
+            clause += " AND created_at >= ?"
+            params.append(parse_time_bound(since))
+        if until:
+            clause += " AND created_at < ?"
+            params.append(parse_time_bound(until))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since/until must be ISO-8601 timestamps")
+    return clause, params
+
+
+def _stream_export(name, fmt, query, params, columns, tenant_id=None):
+    """Stream a query result from a server-side cursor as NDJSON or CSV."""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    def produce(emit):
+        with get_read_db(tenant_id) as conn:
+            cur = conn.stream_cursor()
+            cur.execute(query, params)
+            for chunk in encode_rows(cur, columns, fmt):
+                emit(chunk)
+
+    filename = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+    return StreamingResponse(
+        export_executor.stream(produce),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
 
 
-# =============================================================================
-# SSP Control Data — NIST 800-53 Rev 5, FedRAMP Moderate Baseline
-# =============================================================================
-SSP_CONTROLS = [
-    # AC - Access Control
-    {"control_id": "AC-1",  "family": "AC", "title": "Policy and Procedures", "status": "Implemented", "description": "Access control policy documented in SSP Section 9. Updated annually."},
-    {"control_id": "AC-2",  "family": "AC", "title": "Account Management", "status": "Implemented", "description": "RBAC audit complete. ServiceAccounts dedicated per service. automountServiceAccountToken: false on app pods. Evidence: rbac_audit, kube_bench."},
-    {"control_id": "AC-3",  "family": "AC", "title": "Access Enforcement", "status": "Partially Implemented", "description": "Kyverno enforces non-root, drop ALL caps. PSS restricted on anthra namespace. Missing: application-level RBAC middleware. Evidence: kyverno_nonroot, polaris."},
-    {"control_id": "AC-6",  "family": "AC", "title": "Least Privilege", "status": "Partially Implemented", "description": "K8s pods run as non-root (UID 10001). Capabilities dropped. PSS restricted enforced. Missing: fine-grained RBAC roles. Evidence: kyverno_drop_caps, rbac_audit."},
-    {"control_id": "AC-7",  "family": "AC", "title": "Unsuccessful Logon Attempts", "status": "Not Implemented", "description": "No account lockout after failed attempts. No rate limiting on /api/auth/login."},
-    {"control_id": "AC-8",  "family": "AC", "title": "System Use Notification", "status": "Not Implemented", "description": "No login banner or acceptable use notice displayed before authentication."},
-    {"control_id": "AC-14", "family": "AC", "title": "Permitted Actions Without Identification", "status": "Not Implemented", "description": "All API endpoints accessible without authentication. No session management."},
-    {"control_id": "AC-17", "family": "AC", "title": "Remote Access", "status": "Partially Implemented", "description": "NetworkPolicy default-deny enforced on all namespaces. Service-aware allow rules. Missing: VPN/mTLS between services. Evidence: network_policy_check, conftest."},
-    # AU - Audit and Accountability
-    {"control_id": "AU-2",  "family": "AU", "title": "Event Logging", "status": "Partially Implemented", "description": "Falco DaemonSet on all nodes captures syscalls + K8s audit. 10 watchers run (apparmor, drift, events, network, pss, seccomp, secrets, supply-chain). Missing: application-level audit events. Evidence: falco, k8s_audit_logs."},
-    {"control_id": "AU-3",  "family": "AU", "title": "Content of Audit Records", "status": "Not Implemented", "description": "Falco captures who/what/when for syscalls. Missing: structured audit records with user identity, outcome, originating IP for application events. Evidence: none — gap."},
-    {"control_id": "AU-6",  "family": "AU", "title": "Audit Record Review", "status": "Implemented", "description": "Anthra Center dashboard provides real-time log review. Findings feed sorted by severity. NIST control mapping on each finding."},
-    {"control_id": "AU-8",  "family": "AU", "title": "Time Stamps", "status": "Implemented", "description": "All events use UTC timestamps via Python datetime.utcnow() and PostgreSQL NOW()."},
-    {"control_id": "AU-9",  "family": "AU", "title": "Protection of Audit Information", "status": "Implemented", "description": "RBAC restricts audit log access. Kube-bench validates API server audit settings. Evidence: rbac_audit, kube_bench."},
-    {"control_id": "AU-11", "family": "AU", "title": "Audit Record Retention", "status": "Not Implemented", "description": "No log retention policy. Logs lost on pod restart (ephemeral SQLite). FedRAMP requires 1-year online, 3-year archive."},
-    {"control_id": "AU-12", "family": "AU", "title": "Audit Record Generation", "status": "Not Implemented", "description": "Falco generates runtime audit events. Missing: application-level audit generation (CRUD operations, auth events). No centralized audit pipeline. Evidence: none — gap."},
-    # CA - Security Assessment
-    {"control_id": "CA-2",  "family": "CA", "title": "Control Assessments", "status": "Implemented", "description": "Automated scanning via Trivy, Kubescape, Checkov, Semgrep. Results mapped to NIST controls and displayed in Anthra Center."},
-    {"control_id": "CA-7",  "family": "CA", "title": "Continuous Monitoring", "status": "Partially Implemented", "description": "CI/CD pipeline runs security scans on push. Missing: scheduled production rescans, drift detection."},
-    # CM - Configuration Management
-    {"control_id": "CM-2",  "family": "CM", "title": "Baseline Configuration", "status": "Implemented", "description": "Kustomize base/overlays for all services. Images pinned to semver. ArgoCD syncs from git. Checkov: 785 passed, 70 failed. Evidence: kube_bench, checkov, polaris."},
-    {"control_id": "CM-3",  "family": "CM", "title": "Configuration Change Control", "status": "Implemented", "description": "ArgoCD GitOps — all changes via git PR. promote-image.sh tracks dev→staging→prod. Git history = audit trail. Evidence: argocd, git log."},
-    {"control_id": "CM-6",  "family": "CM", "title": "Configuration Settings", "status": "Partially Implemented", "description": "PSS restricted on app namespaces. Kyverno enforces resource limits, seccomp, non-root. Polaris 81/100. Missing: OS-level CIS hardening. Evidence: kube_bench, kyverno."},
-    {"control_id": "CM-7",  "family": "CM", "title": "Least Functionality", "status": "Partially Implemented", "description": "Capabilities dropped, read-only rootfs, non-root. Debug endpoint removed. Missing: 70 Checkov failures (image digest, imagePullPolicy). Evidence: checkov, conftest."},
-    {"control_id": "CM-8",  "family": "CM", "title": "System Component Inventory", "status": "Partially Implemented", "description": "Container SBOM generated by Trivy. 4 services tracked. Missing: full asset inventory with owners, classifications. Evidence: trivy_sbom."},
-    # CP - Contingency Planning
-    {"control_id": "CP-9",  "family": "CP", "title": "System Backup", "status": "Not Implemented", "description": "No automated database backups. No backup verification testing. PostgreSQL data on ephemeral volume."},
-    {"control_id": "CP-10", "family": "CP", "title": "System Recovery and Reconstitution", "status": "Partially Implemented", "description": "K8s deployments auto-restart on failure. No documented RTO/RPO. No disaster recovery runbook."},
-    # IA - Identification and Authentication
-    {"control_id": "IA-2",  "family": "IA", "title": "Identification and Authentication (Org Users)", "status": "Partially Implemented", "description": "Username/password login exists. Missing: MFA (IA-2(1)), network access (IA-2(2))."},
-    {"control_id": "IA-4",  "family": "IA", "title": "Identifier Management", "status": "Implemented", "description": "Unique user IDs assigned via auto-increment. Tenant isolation by tenant_id."},
-    {"control_id": "IA-5",  "family": "IA", "title": "Authenticator Management", "status": "Partially Implemented", "description": "Passwords hashed with bcrypt (cost 12). Missing: password complexity enforcement, credential rotation policy, MFA tokens."},
-    {"control_id": "IA-6",  "family": "IA", "title": "Authentication Feedback", "status": "Implemented", "description": "Generic 'Invalid username or password' message on failed login. No credential exposure in error responses."},
-    {"control_id": "IA-8",  "family": "IA", "title": "Identification and Authentication (Non-Org Users)", "status": "Not Implemented", "description": "No federated identity. No PIV/CAC support. Required for federal user access."},
-    # IR - Incident Response
-    {"control_id": "IR-1",  "family": "IR", "title": "Policy and Procedures", "status": "Not Implemented", "description": "No incident response plan documented. No defined roles, communication channels, or escalation paths."},
-    {"control_id": "IR-4",  "family": "IR", "title": "Incident Handling", "status": "Not Implemented", "description": "Falco detects runtime threats. Missing: automated containment, forensic capture, post-incident review, documented IRP. Evidence: none — gap."},
-    {"control_id": "IR-5",  "family": "IR", "title": "Incident Monitoring", "status": "Partially Implemented", "description": "Falco on all nodes. 10 watchers report drift, secrets, network, events. Anthra Center aggregates alerts. Missing: 24/7 automated response. Evidence: falco, jsa_infrasec."},
-    {"control_id": "IR-6",  "family": "IR", "title": "Incident Reporting", "status": "Not Implemented", "description": "No US-CERT/CISA incident reporting capability. FedRAMP requires reporting within 1 hour for significant incidents."},
-    # MP - Media Protection
-    {"control_id": "MP-2",  "family": "MP", "title": "Media Access", "status": "Not Implemented", "description": "No media access controls. S3 bucket encryption not enforced (finding: SC-28)."},
-    # PE - Physical (inherited from AWS)
-    {"control_id": "PE-1",  "family": "PE", "title": "Policy and Procedures", "status": "Inherited", "description": "Physical security controls inherited from AWS GovCloud. AWS FedRAMP High ATO covers PE family."},
-    # PL - Planning
-    {"control_id": "PL-2",  "family": "PL", "title": "System Security and Privacy Plans", "status": "Partially Implemented", "description": "SSP in progress. Appendix A findings documented. Missing: full SSP narrative, security architecture diagrams."},
-    # RA - Risk Assessment
-    {"control_id": "RA-3",  "family": "RA", "title": "Risk Assessment", "status": "Implemented", "description": "Automated risk assessment via multi-scanner pipeline. Findings ranked E through S. CVSS scores from NVD."},
-    {"control_id": "RA-5",  "family": "RA", "title": "Vulnerability Monitoring and Scanning", "status": "Implemented", "description": "Trivy (CVEs), Semgrep (SAST), Gitleaks (secrets), Kubescape (K8s), Checkov (IaC). CI/CD and on-demand scanning."},
-    # SA - System and Services Acquisition
-    {"control_id": "SA-3",  "family": "SA", "title": "System Development Life Cycle", "status": "Partially Implemented", "description": "Secure SDLC with pre-commit hooks and CI/CD gates. Missing: formal security requirements in design phase."},
-    {"control_id": "SA-4",  "family": "SA", "title": "Acquisition Process", "status": "Partially Implemented", "description": "Open-source dependencies scanned by Trivy/Grype. Missing: vendor security assessment for 3rd-party services."},
-    {"control_id": "SA-11", "family": "SA", "title": "Developer Testing and Evaluation", "status": "Implemented", "description": "14 custom Semgrep rules for FedRAMP. 8 pre-commit validators. Security pipeline with 9 jobs runs on every PR."},
-    # SC - System and Communications Protection
-    {"control_id": "SC-5",  "family": "SC", "title": "Denial of Service Protection", "status": "Implemented", "description": "K8s resource limits + LimitRange + ResourceQuota on all namespaces. Kyverno enforces resource limits on admission. Evidence: kyverno_resource_limits, polaris."},
-    {"control_id": "SC-7",  "family": "SC", "title": "Boundary Protection", "status": "Partially Implemented", "description": "NetworkPolicy default-deny on all namespaces. Service-aware allow rules (envoy→ui, envoy→api, api→db, api→ingest). 38 policies total. Missing: WAF, egress filtering. Evidence: network_policy_check."},
-    {"control_id": "SC-8",  "family": "SC", "title": "Transmission Confidentiality and Integrity", "status": "Partially Implemented", "description": "Envoy Gateway handles TLS termination. PostgreSQL sslmode=require. Missing: mTLS between services, cert-manager production certs. Evidence: checkov, conftest."},
-    {"control_id": "SC-12", "family": "SC", "title": "Cryptographic Key Establishment and Management", "status": "Not Implemented", "description": "No key management system. TLS certificates not yet provisioned. No HSM integration."},
-    {"control_id": "SC-13", "family": "SC", "title": "Cryptographic Protection", "status": "Implemented", "description": "bcrypt for passwords (cost 12). PostgreSQL SSL for data in transit. Missing: data at rest encryption for application data."},
-    {"control_id": "SC-28", "family": "SC", "title": "Protection of Information at Rest", "status": "Partially Implemented", "description": "K8s secrets base64 encoded (not encrypted). S3 bucket encryption not enforced. EBS encryption not verified."},
-    # SI - System and Information Integrity
-    {"control_id": "SI-2",  "family": "SI", "title": "Flaw Remediation", "status": "Implemented", "description": "CVE scanning via Trivy on every build. CI/CD blocks on CRITICAL/HIGH. Dependency updates tracked in findings."},
-    {"control_id": "SI-3",  "family": "SI", "title": "Malicious Code Protection", "status": "Partially Implemented", "description": "Falcon EDR on cluster nodes. Container image scanning. Missing: runtime file integrity monitoring."},
-    {"control_id": "SI-4",  "family": "SI", "title": "System Monitoring", "status": "Implemented", "description": "CrowdStrike Falcon for runtime threat detection. MITRE ATT&CK mapped. Alerts surfaced in Anthra Center dashboard."},
-    {"control_id": "SI-5",  "family": "SI", "title": "Security Alerts, Advisories, and Directives", "status": "Partially Implemented", "description": "NVD CVE data consumed via Trivy. Missing: US-CERT advisory integration, BOD compliance tracking."},
-    {"control_id": "SI-10", "family": "SI", "title": "Information Input Validation", "status": "Not Implemented", "description": "XSS vulnerability in search (dangerouslySetInnerHTML). No server-side input sanitization on log messages."},
-    {"control_id": "SI-11", "family": "SI", "title": "Error Handling", "status": "Implemented", "description": "Global exception handler returns generic errors. Stack traces logged internally only."},
-]
-
-POAM_ITEMS = [
-    # CRITICAL (3)
-    {"id": 1,  "control": "AC-14", "weakness": "All API endpoints accessible without authentication", "severity": "CRITICAL", "scheduled": "2026-03-25", "status": "In Progress", "milestone": "Deploy JWT middleware with RBAC enforcement"},
-    {"id": 2,  "control": "IA-5",  "weakness": "14 exposed API keys in findings JSON and secret.yaml (B-rank, human review)", "severity": "CRITICAL", "scheduled": "2026-03-20", "status": "Open", "milestone": "Rotate all exposed keys, migrate to AWS Secrets Manager via ExternalSecrets"},
-    {"id": 3,  "control": "IA-2",  "weakness": "No multi-factor authentication for federal users", "severity": "CRITICAL", "scheduled": "2026-03-30", "status": "In Progress", "milestone": "Integrate TOTP/WebAuthn for privileged users, Login.gov for federal SSO"},
-    # HIGH (14) — from real gap analysis
-    {"id": 4,  "control": "AC-3",  "weakness": "Application-level RBAC middleware not implemented", "severity": "HIGH", "scheduled": "2026-04-01", "status": "Planned", "milestone": "JWT + role-based route guards on all API endpoints"},
-    {"id": 5,  "control": "AC-6",  "weakness": "Fine-grained K8s RBAC roles not scoped per service", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Dedicated ClusterRoles per agent, remove wildcard permissions"},
-    {"id": 6,  "control": "AU-3",  "weakness": "No structured audit records (who/what/when/where/outcome)", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Implement structured audit logging with user identity, IP, outcome fields"},
-    {"id": 7,  "control": "AU-12", "weakness": "No application-level audit record generation", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Emit audit events for CRUD operations, auth events, privilege changes"},
-    {"id": 8,  "control": "CM-6",  "weakness": "70 Checkov failures (image digest, imagePullPolicy, secrets-as-files)", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Pin images to digest, set imagePullPolicy:Always, mount secrets as files"},
-    {"id": 9,  "control": "CM-7",  "weakness": "70 Checkov IaC failures: image digest pinning (8), SA token mounts (4)", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Apply Checkov remediation templates from GP-Copilot fixer-scripts"},
-    {"id": 10, "control": "IR-4",  "weakness": "No incident handling capability — no IRP, no containment, no forensics", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Document IRP with CISA reporting, deploy 03-DEPLOY-RUNTIME responders"},
-    {"id": 11, "control": "RA-5",  "weakness": "Trivy image scan not run on production images", "severity": "HIGH", "scheduled": "2026-03-25", "status": "Open", "milestone": "Run Trivy image scan on all 4 Anthra container images, add to CI gate"},
-    {"id": 12, "control": "SA-10", "weakness": "No formal security requirements in design phase", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Add threat modeling to SDLC, document in SSP Section 13"},
-    {"id": 13, "control": "SA-11", "weakness": "14 custom Semgrep rules deployed but coverage gaps remain", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Expand Semgrep rules to cover Go and React, add to pre-commit hooks"},
-    {"id": 14, "control": "SC-7",  "weakness": "No WAF or egress filtering beyond NetworkPolicy", "severity": "HIGH", "scheduled": "2026-04-15", "status": "Planned", "milestone": "Deploy AWS WAF on ALB, add egress NetworkPolicy for external APIs only"},
-    {"id": 15, "control": "SC-8",  "weakness": "No mTLS between services, production TLS via cert-manager pending", "severity": "HIGH", "scheduled": "2026-04-01", "status": "In Progress", "milestone": "Deploy cert-manager, enforce TLS 1.2+, evaluate Istio mTLS"},
-    {"id": 16, "control": "SC-28", "weakness": "K8s secrets base64 only, S3/EBS encryption not verified", "severity": "HIGH", "scheduled": "2026-04-01", "status": "Planned", "milestone": "Enable EBS encryption, S3 SSE-KMS, ExternalSecrets for K8s"},
-    {"id": 17, "control": "SI-2",  "weakness": "CVE scanning CI gate exists but Trivy image scan empty", "severity": "HIGH", "scheduled": "2026-03-25", "status": "Open", "milestone": "Run Trivy image scan, fix CRITICAL/HIGH CVEs, block in CI"},
-    # MEDIUM (4)
-    {"id": 18, "control": "AC-17", "weakness": "No VPN or mTLS required for API access", "severity": "MEDIUM", "scheduled": "2026-05-01", "status": "Planned", "milestone": "Evaluate VPN gateway or Cloudflare Access for API protection"},
-    {"id": 19, "control": "CM-8",  "weakness": "Container SBOM exists but no full asset inventory with owners", "severity": "MEDIUM", "scheduled": "2026-05-01", "status": "Planned", "milestone": "Complete asset inventory in Backstage catalog with ownership and classification"},
-    {"id": 20, "control": "IR-5",  "weakness": "Falco monitoring active but no 24/7 automated response", "severity": "MEDIUM", "scheduled": "2026-04-15", "status": "In Progress", "milestone": "Enable jsa-infrasec autonomous agent for E/D rank auto-remediation"},
-    {"id": 21, "control": "SI-10", "weakness": "XSS vulnerability in search component (dangerouslySetInnerHTML)", "severity": "MEDIUM", "scheduled": "2026-03-20", "status": "Open", "milestone": "Replace dangerouslySetInnerHTML with DOMPurify sanitized rendering"},
-]
+password_hasher = PasswordHasher(workers=BCRYPT_WORKERS, max_queue=BCRYPT_MAX_QUEUE)
+
+response_cache = create_cache(CACHE_BACKEND, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+read_flights = SingleFlight()
+
+
+async def cached(namespace, tenant_id, compute, **params):
+    """Return a cached result for (namespace, tenant, params), computing it on a miss.
+
+    Entries are tagged "<namespace>:<tenant_id>"; see invalidate_tenant().
+    Concurrent misses for the same key share one computation.
+    """
+    key = cache_key(namespace, tenant_id, **params)
+    value = response_cache.get(key)
+    if value is not MISSING:
+        return value
+    tags = (tenant_tag(namespace, tenant_id),)
+    snapshot = response_cache.snapshot(tags)
+
+    async def load():
+        result = await compute()
+        response_cache.set(key, result, tags, snapshot)
+        return result
+
+    # Keyed by snapshot too: a read arriving after a write starts a fresh flight
+    return await read_flights.do((key, snapshot), load)
+
+
+def invalidate_tenant(tenant_id, *namespaces):
+    """Drop a tenant's cached reads after a write; stats also drops the global totals.
+
+    Also starts the tenant's read-your-writes window, so the reads that refill
+    these entries come from the primary rather than a lagging replica.
+    """
+    db_replicas.note_write(tenant_id)
+    tags = [tenant_tag(ns, tenant_id) for ns in namespaces]
+    if "stats" in namespaces:
+        tags.append(tenant_tag("stats", GLOBAL_TENANT))
+    response_cache.invalidate(*tags)
+
+
+live_hub = LiveHub(buffer_events=LIVE_BUFFER_EVENTS, queue_size=LIVE_SUBSCRIBER_QUEUE,
+                   max_tenants=LIVE_BUFFER_TENANTS, idle_seconds=LIVE_BUFFER_IDLE_SECONDS)
+
+ALERT_INSERT_COLUMNS = ("tenant_id", "severity", "title", "description", "source", "nist_control")
+
+
+def publish_live(event_type, columns, rows, stamp="created_at"):
+    """Push committed rows (tuples, tenant_id first) to /api/live subscribers; safe from DB threads."""
+    written = datetime.utcnow().isoformat()
+    by_tenant = {}
+    for row in rows:
+        by_tenant.setdefault(row[0], []).append({**dict(zip(columns, row)), stamp: written})
+    for tenant_id, items in by_tenant.items():
+        live_hub.publish(tenant_id, event_type, items)
+
+
+correlation_engine = (CorrelationEngine(load_rules(CORRELATION_RULES_FILE), max_keys=CORRELATION_MAX_KEYS)
+                      if CORRELATION_ENABLED else None)
+
+
+def correlate_logs(conn, rows):
+    """Feed committed (tenant_id, level, message, source) rows to the rule engine; store its alerts.
+
+    Returns the tenants that got a new alert.
+    """
+    if correlation_engine is None or not rows:
+        return set()
+    alerts = correlation_engine.observe_many(rows)
+    if alerts:
+        conn.executemany(
+            "INSERT INTO alerts (tenant_id, severity, title, description, source, nist_control) VALUES (?, ?, ?, ?, ?, ?)",
+            alerts,
+        )
+        conn.commit()
+        publish_live("alert", ALERT_INSERT_COLUMNS, alerts)
+    return {alert[0] for alert in alerts}
+
+
+def _correlate_committed(conn, rows):
+    """correlate_logs for rows that are already stored: a failure is logged, never raised.
+
+    Failing the request would report stored rows as lost and invite a retry that duplicates them.
+    """
+    try:
+        return correlate_logs(conn, rows)
+    except Exception as exc:
+        try:
+            conn.rollback()
+        except Exception:
+            pass  # the connection itself may be what failed
+        print(f"WARN: correlation of {len(rows)} committed log rows failed: {exc!r}")
+        return set()
+
+
+def _logs_written(conn, rows):
+    publish_live("log", LOG_INSERT_COLUMNS, rows, stamp="timestamp")
+    alerted = _correlate_committed(conn, rows)
+    for tenant_id in {row[0] for row in rows}:
+        invalidate_tenant(tenant_id, *(("stats", "alerts") if tenant_id in alerted else ("stats",)))
+
+
+def _alerts_written(conn, rows):
+    publish_live("alert", ALERT_INSERT_COLUMNS, rows)
+    for tenant_id in {row[0] for row in rows}:
+        invalidate_tenant(tenant_id, "alerts", "stats")
+
+
+def _vendors_written(conn, rows):
+    for tenant_id in {row[0] for row in rows}:
+        invalidate_tenant(tenant_id, "stats")
+
+
+write_behind = WriteBehind(run_db, get_db, enabled=WRITE_BEHIND_ENABLED,
+                           batch_size=WRITE_BEHIND_BATCH_SIZE, flush_ms=WRITE_BEHIND_FLUSH_MS)
+write_behind.table("logs", LOG_INSERT_COLUMNS, after=_logs_written)
+write_behind.table("alerts", ALERT_INSERT_COLUMNS[:4], after=_alerts_written)
+write_behind.table("vendors", ("tenant_id", "name", "vendor_type", "api_endpoint", "api_key", "status"),
+                   after=_vendors_written)
+
+
+def write_response(committed, body):
+    """Response for a write_behind.submit(): 202 "queued" unless it returned after the commit."""
+    if committed:
+        return body
+    return FastJSONResponse({**body, "status": "queued"}, status_code=202)
+
+
+def _severity_filter(severity):
+    """Findings WHERE fragment for ?severity=; known levels go through the severity_rank index."""
+    rank = severity_rank(severity)
+    if rank == UNRANKED:
+        return " AND severity = ?", [severity.upper()]
+    return " AND severity_rank = ?", [rank]
+
 
 # Simulated scan results per vendor type
 VENDOR_SCAN_TEMPLATES = {
@@ -223,8 +651,13 @@ VENDOR_SCAN_TEMPLATES = {
 }
 
 
+def _init_sqlite_schema(conn):
+    _init_sqlite(conn)
+    apply_migrations(conn, "sqlite")
+
+
 def _init_sqlite(conn):
-    """Initialize SQLite schema for demo mode."""
+    """Initialize SQLite schema for demo mode (runs once per process, see ThreadLocalSQLite)."""
     cur = conn.cursor()
     cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='vendors'")
     if cur.fetchone():
@@ -405,16 +838,46 @@ class VendorRequest(BaseModel):
     api_key: str
 
 
+class RetentionRequest(BaseModel):
+    tenant_id: str
+    retention_days: int
+
+
 # =============================================================================
 # Health
 # =============================================================================
 @app.get("/api/health")
 def health_check():
+    database = db_backend_status()
     return {
-        "status": "healthy",
+        "status": "degraded" if database["mode"] == "fallback" else "healthy",
         "service": "anthra-center",
         "version": "2.0.0",
         "timestamp": datetime.utcnow().isoformat(),
+        "database": database,
+    }
+
+
+@app.get("/api/metrics")
+def metrics():
+    """Operational metrics for capacity planning (pool sizing etc.)."""
+    return {
+        "db_pool": pg_pool.stats(),
+        "db_replicas": db_replicas.stats(),
+        "db_executor": db_executor.stats(),
+        "export_executor": export_executor.stats(),
+        "password_hashing": password_hasher.stats(),
+        "sqlite": sqlite_conns.stats(),
+        "stats_reconcile": dict(stats_reconcile),
+        "response_cache": response_cache.stats(),
+        "single_flight": read_flights.stats(),
+        "scan_jobs": scan_workers.stats(),
+        "vendor_poller": vendor_poller.stats(),
+        "log_retention": dict(log_purges),
+        "log_partitions": dict(log_partitions),
+        "correlation": correlation_engine.stats() if correlation_engine else {"enabled": False},
+        "live": live_hub.stats(),
+        "write_behind": write_behind.stats(),
     }
 
 
@@ -423,18 +886,20 @@ def health_check():
 # =============================================================================
 @app.post("/api/auth/login")
 async def login(request: LoginRequest):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id, username, email, role, tenant_id, password_hash FROM users WHERE username = ?",
-        (request.username,),
-    )
-    user_row = cur.fetchone()
-    conn.close()
+    def lookup():
+        with get_db() as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT id, username, email, role, tenant_id, password_hash FROM users WHERE username = ?",
+                (request.username,),
+            )
+            return cur.fetchone()
+
+    user_row = await run_db(lookup)
 
     if user_row:
         user_id, username, email, role, tenant_id, stored_hash = user_row
-        if verify_password(request.password, stored_hash):
+        if await password_hasher.verify(request.password, stored_hash):
             return {"status": "authenticated", "user_id": user_id, "username": username,
                     "email": email, "role": role, "tenant_id": tenant_id}
 
@@ -452,80 +917,281 @@ async def register(request: Request):
     if not username or not password:
         raise HTTPException(status_code=400, detail="Username and password required")
 
-    conn = get_db()
+    password_hash = await password_hasher.hash(password)
+
+    def insert():
+        with get_db() as conn:
+            conn.execute(
+                "INSERT INTO users (username, password_hash, email, tenant_id) VALUES (?, ?, ?, ?)",
+                (username, password_hash, email, tenant_id),
+            )
+            conn.commit()
+
     try:
-        conn.execute(
-            "INSERT INTO users (username, password_hash, email, tenant_id) VALUES (?, ?, ?, ?)",
-            (username, hash_password(password), email, tenant_id),
-        )
-        conn.commit()
-        return {"status": "registered", "username": username}
+        await run_db(insert)
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(status_code=400, detail="Registration failed. Username may already exist.")
-    finally:
-        conn.close()
+    return {"status": "registered", "username": username}
 
 
 # =============================================================================
 # Logs (NIST AU-2)
 # =============================================================================
 @app.get("/api/logs")
-async def get_logs(tenant_id: Optional[str] = None, limit: int = 100):
+async def get_logs(tenant_id: Optional[str] = None, limit: int = 100, cursor: Optional[str] = None,
+                   since: Optional[str] = None, until: Optional[str] = None):
     if not tenant_id:
         raise HTTPException(status_code=400, detail="tenant_id is required")
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT * FROM logs WHERE tenant_id = ? ORDER BY created_at DESC LIMIT ?",
-        (tenant_id, min(limit, 1000)),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return {"logs": [{"id": r[0], "tenant_id": r[1], "level": r[2], "message": r[3],
-                      "source": r[4], "timestamp": r[5]} for r in rows],
-            "count": len(rows)}
+    size = page_size(limit)
+    clause, range_params = _time_range_clause(since, until)
+    query = f"SELECT {select_list(LOG_COLUMNS, rename={'created_at': 'timestamp'})} FROM logs WHERE tenant_id = ?{clause}"
+    params = [tenant_id, *range_params]
+    if cursor:
+        query += " AND (created_at, id) < (?, ?)"
+        params += decode_cursor(cursor, "logs", 2)
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(size + 1)
+
+    def fetch():
+        with get_read_db(tenant_id) as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            return fetch_records(cur)
+
+    rows, next_cursor = paginate(await run_db(fetch), size, "logs", lambda r: (r["timestamp"], r["id"]))
+    return FastJSONResponse({"logs": rows, "count": len(rows), "next_cursor": next_cursor})
+
+
+@app.get("/api/logs/export")
+async def export_logs(tenant_id: Optional[str] = None, fmt: str = Query("ndjson", alias="format"),
+                      level: Optional[str] = None, source: Optional[str] = None,
+                      since: Optional[str] = None, until: Optional[str] = None):
+    """Full log history for audit evidence (AU-6), streamed oldest first."""
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="tenant_id is required")
+    query = f"SELECT {select_list(LOG_COLUMNS)} FROM logs WHERE tenant_id = ?"
+    params = [tenant_id]
+    if level:
+        query += " AND level = ?"
+        params.append(level.upper())
+    if source:
+        query += " AND source = ?"
+        params.append(source)
+    clause, range_params = _time_range_clause(since, until)
+    query += clause + " ORDER BY created_at, id"
+    return _stream_export(f"logs-{tenant_id}", fmt, query, params + range_params, LOG_COLUMNS, tenant_id)
 
 
 @app.post("/api/logs")
-async def create_log(log: LogRequest):
-    conn = get_db()
-    conn.execute(
-        "INSERT INTO logs (tenant_id, level, message, source) VALUES (?, ?, ?, ?)",
-        (log.tenant_id, log.level, log.message, log.source),
+async def create_log(log: LogRequest, durable: bool = True):
+    """Write one log event; ?durable=false returns once it is buffered (write-behind mode)."""
+    committed = await write_behind.submit("logs", (log.tenant_id, log.level, log.message, log.source),
+                                          wait=durable)
+    return write_response(committed, {"status": "created", "tenant_id": log.tenant_id})
+
+
+@app.post("/api/logs/bulk")
+async def bulk_ingest_logs(request: Request):
+    """Ingest a JSON array or an NDJSON stream of log events.
+
+    Each chunk is written while the next one is parsed. The response counts
+    accepted and rejected rows and lists the first rejected rows by index.
+    """
+    if is_ndjson(request.headers.get("content-type")):
+        items = ndjson_items(request.stream(), INGEST_MAX_LINE_BYTES)
+    else:
+        items = json_array_items(request.stream(), INGEST_MAX_BODY_BYTES)
+
+    def write(chunk):
+        with get_db() as conn:
+            try:
+                inserted, failed = insert_chunk(conn, chunk)
+            except ChunkInterrupted as exc:
+                # Rows committed before the failure still reach live tail and correlation
+                committed = set(exc.committed)
+                _logs_written(conn, [row for index, row in chunk if index in committed])
+                raise exc.__cause__
+            rejected_rows = {index for index, _ in failed}
+            written = [row for index, row in chunk if index not in rejected_rows]
+            publish_live("log", LOG_INSERT_COLUMNS, written, stamp="timestamp")
+            alerted = _correlate_committed(conn, written)
+            return inserted, failed, alerted
+
+    accepted, rejected, errors = 0, 0, []
+    tenants, alerted_tenants = set(), set()
+
+    def reject(index, message):
+        nonlocal rejected
+        rejected += 1
+        if len(errors) < INGEST_MAX_REPORTED_ERRORS:
+            errors.append({"index": index, "error": message})
+
+    async def settle(pending):
+        nonlocal accepted
+        inserted, failed, alerted = await pending
+        accepted += inserted
+        alerted_tenants.update(alerted)
+        for index, message in failed:
+            reject(index, message)
+
+    chunk, pending = [], None
+    try:
+        async for index, item in items:
+            try:
+                row = validate_row(LogRequest, item)
+            except ValueError as exc:
+                reject(index, str(exc))
+            else:
+                chunk.append((index, row))
+                tenants.add(row[0])
+            if len(chunk) >= INGEST_CHUNK_ROWS:
+                if pending:
+                    await settle(pending)
+                pending, chunk = asyncio.ensure_future(run_db(write, chunk)), []
+        if chunk:
+            await settle(run_db(write, chunk))
+    except BodyTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        if pending:
+            await settle(pending)
+        for tenant_id in tenants:
+            invalidate_tenant(tenant_id, "stats")
+        for tenant_id in alerted_tenants:
+            invalidate_tenant(tenant_id, "alerts")
+
+    return {
+        "status": "ingested" if not rejected else "partial" if accepted else "rejected",
+        "accepted": accepted,
+        "rejected": rejected,
+        "errors": errors,
+        "errors_truncated": rejected > len(errors),
+    }
+
+
+@app.get("/api/live")
+async def live_tail(request: Request, tenant_id: Optional[str] = None, types: Optional[str] = None,
+                    last_event_id: Optional[str] = None):
+    """Server-Sent Events stream of a tenant's new logs, alerts and findings (SI-4).
+
+    `types` is a comma-separated subset of log, alert, finding. Reconnecting
+    clients resume from the Last-Event-ID header (or ?last_event_id=); a
+    "reset" event means the gap could not be replayed and the client should
+    refetch. Slow consumers are disconnected and resume the same way.
+    """
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="tenant_id is required")
+    wanted = [t.strip() for t in types.split(",") if t.strip()] if types else list(LIVE_EVENT_TYPES)
+    unknown = set(wanted) - set(LIVE_EVENT_TYPES)
+    if unknown or not wanted:
+        raise HTTPException(status_code=400, detail=f"types must be drawn from: {', '.join(LIVE_EVENT_TYPES)}")
+    subscription = live_hub.subscribe(tenant_id, wanted, request.headers.get("last-event-id") or last_event_id)
+    return StreamingResponse(
+        live_hub.stream(subscription, heartbeat=LIVE_HEARTBEAT),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    conn.commit()
-    conn.close()
-    return {"status": "created", "tenant_id": log.tenant_id}
+
+
+# =============================================================================
+# Log Retention (NIST AU-11)
+# =============================================================================
+@app.get("/api/retention")
+async def get_log_retention(tenant_id: Optional[str] = None):
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="tenant_id is required")
+
+    def query():
+        with get_db() as conn:
+            cur = conn.execute("SELECT retention_days, updated_at FROM log_retention WHERE tenant_id = ?", (tenant_id,))
+            return cur.fetchone()
+
+    row = await run_db(query)
+    return {
+        "tenant_id": tenant_id,
+        "retention_days": row[0] if row else LOG_RETENTION_DAYS,
+        "policy": "tenant" if row else "default",
+        "updated_at": row[1] if row else None,
+        "default_days": LOG_RETENTION_DAYS,
+        "minimum_days": LOG_RETENTION_MIN_DAYS,
+    }
+
+
+@app.post("/api/retention")
+async def set_log_retention(policy: RetentionRequest):
+    if policy.retention_days < LOG_RETENTION_MIN_DAYS:
+        raise HTTPException(status_code=400,
+                            detail=f"retention_days must be at least {LOG_RETENTION_MIN_DAYS} (AU-11)")
+
+    def upsert():
+        with get_db() as conn:
+            conn.execute(
+                "INSERT INTO log_retention (tenant_id, retention_days, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)"
+                " ON CONFLICT (tenant_id) DO UPDATE SET retention_days = excluded.retention_days,"
+                " updated_at = excluded.updated_at",
+                (policy.tenant_id, policy.retention_days),
+            )
+            conn.commit()
+
+    await run_db(upsert)
+    return {"status": "updated", "tenant_id": policy.tenant_id, "retention_days": policy.retention_days}
+
+
+@app.delete("/api/retention/{tenant_id}")
+async def reset_log_retention(tenant_id: str):
+    def delete():
+        with get_db() as conn:
+            conn.execute("DELETE FROM log_retention WHERE tenant_id = ?", (tenant_id,))
+            conn.commit()
+
+    await run_db(delete)
+    return {"status": "reset", "tenant_id": tenant_id, "retention_days": LOG_RETENTION_DAYS}
+
+
+@app.post("/api/retention/purge")
+async def purge_expired_logs():
+    """Apply retention now instead of waiting for the next LOG_PURGE_INTERVAL."""
+    return await run_db(run_log_purge)
 
 
 # =============================================================================
 # Alerts
 # =============================================================================
 @app.get("/api/alerts")
-async def get_alerts(tenant_id: Optional[str] = None):
+async def get_alerts(tenant_id: Optional[str] = None, limit: int = 100, cursor: Optional[str] = None):
     if not tenant_id:
         raise HTTPException(status_code=400, detail="tenant_id is required")
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM alerts WHERE tenant_id = ? ORDER BY created_at DESC", (tenant_id,))
-    rows = cur.fetchall()
-    conn.close()
-    return {"alerts": [{"id": r[0], "tenant_id": r[1], "severity": r[2], "title": r[3],
-                        "description": r[4], "source": r[5], "nist_control": r[6],
-                        "created_at": r[7]} for r in rows],
-            "count": len(rows)}
+    size = page_size(limit)
+    query = f"SELECT {select_list(ALERT_COLUMNS)} FROM alerts WHERE tenant_id = ?"
+    params = [tenant_id]
+    if cursor:
+        query += " AND (created_at, id) < (?, ?)"
+        params += decode_cursor(cursor, "alerts", 2)
+    query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(size + 1)
+
+    def fetch():
+        with get_read_db(tenant_id) as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            return fetch_records(cur)
+
+    async def page():
+        rows, next_cursor = paginate(await run_db(fetch), size, "alerts", lambda r: (r["created_at"], r["id"]))
+        return {"alerts": rows, "count": len(rows), "next_cursor": next_cursor}
+
+    return FastJSONResponse(await cached("alerts", tenant_id, page, limit=size, cursor=cursor))
 
 
 @app.post("/api/alerts")
-async def create_alert(alert: AlertRequest):
-    conn = get_db()
-    conn.execute(
-        "INSERT INTO alerts (tenant_id, severity, title, description) VALUES (?, ?, ?, ?)",
-        (alert.tenant_id, alert.severity, alert.title, alert.description),
-    )
-    conn.commit()
-    conn.close()
-    return {"status": "created"}
+async def create_alert(alert: AlertRequest, durable: bool = True):
+    committed = await write_behind.submit(
+        "alerts", (alert.tenant_id, alert.severity, alert.title, alert.description), wait=durable)
+    return write_response(committed, {"status": "created"})
 
 
 # =============================================================================
@@ -533,32 +1199,70 @@ async def create_alert(alert: AlertRequest):
 # =============================================================================
 @app.get("/api/findings")
 async def get_findings(tenant_id: Optional[str] = None, severity: Optional[str] = None,
-                       source: Optional[str] = None, nist_control: Optional[str] = None):
+                       source: Optional[str] = None, nist_control: Optional[str] = None,
+                       limit: int = 100, cursor: Optional[str] = None):
     if not tenant_id:
         raise HTTPException(status_code=400, detail="tenant_id is required")
-    conn = get_db()
-    cur = conn.cursor()
-    query = "SELECT * FROM findings WHERE tenant_id = ?"
+    size = page_size(limit)
+    query = f"SELECT {select_list(FINDING_COLUMNS)} FROM findings WHERE tenant_id = ?"
     params = [tenant_id]
     if severity:
-        query += " AND severity = ?"
-        params.append(severity.upper())
+        clause, severity_params = _severity_filter(severity)
+        query += clause
+        params += severity_params
     if source:
         query += " AND source = ?"
         params.append(source)
     if nist_control:
         query += " AND nist_control = ?"
         params.append(nist_control)
-    query += " ORDER BY CASE severity WHEN 'CRITICAL' THEN 0 WHEN 'HIGH' THEN 1 WHEN 'MEDIUM' THEN 2 WHEN 'LOW' THEN 3 ELSE 4 END, created_at DESC"
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
-    return {"findings": [{"id": r[0], "tenant_id": r[1], "source": r[2], "finding_type": r[3],
-                          "severity": r[4], "title": r[5], "description": r[6], "asset_type": r[7],
-                          "asset_id": r[8], "namespace": r[9], "cve_id": r[10], "mitre_tactic": r[11],
-                          "mitre_technique": r[12], "remediation": r[13], "nist_control": r[14],
-                          "rank": r[15], "status": r[16], "created_at": r[17]} for r in rows],
-            "count": len(rows)}
+    if cursor:
+        # Severity ascends while (created_at, id) descends, so no single row comparison
+        query += " AND (severity_rank > ? OR (severity_rank = ? AND (created_at, id) < (?, ?)))"
+        rank, created_at, last_id = decode_cursor(cursor, "findings", 3)
+        params += [rank, rank, created_at, last_id]
+    query += " ORDER BY severity_rank, created_at DESC, id DESC LIMIT ?"
+    params.append(size + 1)
+
+    def fetch():
+        with get_read_db(tenant_id) as conn:
+            cur = conn.cursor()
+            cur.execute(query, params)
+            return fetch_records(cur)
+
+    async def page():
+        rows, next_cursor = paginate(await run_db(fetch), size, "findings",
+                                     lambda r: (severity_rank(r["severity"]), r["created_at"], r["id"]))
+        return {"findings": rows, "count": len(rows), "next_cursor": next_cursor}
+
+    return FastJSONResponse(await cached("findings", tenant_id, page, severity=severity, source=source,
+                                         nist_control=nist_control, limit=size, cursor=cursor))
+
+
+@app.get("/api/findings/export")
+async def export_findings(tenant_id: Optional[str] = None, fmt: str = Query("ndjson", alias="format"),
+                          severity: Optional[str] = None, source: Optional[str] = None,
+                          nist_control: Optional[str] = None,
+                          since: Optional[str] = None, until: Optional[str] = None):
+    """Findings evidence for 3PAO review, same filters as /api/findings plus a time range."""
+    if not tenant_id:
+        raise HTTPException(status_code=400, detail="tenant_id is required")
+    query = f"SELECT {select_list(FINDING_COLUMNS)} FROM findings WHERE tenant_id = ?"
+    params = [tenant_id]
+    if severity:
+        clause, severity_params = _severity_filter(severity)
+        query += clause
+        params += severity_params
+    if source:
+        query += " AND source = ?"
+        params.append(source)
+    if nist_control:
+        query += " AND nist_control = ?"
+        params.append(nist_control)
+    clause, range_params = _time_range_clause(since, until)
+    query += clause + " ORDER BY created_at, id"
+    return _stream_export(f"findings-{tenant_id}", fmt, query, params + range_params, FINDING_COLUMNS,
+                          tenant_id)
 
 
 # =============================================================================
@@ -568,232 +1272,374 @@ async def get_findings(tenant_id: Optional[str] = None, severity: Optional[str]
 async def get_vendors(tenant_id: Optional[str] = None):
     if not tenant_id:
         raise HTTPException(status_code=400, detail="tenant_id is required")
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM vendors WHERE tenant_id = ? ORDER BY created_at DESC", (tenant_id,))
-    rows = cur.fetchall()
-    conn.close()
+
+    def query():
+        with get_read_db(tenant_id) as conn:
+            cur = conn.cursor()
+            cur.execute(
+                f"SELECT {select_list(VENDOR_COLUMNS)} FROM vendors WHERE tenant_id = ? ORDER BY created_at DESC",
+                (tenant_id,),
+            )
+            return fetch_records(cur)
+
+    rows = await run_db(query)
     # INTENTIONAL: API keys returned in plaintext — no masking
-    return {"vendors": [{"id": r[0], "tenant_id": r[1], "name": r[2], "vendor_type": r[3],
-                         "api_endpoint": r[4], "api_key": r[5], "status": r[6],
-                         "last_scan": r[7], "created_at": r[8]} for r in rows],
-            "count": len(rows)}
+    return FastJSONResponse({"vendors": rows, "count": len(rows)})
 
 
 @app.post("/api/vendors")
-async def add_vendor(vendor: VendorRequest):
-    conn = get_db()
+async def add_vendor(vendor: VendorRequest, durable: bool = True):
     # INTENTIONAL: Stores API key in plaintext (IA-5 violation)
-    conn.execute(
-        "INSERT INTO vendors (tenant_id, name, vendor_type, api_endpoint, api_key, status) VALUES (?, ?, ?, ?, ?, ?)",
-        (vendor.tenant_id, vendor.name, vendor.vendor_type, vendor.api_endpoint, vendor.api_key, "disconnected"),
-    )
-    conn.commit()
-    conn.close()
-    return {"status": "created", "name": vendor.name}
+    row = (vendor.tenant_id, vendor.name, vendor.vendor_type, vendor.api_endpoint, vendor.api_key, "disconnected")
+    committed = await write_behind.submit("vendors", row, wait=durable)
+    return write_response(committed, {"status": "created", "name": vendor.name})
 
 
 @app.post("/api/vendors/{vendor_id}/connect")
 async def connect_vendor(vendor_id: int):
-    conn = get_db()
-    conn.execute("UPDATE vendors SET status = 'connected' WHERE id = ?", (vendor_id,))
-    conn.commit()
-    conn.close()
+    def update():
+        with get_db() as conn:
+            cur = conn.execute("SELECT tenant_id FROM vendors WHERE id = ?", (vendor_id,))
+            row = cur.fetchone()
+            conn.execute("UPDATE vendors SET status = 'connected' WHERE id = ?", (vendor_id,))
+            conn.commit()
+            return row[0] if row else None
+
+    tenant_id = await run_db(update)
+    if tenant_id is not None:
+        invalidate_tenant(tenant_id, "stats")
     return {"status": "connected", "vendor_id": vendor_id}
 
 
-@app.post("/api/vendors/{vendor_id}/scan")
-async def trigger_vendor_scan(vendor_id: int):
-    """Simulate a vendor scan — generates realistic findings."""
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT tenant_id, name, vendor_type FROM vendors WHERE id = ?", (vendor_id,))
-    vendor = cur.fetchone()
-    if not vendor:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Vendor not found")
+SCAN_ASSETS = ["anthra-api", "anthra-worker", "anthra-ingest", "va-api", "gsa-api",
+               "prod-node-1", "staging-node-1", "anthra-logs-prod", "sg-0a1b2c3d"]
+
 
-    tenant_id, vendor_name, vendor_type = vendor
+def _simulate_findings(vendor_type):
+    """Simulate a vendor scan — 1-3 realistic findings from the vendor's templates."""
     templates = VENDOR_SCAN_TEMPLATES.get(vendor_type, [])
-    if not templates:
-        conn.close()
-        return {"status": "no_templates", "message": f"No scan templates for {vendor_type}"}
-
-    # Pick 1-3 random findings from templates
-    selected = random.sample(templates, min(len(templates), random.randint(1, 3)))
-    generated = []
-    assets = ["anthra-api", "anthra-worker", "anthra-ingest", "va-api", "gsa-api",
-              "prod-node-1", "staging-node-1", "anthra-logs-prod", "sg-0a1b2c3d"]
-
-    for tmpl in selected:
-        finding_type, severity, title, desc, asset_type, tactic, technique, remediation, nist, rank = tmpl
-        asset = random.choice(assets)
-        cve_id = None
-        if "CVE-" in title:
-            cve_id = title.split(":")[0]
+    selected = random.sample(templates, min(len(templates), random.randint(1, 3))) if templates else []
+    findings = []
+    for finding_type, severity, title, desc, asset_type, tactic, technique, remediation, nist, rank in selected:
+        asset = random.choice(SCAN_ASSETS)
+        cve_id = title.split(":")[0] if "CVE-" in title else None
+        findings.append((finding_type, severity, title, desc.replace("{asset}", asset), asset_type, asset,
+                         cve_id, tactic, technique, remediation, nist, rank))
+    return findings
+
+
+def _finish_scan_job(job_id, status, result=None, error=None):
+    with get_db() as conn:
+        conn.execute(
+            "UPDATE scan_jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, datetime.utcnow(), job_id),
+        )
+        conn.commit()
+
+
+def _write_scan(job_id, vendor_id):
+    """Generate a vendor's findings and write them SCAN_BATCH_ROWS at a time.
+
+    Returns (tenant_id, status, result, error) for the job record.
+    """
+    with get_db() as conn:
+        cur = conn.execute("SELECT tenant_id, name, vendor_type FROM vendors WHERE id = ?", (vendor_id,))
+        vendor = cur.fetchone()
+        if not vendor:
+            return None, FAILED, None, "Vendor not found"
+        tenant_id, vendor_name, vendor_type = vendor
+        if not VENDOR_SCAN_TEMPLATES.get(vendor_type):
+            return None, SUCCEEDED, {"status": "no_templates", "message": f"No scan templates for {vendor_type}"}, None
 
+        findings = _simulate_findings(vendor_type)
         conn.execute(
-            "INSERT INTO findings (tenant_id, source, finding_type, severity, title, description, asset_type, asset_id, namespace, cve_id, mitre_tactic, mitre_technique, remediation, nist_control, rank, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-            (tenant_id, vendor_type, finding_type, severity, title,
-             desc.replace("{asset}", asset), asset_type, asset, "default",
-             cve_id, tactic, technique, remediation, nist, rank, "open"),
+            "UPDATE scan_jobs SET status = ?, started_at = ?, findings_total = ? WHERE id = ?",
+            (RUNNING, datetime.utcnow(), len(findings), job_id),
         )
-        generated.append({"severity": severity, "title": title})
+        conn.commit()
+
+        # One transaction per batch: findings, their scan log lines, and the job's progress
+        for start in range(0, len(findings), SCAN_BATCH_ROWS):
+            batch = findings[start:start + SCAN_BATCH_ROWS]
+            finding_rows = [
+                (tenant_id, vendor_type, ftype, severity, title, desc, asset_type, asset, "default",
+                 cve_id, tactic, technique, remediation, nist, rank, "open")
+                for ftype, severity, title, desc, asset_type, asset, cve_id, tactic, technique,
+                    remediation, nist, rank in batch
+            ]
+            log_rows = [(tenant_id, "WARN" if severity_rank(f[1]) <= SEVERITY_RANK["HIGH"] else "INFO",
+                         f"{vendor_name} scan: {f[2]}", vendor_type) for f in batch]
+            upsert_findings(conn, finding_rows)
+            conn.executemany("INSERT INTO logs (tenant_id, level, message, source) VALUES (?, ?, ?, ?)", log_rows)
+            conn.execute("UPDATE scan_jobs SET findings_written = ? WHERE id = ?", (start + len(batch), job_id))
+            conn.commit()
+            publish_live("finding", UPSERT_COLUMNS, finding_rows)
+            publish_live("log", LOG_INSERT_COLUMNS, log_rows, stamp="timestamp")
 
-        # Also create a log entry for the scan
         conn.execute(
-            "INSERT INTO logs (tenant_id, level, message, source) VALUES (?, ?, ?, ?)",
-            (tenant_id, "WARN" if severity in ("CRITICAL", "HIGH") else "INFO",
-             f"{vendor_name} scan: {title}", vendor_type),
+            "UPDATE vendors SET last_scan = ?, status = 'connected' WHERE id = ?",
+            (datetime.utcnow().isoformat(), vendor_id),
         )
+        conn.commit()
+
+    return tenant_id, SUCCEEDED, {
+        "status": "scan_complete", "vendor": vendor_name, "findings_generated": len(findings),
+        "findings": [{"severity": f[1], "title": f[2]} for f in findings],
+    }, None
+
+
+def _run_scan_job(job_id, vendor_id):
+    """ScanWorkerPool entry point: run one job and record its outcome."""
+    try:
+        tenant_id, status, result, error = _write_scan(job_id, vendor_id)
+    except Exception as exc:
+        # SI-11: the job record carries a generic message; details go to the server log
+        print(f"ERROR: scan job {job_id} for vendor {vendor_id} failed: {exc}")
+        tenant_id, status, result, error = None, FAILED, None, "Scan failed. Please contact support."
+    _finish_scan_job(job_id, status, result, error)
+    if tenant_id is not None:
+        invalidate_tenant(tenant_id, "findings", "stats")
 
-    # Update last_scan timestamp
-    conn.execute(
-        "UPDATE vendors SET last_scan = ?, status = 'connected' WHERE id = ?",
-        (datetime.utcnow().isoformat(), vendor_id),
-    )
-    conn.commit()
-    conn.close()
 
-    return {"status": "scan_complete", "vendor": vendor_name, "findings_generated": len(generated),
-            "findings": generated}
+scan_workers = ScanWorkerPool(_run_scan_job, workers=SCAN_WORKERS, max_per_vendor=SCAN_MAX_PER_VENDOR)
+
+
+def _recover_scan_jobs():
+    """Requeue jobs left queued by the last process; ones caught mid-run are failed."""
+    with get_db() as conn:
+        conn.execute(
+            "UPDATE scan_jobs SET status = ?, error = ?, finished_at = ? WHERE status = ?",
+            (FAILED, "Interrupted by a service restart", datetime.utcnow(), RUNNING),
+        )
+        cur = conn.execute("SELECT id, vendor_id FROM scan_jobs WHERE status = ? ORDER BY created_at", (QUEUED,))
+        queued = cur.fetchall()
+        conn.commit()
+    for job_id, vendor_id in queued:
+        scan_workers.submit(job_id, vendor_id)
+
+
+def _scan_job_record(row):
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["progress"] = progress(job)
+    return job
+
+
+def _pollable_vendors():
+    with get_db() as conn:
+        cur = conn.execute(
+            "SELECT id, tenant_id, name, vendor_type, api_endpoint, api_key, poll_watermark FROM vendors "
+            "WHERE status = 'connected' AND (api_endpoint LIKE 'http://%' OR api_endpoint LIKE 'https://%')"
+        )
+        return fetch_records(cur)
+
+
+def _save_polled_findings(vendor, findings, watermark):
+    """Write one poll's findings and advance the vendor's watermark in the same transaction."""
+    rows = [(vendor["tenant_id"],) + finding for finding in findings]
+    with get_db() as conn:
+        upsert_findings(conn, rows)
+        conn.execute(
+            "UPDATE vendors SET poll_watermark = ?, last_scan = ? WHERE id = ?",
+            (watermark, datetime.utcnow().isoformat(), vendor["id"]),
+        )
+        conn.commit()
+    publish_live("finding", UPSERT_COLUMNS, rows)
+
+
+async def _load_pollable_vendors():
+    return await run_db(_pollable_vendors)
+
+
+async def _store_polled_findings(vendor, findings, watermark):
+    await run_db(_save_polled_findings, vendor, findings, watermark)
+    if findings:
+        invalidate_tenant(vendor["tenant_id"], "findings", "stats")
+
+
+vendor_poller = VendorPoller(
+    _load_pollable_vendors, _store_polled_findings, interval=VENDOR_POLL_INTERVAL,
+    concurrency=VENDOR_POLL_CONCURRENCY, per_host=VENDOR_POLL_PER_HOST, timeout=VENDOR_POLL_TIMEOUT,
+    page_size=VENDOR_POLL_PAGE_SIZE, max_pages=VENDOR_POLL_MAX_PAGES,
+)
+
+
+@app.post("/api/vendors/{vendor_id}/scan", status_code=202)
+async def trigger_vendor_scan(vendor_id: int):
+    """Queue a vendor scan; poll status_url for progress and the result."""
+    job_id = new_job_id()
+
+    def enqueue():
+        with get_db() as conn:
+            cur = conn.execute("SELECT tenant_id FROM vendors WHERE id = ?", (vendor_id,))
+            vendor = cur.fetchone()
+            if not vendor:
+                return False
+            conn.execute(
+                "INSERT INTO scan_jobs (id, vendor_id, tenant_id, status) VALUES (?, ?, ?, ?)",
+                (job_id, vendor_id, vendor[0], QUEUED),
+            )
+            conn.commit()
+            return True
+
+    if not await run_db(enqueue):
+        raise HTTPException(status_code=404, detail="Vendor not found")
+    scan_workers.submit(job_id, vendor_id)
+    return {"job_id": job_id, "status": QUEUED, "vendor_id": vendor_id, "status_url": f"/api/scans/{job_id}"}
+
+
+@app.get("/api/scans/{job_id}")
+async def get_scan_job(job_id: str):
+    def query():
+        with get_db() as conn:
+            cur = conn.execute(f"SELECT {select_list(SCAN_JOB_COLUMNS)} FROM scan_jobs WHERE id = ?", (job_id,))
+            rows = fetch_records(cur)
+            return rows[0] if rows else None
+
+    job = await run_db(query)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Scan job not found")
+    return _scan_job_record(job)
+
+
+@app.get("/api/vendors/{vendor_id}/scans")
+async def get_vendor_scan_jobs(vendor_id: int, limit: int = 20):
+    def query():
+        with get_db() as conn:
+            cur = conn.execute(
+                f"SELECT {select_list(SCAN_JOB_COLUMNS)} FROM scan_jobs WHERE vendor_id = ? "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (vendor_id, max(1, min(limit, 100))),
+            )
+            return fetch_records(cur)
+
+    jobs = [_scan_job_record(row) for row in await run_db(query)]
+    return FastJSONResponse({"scans": jobs, "count": len(jobs)})
 
 
 @app.delete("/api/vendors/{vendor_id}")
 async def delete_vendor(vendor_id: int):
-    conn = get_db()
-    conn.execute("DELETE FROM vendors WHERE id = ?", (vendor_id,))
-    conn.commit()
-    conn.close()
+    def delete():
+        with get_db() as conn:
+            cur = conn.execute("SELECT tenant_id FROM vendors WHERE id = ?", (vendor_id,))
+            row = cur.fetchone()
+            conn.execute("DELETE FROM vendors WHERE id = ?", (vendor_id,))
+            conn.commit()
+            return row[0] if row else None
+
+    tenant_id = await run_db(delete)
+    if tenant_id is not None:
+        invalidate_tenant(tenant_id, "stats")
     return {"status": "deleted", "vendor_id": vendor_id}
 
 
 # =============================================================================
 # SSP & Compliance (NIST CA-2, PL-2)
 # =============================================================================
+SSP_DOCUMENT = PrecompressedJSON({
+    "system_name": "Anthra Security Platform (NovaSec Cloud)",
+    "csp": "Anthra Security Inc.",
+    "authorization_level": "FedRAMP Moderate",
+    "nist_revision": "NIST 800-53 Rev 5",
+    "total_controls": len(CATALOG.controls),
+    "authorization_boundary": "AWS GovCloud (us-gov-west-1) — EKS cluster, RDS PostgreSQL, S3, CloudWatch",
+    "last_updated": "2026-03-16",
+    "assessor": "Ghost Protocol (LinkOps Industries)",
+    "3pao": "Pending Selection",
+    "ato_status": "In Progress — Pre-Assessment",
+    "controls": CATALOG.controls,
+}, max_age=SSP_CACHE_MAX_AGE)
+
+POAM_DOCUMENT = PrecompressedJSON({
+    "title": "POA&M — Anthra Security Platform",
+    "system": "Anthra Center",
+    "last_updated": "2026-03-10",
+    "items": CATALOG.poam_items,
+    "summary": CATALOG.poam_summary,
+}, max_age=SSP_CACHE_MAX_AGE)
+
+
 @app.get("/api/ssp")
-async def get_ssp():
+async def get_ssp(request: Request):
     """Return System Security Plan overview and control implementation details."""
-    return {
-        "system_name": "Anthra Security Platform (NovaSec Cloud)",
-        "csp": "Anthra Security Inc.",
-        "authorization_level": "FedRAMP Moderate",
-        "nist_revision": "NIST 800-53 Rev 5",
-        "total_controls": len(SSP_CONTROLS),
-        "authorization_boundary": "AWS GovCloud (us-gov-west-1) — EKS cluster, RDS PostgreSQL, S3, CloudWatch",
-        "last_updated": "2026-03-16",
-        "assessor": "Ghost Protocol (LinkOps Industries)",
-        "3pao": "Pending Selection",
-        "ato_status": "In Progress — Pre-Assessment",
-        "controls": SSP_CONTROLS,
-    }
+    return SSP_DOCUMENT.response(request)
+
+
+async def _open_findings_by_control(tenant_id):
+    """{control_id: open finding count} for one tenant; shared by the family and control views."""
+    def count_open():
+        with get_read_db(tenant_id) as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT nist_control, COUNT(*) FROM findings WHERE tenant_id = ? AND status = 'open' GROUP BY nist_control",
+                (tenant_id,),
+            )
+            return dict(cur.fetchall())
+
+    async def compute():
+        return await run_db(count_open)
+
+    # Tagged with findings: a scan that adds findings invalidates it
+    return await cached("findings", tenant_id, compute, view="open_by_control")
 
 
 @app.get("/api/ssp/families")
 async def get_control_families(tenant_id: Optional[str] = None):
     """Control family summary with findings cross-reference."""
-    # Build family summaries from SSP data
-    families = {}
-    for ctrl in SSP_CONTROLS:
-        fam = ctrl["family"]
-        if fam not in families:
-            families[fam] = {"family": fam, "controls": [], "implemented": 0, "partial": 0,
-                             "not_implemented": 0, "inherited": 0, "findings": 0}
-        families[fam]["controls"].append(ctrl)
-        if ctrl["status"] == "Implemented":
-            families[fam]["implemented"] += 1
-        elif ctrl["status"] == "Partially Implemented":
-            families[fam]["partial"] += 1
-        elif ctrl["status"] == "Inherited":
-            families[fam]["inherited"] += 1
-        else:
-            families[fam]["not_implemented"] += 1
+    families = list(CATALOG.families.values())
+    if tenant_id:
+        finding_counts = await _open_findings_by_control(tenant_id)
+        families = [CATALOG.with_findings(fam, finding_counts) for fam in families]
+    return {"families": families, "total_families": len(families)}
 
-    # Cross-reference with live findings
+
+@app.get("/api/ssp/families/{family}")
+async def get_control_family(family: str, tenant_id: Optional[str] = None):
+    """One control family, without serializing the rest of the SSP."""
+    summary = CATALOG.family(family)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Control family not found")
     if tenant_id:
-        conn = get_db()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT nist_control, COUNT(*) FROM findings WHERE tenant_id = ? AND status = 'open' GROUP BY nist_control",
-            (tenant_id,),
-        )
-        finding_counts = dict(cur.fetchall())
-        conn.close()
-
-        for fam_data in families.values():
-            for ctrl in fam_data["controls"]:
-                ctrl_findings = finding_counts.get(ctrl["control_id"], 0)
-                # Also match family prefix (e.g., findings tagged "SI-2" match SI family)
-                ctrl["open_findings"] = ctrl_findings
-                fam_data["findings"] += ctrl_findings
-
-    FAMILY_NAMES = {
-        "AC": "Access Control", "AU": "Audit and Accountability", "AT": "Awareness and Training",
-        "CA": "Security Assessment and Authorization", "CM": "Configuration Management",
-        "CP": "Contingency Planning", "IA": "Identification and Authentication",
-        "IR": "Incident Response", "MA": "Maintenance", "MP": "Media Protection",
-        "PE": "Physical and Environmental Protection", "PL": "Planning",
-        "PM": "Program Management", "PS": "Personnel Security", "RA": "Risk Assessment",
-        "SA": "System and Services Acquisition", "SC": "System and Communications Protection",
-        "SI": "System and Information Integrity",
-    }
+        summary = CATALOG.with_findings(summary, await _open_findings_by_control(tenant_id))
+    return summary
+
 
-    result = []
-    for fam_id, fam_data in sorted(families.items()):
-        total = len(fam_data["controls"])
-        result.append({
-            "family": fam_id,
-            "name": FAMILY_NAMES.get(fam_id, fam_id),
-            "total_controls": total,
-            "implemented": fam_data["implemented"],
-            "partial": fam_data["partial"],
-            "not_implemented": fam_data["not_implemented"],
-            "inherited": fam_data["inherited"],
-            "open_findings": fam_data["findings"],
-            "compliance_pct": round(((fam_data["implemented"] + fam_data["inherited"]) / total * 100) if total else 0),
-            "controls": fam_data["controls"],
-        })
-
-    return {"families": result, "total_families": len(result)}
+@app.get("/api/ssp/controls/{control_id}")
+async def get_control(control_id: str, tenant_id: Optional[str] = None):
+    """A single SSP control, with the tenant's open findings against it."""
+    ctrl = CATALOG.control(control_id)
+    if ctrl is None:
+        raise HTTPException(status_code=404, detail="Control not found")
+    if tenant_id:
+        return CATALOG.control_with_findings(ctrl, await _open_findings_by_control(tenant_id))
+    return ctrl
 
 
 @app.get("/api/ssp/poam")
-async def get_poam():
+async def get_poam(request: Request):
     """Plan of Action & Milestones — required FedRAMP artifact."""
-    return {
-        "title": "POA&M — Anthra Security Platform",
-        "system": "Anthra Center",
-        "last_updated": "2026-03-10",
-        "items": POAM_ITEMS,
-        "summary": {
-            "total": len(POAM_ITEMS),
-            "open": sum(1 for i in POAM_ITEMS if i["status"] == "Open"),
-            "in_progress": sum(1 for i in POAM_ITEMS if i["status"] == "In Progress"),
-            "planned": sum(1 for i in POAM_ITEMS if i["status"] == "Planned"),
-            "critical": sum(1 for i in POAM_ITEMS if i["severity"] == "CRITICAL"),
-            "high": sum(1 for i in POAM_ITEMS if i["severity"] == "HIGH"),
-        },
-    }
+    return POAM_DOCUMENT.response(request)
 
 
 # =============================================================================
 # Search (INTENTIONAL XSS)
 # =============================================================================
 @app.get("/api/search")
-async def search_logs(q: str = "", tenant_id: Optional[str] = None):
+async def search_logs(q: str = "", tenant_id: Optional[str] = None, limit: int = 100,
+                      since: Optional[str] = None, until: Optional[str] = None):
+    """Ranked full-text search; bare words are prefix-matched, "quoted text" is a phrase."""
     if not tenant_id:
         raise HTTPException(status_code=400, detail="tenant_id is required")
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT * FROM logs WHERE tenant_id = ? AND message LIKE ? LIMIT 100",
-        (tenant_id, f"%{q}%"),
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return {"results": [{"id": r[0], "tenant_id": r[1], "level": r[2], "message": r[3],
-                         "source": r[4], "timestamp": r[5]} for r in rows],
-            "query": q, "count": len(rows)}
+    window = _time_range_clause(since, until)
+
+    def query():
+        with get_read_db(tenant_id) as conn:
+            cur = conn.cursor()
+            cur.execute(*build_search(conn.backend, tenant_id, q, page_size(limit), window))
+            return fetch_records(cur)
+
+    rows = await run_db(query)
+    return FastJSONResponse({"results": rows, "query": q, "count": len(rows)})
 
 
 # =============================================================================
@@ -801,82 +1647,38 @@ async def search_logs(q: str = "", tenant_id: Optional[str] = None):
 # =============================================================================
 @app.get("/api/stats")
 async def get_stats(tenant_id: Optional[str] = None):
-    conn = get_db()
-    cur = conn.cursor()
-
-    def count_query(table, extra=""):
-        q = f"SELECT COUNT(*) FROM {table}"
-        if tenant_id:
-            q += f" WHERE tenant_id = ?"
-            if extra:
-                q += f" AND {extra}"
-            cur.execute(q, (tenant_id,))
-        else:
-            if extra:
-                q += f" WHERE {extra}"
-            cur.execute(q)
-        return cur.fetchone()[0]
-
-    log_count = count_query("logs")
-    alert_count = count_query("alerts")
-    open_findings = count_query("findings", "status = 'open'")
-
-    cur.execute("SELECT COUNT(DISTINCT tenant_id) FROM logs")
-    tenant_count = cur.fetchone()[0]
-
-    sev_q = "SELECT severity, COUNT(*) FROM findings"
-    src_q = "SELECT source, COUNT(*) FROM findings"
+    """Dashboard totals from the trigger-maintained counters (see stats.py)."""
+    def collect_global():
+        # Always the primary: no tenant pins this entry to read-your-writes, and a
+        # lagging replica would refill the cache right after a write invalidated it.
+        # The read is a handful of stats_totals rows.
+        with get_db() as conn:
+            return read_global_counters(conn)
+
+    def collect_tenant():
+        with get_read_db(tenant_id) as conn:
+            return read_tenant_counters(conn, tenant_id)
+
+    # Cached apart so a tenant's writes leave other tenants' entries intact;
+    # active_tenants always comes from the global entry
+    counters, tenant_count = await cached("stats", None, lambda: run_db(collect_global))
     if tenant_id:
-        cur.execute(sev_q + " WHERE tenant_id = ? GROUP BY severity", (tenant_id,))
-    else:
-        cur.execute(sev_q + " GROUP BY severity")
-    severity_counts = dict(cur.fetchall())
-
-    if tenant_id:
-        cur.execute(src_q + " WHERE tenant_id = ? GROUP BY source", (tenant_id,))
-    else:
-        cur.execute(src_q + " GROUP BY source")
-    source_counts = dict(cur.fetchall())
-
-    # Vendor count
-    if tenant_id:
-        cur.execute("SELECT COUNT(*) FROM vendors WHERE tenant_id = ? AND status = 'connected'", (tenant_id,))
-    else:
-        cur.execute("SELECT COUNT(*) FROM vendors WHERE status = 'connected'")
-    vendor_count = cur.fetchone()[0]
-
-    conn.close()
-
-    # SSP compliance summary
-    implemented = sum(1 for c in SSP_CONTROLS if c["status"] == "Implemented")
-    partial = sum(1 for c in SSP_CONTROLS if c["status"] == "Partially Implemented")
-    not_impl = sum(1 for c in SSP_CONTROLS if c["status"] == "Not Implemented")
-    inherited = sum(1 for c in SSP_CONTROLS if c["status"] == "Inherited")
+        counters = await cached("stats", tenant_id, lambda: run_db(collect_tenant))
+    severity_prefix, source_prefix = "findings_severity:", "findings_source:"
 
     return {
-        "total_logs": log_count,
-        "total_alerts": alert_count,
+        "total_logs": counters.get("logs", 0),
+        "total_alerts": counters.get("alerts", 0),
         "active_tenants": tenant_count,
-        "open_findings": open_findings,
-        "connected_vendors": vendor_count,
+        "open_findings": counters.get("findings_open", 0),
+        "connected_vendors": counters.get("vendors_connected", 0),
         "findings_by_severity": {
-            "CRITICAL": severity_counts.get("CRITICAL", 0),
-            "HIGH": severity_counts.get("HIGH", 0),
-            "MEDIUM": severity_counts.get("MEDIUM", 0),
-            "LOW": severity_counts.get("LOW", 0),
-        },
-        "findings_by_source": source_counts,
-        "compliance": {
-            "total_controls": len(SSP_CONTROLS),
-            "implemented": implemented,
-            "partial": partial,
-            "not_implemented": not_impl,
-            "inherited": inherited,
-            "compliance_pct": round((implemented + inherited) / len(SSP_CONTROLS) * 100),
+            sev: counters.get(severity_prefix + sev, 0) for sev in SEVERITY_RANK
         },
-        "poam_summary": {
-            "total": len(POAM_ITEMS),
-            "open": sum(1 for i in POAM_ITEMS if i["status"] == "Open"),
-            "in_progress": sum(1 for i in POAM_ITEMS if i["status"] == "In Progress"),
+        "findings_by_source": {
+            metric[len(source_prefix):]: value for metric, value in counters.items()
+            if metric.startswith(source_prefix) and value
         },
+        "compliance": CATALOG.compliance_summary,
+        "poam_summary": {key: CATALOG.poam_summary[key] for key in ("total", "open", "in_progress")},
     }
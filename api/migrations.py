@@ -0,0 +1,305 @@
+"""
+Anthra Center — Versioned schema migrations
+
+db/init.sql (PostgreSQL) and _init_sqlite (demo/edge) create the base tables.
+Everything after that is a numbered Migration carrying SQL for both
+backends. Applied versions are recorded in schema_migrations, and startup
+applies whatever is pending, one transaction per migration, so re-running is
+a no-op.
+
+Add new migrations at the end of MIGRATIONS; never edit or renumber one that
+has shipped.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+import findings
+import retention
+import stats
+
+# Arbitrary key so concurrent API replicas don't race each other (pg_advisory_xact_lock)
+_PG_LOCK_KEY = 7268547261
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    postgres: Tuple[str, ...] = ()
+    sqlite: Tuple[str, ...] = ()
+    # Optional data step run after the SQL, as run(conn, backend)
+    run: Optional[Callable] = None
+
+
+MIGRATIONS = [
+    Migration(
+        1, "postgres_schema_parity",
+        # init.sql predates multi-tenant users and vendor integrations
+        postgres=(
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS email TEXT",
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS tenant_id TEXT",
+            "ALTER TABLE users ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT NOW()",
+            """CREATE TABLE IF NOT EXISTS vendors (
+                id SERIAL PRIMARY KEY,
+                tenant_id TEXT,
+                name TEXT,
+                vendor_type TEXT,
+                api_endpoint TEXT,
+                api_key TEXT,
+                status TEXT DEFAULT 'disconnected',
+                last_scan TEXT,
+                created_at TIMESTAMP DEFAULT NOW()
+            )""",
+        ),
+    ),
+    Migration(
+        2, "hot_path_indexes",
+        # get_logs / get_alerts / get_vendors: WHERE tenant_id = ? ORDER BY created_at DESC
+        # get_control_families: WHERE tenant_id = ? AND status = 'open' GROUP BY nist_control
+        # get_findings / get_stats: tenant_id + severity filters and GROUP BY severity
+        postgres=(
+            "CREATE INDEX IF NOT EXISTS idx_logs_tenant_created ON logs (tenant_id, created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_alerts_tenant_created ON alerts (tenant_id, created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_findings_tenant_status_control ON findings (tenant_id, status, nist_control)",
+            "CREATE INDEX IF NOT EXISTS idx_findings_tenant_severity ON findings (tenant_id, severity)",
+            "CREATE INDEX IF NOT EXISTS idx_vendors_tenant_created ON vendors (tenant_id, created_at DESC)",
+        ),
+        sqlite=(
+            "CREATE INDEX IF NOT EXISTS idx_logs_tenant_created ON logs (tenant_id, created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_alerts_tenant_created ON alerts (tenant_id, created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_findings_tenant_status_control ON findings (tenant_id, status, nist_control)",
+            "CREATE INDEX IF NOT EXISTS idx_findings_tenant_severity ON findings (tenant_id, severity)",
+            "CREATE INDEX IF NOT EXISTS idx_vendors_tenant_created ON vendors (tenant_id, created_at DESC)",
+            "ANALYZE",
+        ),
+    ),
+    Migration(
+        3, "keyset_pagination_indexes",
+        # Cursor pages seek on (created_at, id) < (?, ?); include id so ties resolve in the index
+        postgres=(
+            "CREATE INDEX IF NOT EXISTS idx_logs_tenant_created_id ON logs (tenant_id, created_at DESC, id DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_alerts_tenant_created_id ON alerts (tenant_id, created_at DESC, id DESC)",
+            "DROP INDEX IF EXISTS idx_logs_tenant_created",
+            "DROP INDEX IF EXISTS idx_alerts_tenant_created",
+        ),
+        sqlite=(
+            "CREATE INDEX IF NOT EXISTS idx_logs_tenant_created_id ON logs (tenant_id, created_at DESC, id DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_alerts_tenant_created_id ON alerts (tenant_id, created_at DESC, id DESC)",
+            "DROP INDEX IF EXISTS idx_logs_tenant_created",
+            "DROP INDEX IF EXISTS idx_alerts_tenant_created",
+        ),
+    ),
+    Migration(
+        4, "log_full_text_search",
+        # /api/search: ranked full-text matching over message + source (see search.py)
+        postgres=(
+            "CREATE EXTENSION IF NOT EXISTS btree_gin",
+            "ALTER TABLE logs ADD COLUMN IF NOT EXISTS search_tsv tsvector GENERATED ALWAYS AS "
+            "(to_tsvector('simple', coalesce(message, '') || ' ' || coalesce(source, ''))) STORED",
+            "CREATE INDEX IF NOT EXISTS idx_logs_tenant_search ON logs USING GIN (tenant_id, search_tsv)",
+        ),
+        sqlite=(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5("
+            "message, source, content='logs', content_rowid='id', prefix='2 3 4')",
+            "CREATE TRIGGER IF NOT EXISTS logs_fts_ai AFTER INSERT ON logs BEGIN "
+            "INSERT INTO logs_fts (rowid, message, source) VALUES (new.id, new.message, new.source); END",
+            "CREATE TRIGGER IF NOT EXISTS logs_fts_ad AFTER DELETE ON logs BEGIN "
+            "INSERT INTO logs_fts (logs_fts, rowid, message, source) VALUES ('delete', old.id, old.message, old.source); END",
+            "CREATE TRIGGER IF NOT EXISTS logs_fts_au AFTER UPDATE OF message, source ON logs BEGIN "
+            "INSERT INTO logs_fts (logs_fts, rowid, message, source) VALUES ('delete', old.id, old.message, old.source); "
+            "INSERT INTO logs_fts (rowid, message, source) VALUES (new.id, new.message, new.source); END",
+            "INSERT INTO logs_fts (logs_fts) VALUES ('rebuild')",
+        ),
+    ),
+    Migration(
+        5, "stats_counters",
+        # /api/stats reads trigger-maintained counters instead of counting tables (see stats.py)
+        postgres=stats.postgres_statements(),
+        sqlite=stats.sqlite_statements(),
+        run=lambda conn, backend: stats.correct_drift(conn.cursor(), backend),
+    ),
+    Migration(
+        6, "vendor_scan_jobs",
+        # POST /api/vendors/{id}/scan queues a job; GET /api/scans/{id} reports it (see scans.py)
+        postgres=(
+            """CREATE TABLE IF NOT EXISTS scan_jobs (
+                id TEXT PRIMARY KEY,
+                vendor_id INTEGER NOT NULL,
+                tenant_id TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                findings_total INTEGER NOT NULL DEFAULT 0,
+                findings_written INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT NOW(),
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP
+            )""",
+            "CREATE INDEX IF NOT EXISTS idx_scan_jobs_vendor_created ON scan_jobs (vendor_id, created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs (status)",
+        ),
+        sqlite=(
+            """CREATE TABLE IF NOT EXISTS scan_jobs (
+                id TEXT PRIMARY KEY,
+                vendor_id INTEGER NOT NULL,
+                tenant_id TEXT,
+                status TEXT NOT NULL DEFAULT 'queued',
+                findings_total INTEGER NOT NULL DEFAULT 0,
+                findings_written INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP
+            )""",
+            "CREATE INDEX IF NOT EXISTS idx_scan_jobs_vendor_created ON scan_jobs (vendor_id, created_at DESC)",
+            "CREATE INDEX IF NOT EXISTS idx_scan_jobs_status ON scan_jobs (status)",
+        ),
+    ),
+    Migration(
+        7, "vendor_poll_watermark",
+        # Incremental connector polling resumes from the newest finding seen (see connectors.py)
+        postgres=("ALTER TABLE vendors ADD COLUMN IF NOT EXISTS poll_watermark TEXT",),
+        sqlite=("ALTER TABLE vendors ADD COLUMN poll_watermark TEXT",),
+    ),
+    Migration(
+        8, "finding_fingerprints",
+        # Repeat sightings update one row instead of inserting duplicates (see findings.py);
+        # the unique index is created by the backfill, once duplicates are merged
+        postgres=(
+            "ALTER TABLE findings ADD COLUMN IF NOT EXISTS fingerprint TEXT",
+            "ALTER TABLE findings ADD COLUMN IF NOT EXISTS last_seen TIMESTAMP",
+            "ALTER TABLE findings ADD COLUMN IF NOT EXISTS occurrence_count INTEGER NOT NULL DEFAULT 1",
+        ),
+        sqlite=(
+            "ALTER TABLE findings ADD COLUMN fingerprint TEXT",
+            "ALTER TABLE findings ADD COLUMN last_seen TIMESTAMP",
+            "ALTER TABLE findings ADD COLUMN occurrence_count INTEGER NOT NULL DEFAULT 1",
+        ),
+        run=findings.backfill_fingerprints,
+    ),
+    Migration(
+        9, "log_partitions_and_retention",
+        # Per-tenant AU-11 retention; PostgreSQL logs become monthly range partitions (see retention.py)
+        postgres=(
+            """CREATE TABLE IF NOT EXISTS log_retention (
+                tenant_id TEXT PRIMARY KEY,
+                retention_days INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT NOW()
+            )""",
+        ),
+        sqlite=(
+            """CREATE TABLE IF NOT EXISTS log_retention (
+                tenant_id TEXT PRIMARY KEY,
+                retention_days INTEGER NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )""",
+        ),
+        run=retention.partition_logs,
+    ),
+    Migration(
+        10, "finding_severity_rank",
+        # get_findings: ORDER BY severity_rank, created_at DESC, id DESC served from the index instead
+        # of sorting every finding of the tenant; severity filters use the same index, so the
+        # (tenant_id, severity) index from 002 goes. PostgreSQL backfills by rewriting the table
+        # (STORED); SQLite computes the column on read (ALTER TABLE only adds VIRTUAL) and
+        # materialises it in the index.
+        postgres=(
+            "ALTER TABLE findings ADD COLUMN IF NOT EXISTS severity_rank SMALLINT"
+            f" GENERATED ALWAYS AS ({findings.SEVERITY_RANK_SQL}) STORED",
+            "CREATE INDEX IF NOT EXISTS idx_findings_tenant_rank_created"
+            " ON findings (tenant_id, severity_rank, created_at DESC, id DESC)",
+            "DROP INDEX IF EXISTS idx_findings_tenant_severity",
+        ),
+        sqlite=(
+            "ALTER TABLE findings ADD COLUMN severity_rank INTEGER"
+            f" GENERATED ALWAYS AS ({findings.SEVERITY_RANK_SQL}) VIRTUAL",
+            "CREATE INDEX IF NOT EXISTS idx_findings_tenant_rank_created"
+            " ON findings (tenant_id, severity_rank, created_at DESC, id DESC)",
+            "DROP INDEX IF EXISTS idx_findings_tenant_severity",
+        ),
+    ),
+    Migration(
+        11, "log_search_tenant_key",
+        # SQLite /api/search: the tenant becomes part of the FTS5 query (tenant_key = hex(tenant_id),
+        # one exact token), so MATCH only collects and ranks that tenant's rows. The table is
+        # contentless because logs has no tenant_key column to serve as external content.
+        # PostgreSQL already scopes the GIN index by tenant_id.
+        sqlite=(
+            "DROP TRIGGER IF EXISTS logs_fts_ai",
+            "DROP TRIGGER IF EXISTS logs_fts_ad",
+            "DROP TRIGGER IF EXISTS logs_fts_au",
+            "DROP TABLE IF EXISTS logs_fts",
+            "CREATE VIRTUAL TABLE logs_fts USING fts5("
+            "message, source, tenant_key, content='', prefix='2 3 4')",
+            "CREATE TRIGGER logs_fts_ai AFTER INSERT ON logs BEGIN "
+            "INSERT INTO logs_fts (rowid, message, source, tenant_key) "
+            "VALUES (new.id, new.message, new.source, hex(new.tenant_id)); END",
+            "CREATE TRIGGER logs_fts_ad AFTER DELETE ON logs BEGIN "
+            "INSERT INTO logs_fts (logs_fts, rowid, message, source, tenant_key) "
+            "VALUES ('delete', old.id, old.message, old.source, hex(old.tenant_id)); END",
+            "CREATE TRIGGER logs_fts_au AFTER UPDATE OF message, source, tenant_id ON logs BEGIN "
+            "INSERT INTO logs_fts (logs_fts, rowid, message, source, tenant_key) "
+            "VALUES ('delete', old.id, old.message, old.source, hex(old.tenant_id)); "
+            "INSERT INTO logs_fts (rowid, message, source, tenant_key) "
+            "VALUES (new.id, new.message, new.source, hex(new.tenant_id)); END",
+            "INSERT INTO logs_fts (rowid, message, source, tenant_key) "
+            "SELECT id, message, source, hex(tenant_id) FROM logs",
+        ),
+    ),
+    Migration(
+        12, "stats_global_totals",
+        # /api/stats global figures from trigger-maintained stats_totals instead of summing every
+        # tenant's counters on read (see stats.py)
+        postgres=stats.postgres_total_statements(),
+        sqlite=stats.sqlite_total_statements(),
+    ),
+]
+
+
+def _applied_versions(cur):
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+def apply_migrations(conn, backend):
+    """Apply pending migrations on a raw psycopg2/sqlite3 connection.
+
+    Returns the list of versions applied by this call.
+    """
+    cur = conn.cursor()
+    cur.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " version INTEGER PRIMARY KEY, name TEXT NOT NULL,"
+        " applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    conn.commit()
+
+    applied = []
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        if backend == "postgres":
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (_PG_LOCK_KEY,))
+        else:
+            cur.execute("BEGIN IMMEDIATE")
+        try:
+            if migration.version in _applied_versions(cur):
+                conn.rollback()
+                continue
+            for statement in (migration.postgres if backend == "postgres" else migration.sqlite):
+                cur.execute(statement)
+            if migration.run:
+                migration.run(conn, backend)
+            placeholder = "%s" if backend == "postgres" else "?"
+            cur.execute(
+                f"INSERT INTO schema_migrations (version, name) VALUES ({placeholder}, {placeholder})",
+                (migration.version, migration.name),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(migration.version)
+        print(f"INFO: applied {backend} migration {migration.version:03d} {migration.name}")
+    return applied
+
@@ -0,0 +1,59 @@
+"""
+Anthra Center — Keyset (cursor) pagination
+
+List endpoints return `next_cursor`, an opaque token holding the sort key of
+the last row served. The next request resumes with a WHERE clause on that
+key instead of OFFSET, so page 10,000 costs the same index seek as page 1.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    """Cursor could not be decoded or belongs to a different listing."""
+
+
+def _plain(value):
+    # str() keeps the driver's own timestamp format (space separator,
+    # microseconds), which compares correctly on both backends
+    return str(value) if isinstance(value, datetime) else value
+
+
+def encode_cursor(kind, *key):
+    raw = json.dumps({"k": kind, "v": [_plain(v) for v in key]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, kind, size):
+    """Return the sort-key values stored in `token` for listing `kind`."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor("malformed cursor") from exc
+    if not isinstance(payload, dict) or payload.get("k") != kind:
+        raise InvalidCursor("cursor does not belong to this listing")
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("malformed cursor")
+    return values
+
+
+def page_size(limit):
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def paginate(rows, size, kind, key):
+    """Trim a LIMIT size+1 result to `size` rows and build the next cursor.
+
+    key(row) returns the sort-key tuple of a row.
+    """
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(kind, *key(rows[-1]))
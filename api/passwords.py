@@ -0,0 +1,107 @@
+"""
+Anthra Center — Password hashing (NIST IA-5(1), SC-13)
+
+bcrypt at cost 12 burns roughly 250 ms of CPU per call. Async handlers hand
+that work to a dedicated process pool so a burst of logins cannot freeze the
+API process. Admission is bounded: once BCRYPT_MAX_QUEUE requests are waiting
+the caller gets HasherBusy immediately (mapped to 503 + Retry-After).
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+BCRYPT_ROUNDS = 12
+
+
+def hash_password(password: str) -> str:
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except Exception:
+        return False
+
+
+class HasherBusy(Exception):
+    """The hashing queue is full; the caller should retry later."""
+
+
+class PasswordHasher:
+    """Bounded process pool for bcrypt.
+
+    workers     -- processes doing bcrypt in parallel
+    max_queue   -- requests allowed to wait for a free worker
+    """
+
+    def __init__(self, workers, max_queue):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latencies_ms = deque(maxlen=512)
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn: forking a process that already runs DB/executor threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HasherBusy("password hashing queue is full")
+            self._in_flight += 1
+            pool = self._pool()
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+                self._latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._submit(verify_password, password, hashed)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            in_flight = self._in_flight
+            completed, rejected = self._completed, self._rejected
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 1) if latencies else 0.0
+
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "queue_depth": max(0, in_flight - self.workers),
+            "completed": completed,
+            "rejected": rejected,
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "max": round(latencies[-1], 1) if latencies else 0.0},
+        }
@@ -0,0 +1,83 @@
+"""
+Anthra Center — Precompressed static JSON responses
+
+/api/ssp and /api/ssp/poam only change between deploys, so their bodies are
+serialized once at import and stored as identity, gzip and (when the
+optional brotli package is installed) br variants, each with a strong ETag.
+Clients and the CDN revalidate with If-None-Match and get a 304 instead of
+the full control catalog.
+"""
+
+import gzip
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+def _accepted_encodings(header):
+    """Content codings the client accepts (q > 0), lower-cased."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def _etag_matches(header, etags):
+    """Weak comparison, as RFC 9110 specifies for If-None-Match."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return not candidates.isdisjoint(etags)
+
+
+class PrecompressedJSON:
+    """A JSON document encoded once, served with ETag and content negotiation."""
+
+    def __init__(self, payload, max_age=300):
+        # Same encoding as fastapi's JSONResponse; default=dict covers read-only mappings
+        body = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                          default=dict).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.cache_control = f"public, max-age={max_age}"
+        # encoding -> (body, strong ETag); each representation gets its own tag
+        self.variants = {"identity": (body, f'"{digest}"'),
+                         "gzip": (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gzip"')}
+        if brotli is not None:
+            self.variants["br"] = (brotli.compress(body, quality=11), f'"{digest}-br"')
+
+    def _negotiate(self, accept_encoding):
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def response(self, request: Request):
+        encoding = self._negotiate(request.headers.get("accept-encoding"))
+        body, etag = self.variants[encoding]
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        # Only the negotiated variant's tag: a 304 for another one would have the client
+        # reuse a body in an encoding it just said it cannot decode
+        if _etag_matches(request.headers.get("if-none-match"), {etag}):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
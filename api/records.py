@@ -0,0 +1,62 @@
+"""
+Anthra Center — Row mapping and fast JSON responses
+
+List endpoints used to SELECT * and build dicts by position (r[0]..r[17]),
+which silently breaks when a column is added or reordered, and FastAPI's
+encoder then walked every dict again. Queries now name their columns
+(select_list), rows become records keyed by cursor.description, and hot
+endpoints return FastJSONResponse directly, rendered by orjson when it is
+installed.
+
+Benchmark: scripts/bench_findings_serialization.py
+"""
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+LOG_COLUMNS = ("id", "tenant_id", "level", "message", "source", "created_at")
+
+ALERT_COLUMNS = ("id", "tenant_id", "severity", "title", "description", "source", "nist_control", "created_at")
+
+FINDING_COLUMNS = (
+    "id", "tenant_id", "source", "finding_type", "severity", "title", "description",
+    "asset_type", "asset_id", "namespace", "cve_id", "mitre_tactic", "mitre_technique",
+    "remediation", "nist_control", "rank", "status", "created_at", "last_seen", "occurrence_count",
+)
+
+VENDOR_COLUMNS = (
+    "id", "tenant_id", "name", "vendor_type", "api_endpoint", "api_key", "status", "last_scan", "poll_watermark",
+    "created_at",
+)
+
+
+def select_list(columns, alias=None, rename=None):
+    """SQL projection for `columns`, optionally table-qualified and renamed (column -> key)."""
+    prefix = f"{alias}." if alias else ""
+    rename = rename or {}
+    return ", ".join(
+        f"{prefix}{c} AS {rename[c]}" if c in rename else f"{prefix}{c}" for c in columns
+    )
+
+
+def fetch_records(cur):
+    """All remaining rows of an executed cursor as dicts keyed by column name."""
+    names = [d[0] for d in cur.description]
+    return [dict(zip(names, row)) for row in cur.fetchall()]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (datetimes included) when available.
+
+    Handlers that return it directly skip FastAPI's jsonable_encoder pass.
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,241 @@
+"""
+Anthra Center — Log partitions and retention (NIST AU-11)
+
+On PostgreSQL, logs is range-partitioned by month on created_at (migration
+009 converts the original heap). Time-bounded reads such as the exports
+and /api/logs pages prune to the partitions they need. Partitions are named
+logs_pYYYYMM. The API creates them LOG_PARTITION_MONTHS_AHEAD months in
+advance, at startup and every LOG_PARTITION_INTERVAL seconds, independently
+of the purge schedule. A default partition catches anything outside the
+created range. If it already holds rows for a month that is being created,
+PostgreSQL would refuse the new partition. So create_partitions() detaches
+the default, creates the partition, moves those rows into it and re-attaches
+the default, all in one transaction.
+
+Retention is per tenant: log_retention overrides LOG_RETENTION_DAYS, and no
+tenant may go below LOG_RETENTION_MIN_DAYS. purge_logs() drops a whole
+partition, with no DELETE and no vacuum debt, once it lies entirely past every
+tenant's retention. Rows of tenants with a shorter retention are deleted in
+batches of LOG_PURGE_BATCH_ROWS, one short transaction each. SQLite has no
+partitioning, so there every tenant's expired rows are purged in batches.
+
+Dropping a partition fires no DELETE trigger, so its rows are subtracted
+from the /api/stats counters in the same transaction.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import stats
+
+_PARTITION = re.compile(r"^logs_p(\d{4})(\d{2})$")
+
+
+def month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"logs_p{month.year:04d}{month.month:02d}"
+
+
+def ensure_partitions(cur, first, last):
+    """PostgreSQL: create the monthly partitions from `first` through `last` (inclusive).
+
+    Returns [(name, rows moved out of logs_default)] for the partitions it created.
+    """
+    created = []
+    month = month_start(first)
+    while month <= last:
+        name = partition_name(month)
+        cur.execute(f"SELECT to_regclass('{name}') IS NOT NULL")
+        if not cur.fetchone()[0]:
+            created.append((name, _create_partition(cur, name, month)))
+        month = add_months(month, 1)
+    return created
+
+
+def _create_partition(cur, name, month):
+    bounds = f"FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    in_range = f"created_at >= '{month:%Y-%m-%d}' AND created_at < '{add_months(month, 1):%Y-%m-%d}'"
+    cur.execute("SELECT to_regclass('logs_default') IS NOT NULL")
+    stranded = False
+    if cur.fetchone()[0]:
+        cur.execute(f"SELECT EXISTS (SELECT 1 FROM logs_default WHERE {in_range})")
+        stranded = cur.fetchone()[0]
+    if not stranded:
+        cur.execute(f"CREATE TABLE {name} PARTITION OF logs FOR VALUES {bounds}")
+        return 0
+
+    # DETACH needs an exclusive lock on logs; give up (and retry next run) rather than
+    # queue every writer behind a long-running read
+    cur.execute("SET LOCAL lock_timeout = '5s'")
+    cur.execute("ALTER TABLE logs DETACH PARTITION logs_default")
+    cur.execute(f"CREATE TABLE {name} PARTITION OF logs FOR VALUES {bounds}")
+    # Straight into the partition and out of the detached default: the rows only move,
+    # and the statement-level stats triggers on logs fire for neither side
+    cur.execute(
+        f"INSERT INTO {name} (id, tenant_id, level, message, source, created_at)"
+        f" SELECT id, tenant_id, level, message, source, created_at FROM logs_default WHERE {in_range}"
+    )
+    cur.execute(f"DELETE FROM logs_default WHERE {in_range}")
+    moved = cur.rowcount
+    cur.execute("ALTER TABLE logs ATTACH PARTITION logs_default DEFAULT")
+    return moved
+
+
+def create_partitions(conn, months_ahead, now=None):
+    """Create this month's and the next `months_ahead` months' partitions on a get_db() connection.
+
+    One transaction per partition. No-op on SQLite. Returns [(name, rows moved)].
+    """
+    if conn.backend != "postgres":
+        return []
+    now = now or datetime.utcnow()
+    cur = conn.cursor()
+    created = []
+    month = month_start(now)
+    try:
+        for _ in range(months_ahead + 1):
+            created += ensure_partitions(cur, month, month)
+            conn.commit()
+            month = add_months(month, 1)
+    except Exception:
+        conn.rollback()
+        raise
+    return created
+
+
+def monthly_partitions(cur):
+    """PostgreSQL: [(name, month start)] of logs' monthly partitions, oldest first."""
+    cur.execute(
+        "SELECT c.relname FROM pg_inherits i"
+        " JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent"
+        " WHERE p.relname = 'logs'"
+    )
+    found = []
+    for (name,) in cur.fetchall():
+        match = _PARTITION.match(name)
+        if match:
+            found.append((name, datetime(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(found, key=lambda p: p[1])
+
+
+def partition_logs(conn, backend, months_ahead=2):
+    """Migration step: rebuild the PostgreSQL logs heap as a monthly partitioned table.
+
+    Runs inside the migration transaction. ids, the full-text column and the
+    stats triggers carry over; no-op on SQLite or if logs is already partitioned.
+    """
+    if backend != "postgres":
+        return
+    cur = conn.cursor()
+    cur.execute("SELECT relkind FROM pg_class WHERE relname = 'logs' AND relkind IN ('r', 'p')")
+    if cur.fetchone()[0] == "p":
+        return
+
+    cur.execute("SELECT pg_get_serial_sequence('logs', 'id')")
+    sequence = cur.fetchone()[0]
+    cur.execute("ALTER TABLE logs RENAME TO logs_heap")
+    cur.execute("ALTER INDEX IF EXISTS logs_pkey RENAME TO logs_heap_pkey")
+    cur.execute(f"""CREATE TABLE logs (
+        id INTEGER NOT NULL DEFAULT nextval('{sequence}'),
+        tenant_id TEXT,
+        level TEXT,
+        message TEXT,
+        source TEXT,
+        created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+        search_tsv tsvector GENERATED ALWAYS AS
+            (to_tsvector('simple', coalesce(message, '') || ' ' || coalesce(source, ''))) STORED,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)""")
+    cur.execute("CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT")
+    cur.execute("SELECT MIN(created_at), NOW()::timestamp FROM logs_heap")
+    oldest, now = cur.fetchone()
+    ensure_partitions(cur, oldest or now, add_months(month_start(now), months_ahead))
+
+    # Copy before the stats triggers exist: the counters already include these rows
+    cur.execute(
+        "INSERT INTO logs (id, tenant_id, level, message, source, created_at)"
+        " SELECT id, tenant_id, level, message, source, COALESCE(created_at, NOW()) FROM logs_heap"
+    )
+    cur.execute(f"ALTER SEQUENCE {sequence} OWNED BY logs.id")
+    cur.execute("DROP TABLE logs_heap")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_tenant_created_id ON logs (tenant_id, created_at DESC, id DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_tenant_search ON logs USING GIN (tenant_id, search_tsv)")
+    for statement in stats.postgres_statements(tables=("logs",)):
+        cur.execute(statement)
+
+
+def policies(cur):
+    """{tenant_id: retention_days} for tenants with their own policy."""
+    cur.execute("SELECT tenant_id, retention_days FROM log_retention")
+    return dict(cur.fetchall())
+
+
+def _tenants_with_logs(cur):
+    # The stats counters already know which tenants have logs; no scan of logs needed
+    cur.execute("SELECT tenant_id FROM stats_counters WHERE metric = 'logs' AND value > 0")
+    return [row[0] for row in cur.fetchall()]
+
+
+def _delete_batches(conn, tenant_id, cutoff, batch_rows):
+    """Delete one tenant's logs older than `cutoff`, batch_rows per transaction."""
+    # stats_counters stores NULL tenants as ''
+    tenant_clause = "tenant_id IS NULL" if tenant_id == "" else "tenant_id = ?"
+    params = (cutoff, batch_rows) if tenant_id == "" else (tenant_id, cutoff, batch_rows)
+    deleted = 0
+    while True:
+        cur = conn.execute(
+            f"DELETE FROM logs WHERE id IN (SELECT id FROM logs WHERE {tenant_clause} AND created_at < ?"
+            " ORDER BY created_at LIMIT ?)",
+            params,
+        )
+        conn.commit()
+        deleted += cur.rowcount
+        if cur.rowcount < batch_rows:
+            return deleted
+
+
+def purge_logs(conn, default_days, batch_rows=5000, now=None):
+    """Apply every tenant's retention on a get_db() connection.
+
+    Returns a summary including tenants_purged, the tenants that lost rows.
+    """
+    now = now or datetime.utcnow()
+    cur = conn.cursor()
+    overrides = policies(cur)
+    tenants = _tenants_with_logs(cur)
+    conn.commit()
+    days = {tenant: overrides.get(tenant, default_days) for tenant in tenants}
+    summary = {"partitions_dropped": [], "rows_deleted": 0, "tenants": len(tenants)}
+    touched = set()   # tenants that lost rows, for the caller's cache invalidation
+
+    longest = max([default_days, *overrides.values()])
+    if conn.backend == "postgres":
+        horizon = now - timedelta(days=longest)
+        for name, month in monthly_partitions(cur):
+            if add_months(month, 1) > horizon:
+                break
+            # The counter rows the discount updates name exactly the tenants the partition held
+            cur.execute(stats.discount_statement("logs", name) + " RETURNING tenant_id")
+            touched.update(row[0] for row in cur.fetchall())
+            cur.execute(f"DROP TABLE {name}")
+            conn.commit()
+            summary["partitions_dropped"].append(name)
+        # Tenants on the longest retention are covered by partition drops
+        days = {tenant: d for tenant, d in days.items() if d < longest}
+
+    for tenant, tenant_days in days.items():
+        deleted = _delete_batches(conn, tenant, now - timedelta(days=tenant_days), batch_rows)
+        if deleted:
+            touched.add(tenant)
+        summary["rows_deleted"] += deleted
+    # stats_counters stores NULL tenants as ''
+    summary["tenants_purged"] = sorted(tenant for tenant in touched if tenant)
+    return summary
@@ -0,0 +1,124 @@
+"""
+Anthra Center — Vendor scan jobs (NIST RA-5, CA-7)
+
+POST /api/vendors/{id}/scan records a scan_jobs row and returns its id at
+once (202). ScanWorkerPool runs the jobs on background threads:
+
+- at most `workers` scans run at a time overall
+- at most `max_per_vendor` run against any one vendor, so a queue of scans
+  for one vendor cannot starve the others or hammer its API
+- results are written in batches, and the job row carries progress
+  (findings_written / findings_total) for GET /api/scans/{job_id}
+
+The queue lives in the API process. Jobs still queued at shutdown are
+picked up again on the next start; jobs that were mid-run are marked failed
+rather than re-run, since their findings were partly written.
+"""
+
+import threading
+import uuid
+from collections import Counter, deque
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+SCAN_JOB_COLUMNS = (
+    "id", "vendor_id", "tenant_id", "status", "findings_total", "findings_written",
+    "result", "error", "created_at", "started_at", "finished_at",
+)
+
+
+def new_job_id():
+    return uuid.uuid4().hex
+
+
+def progress(job):
+    """Percent complete for a scan_jobs record."""
+    if job["status"] == SUCCEEDED:
+        return 100
+    total = job["findings_total"] or 0
+    return int(job["findings_written"] * 100 / total) if total else 0
+
+
+class ScanWorkerPool:
+    """Thread pool draining scan jobs with a per-vendor concurrency cap.
+
+    run_job(job_id, vendor_id) does the work; it is expected to record its
+    own outcome and is only called once per submitted job.
+    """
+
+    def __init__(self, run_job, workers=4, max_per_vendor=1):
+        self._run_job = run_job
+        self.workers = workers
+        self.max_per_vendor = max_per_vendor
+        self._cond = threading.Condition()
+        self._pending = deque()       # (job_id, vendor_id) in submission order
+        self._running = Counter()     # vendor_id -> jobs in progress
+        self._threads = []
+        self._stopping = False
+        self._completed = 0
+
+    def start(self):
+        with self._cond:
+            if self._threads:
+                return
+            self._stopping = False
+            self._threads = [
+                threading.Thread(target=self._work, name=f"scan-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, job_id, vendor_id):
+        with self._cond:
+            self._pending.append((job_id, vendor_id))
+            self._cond.notify()
+
+    def _next(self):
+        """Block until a job whose vendor is under its cap is available."""
+        with self._cond:
+            while not self._stopping:
+                for job in self._pending:
+                    if self._running[job[1]] < self.max_per_vendor:
+                        self._pending.remove(job)
+                        self._running[job[1]] += 1
+                        return job
+                self._cond.wait()
+            return None
+
+    def _work(self):
+        while True:
+            job = self._next()
+            if job is None:
+                return
+            job_id, vendor_id = job
+            try:
+                self._run_job(job_id, vendor_id)
+            except Exception as exc:
+                print(f"ERROR: scan job {job_id} crashed: {exc}")
+            finally:
+                with self._cond:
+                    self._running[vendor_id] -= 1
+                    if not self._running[vendor_id]:
+                        del self._running[vendor_id]
+                    self._completed += 1
+                    self._cond.notify_all()
+
+    def stop(self, timeout=30.0):
+        """Stop taking jobs and wait for running ones; queued jobs stay queued in the DB."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "max_per_vendor": self.max_per_vendor,
+                "queued": len(self._pending),
+                "running": sum(self._running.values()),
+                "completed": self._completed,
+            }
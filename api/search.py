@@ -0,0 +1,87 @@
+"""
+Anthra Center — Log full-text search
+
+/api/search used `message LIKE '%q%'`, which scans the tenant's whole log
+table on every keystroke. Queries now hit a full-text index over
+logs.message and logs.source (migration 004):
+
+- PostgreSQL: generated tsvector column + GIN index on (tenant_id, search_tsv)
+- SQLite:     contentless FTS5 table kept in sync by triggers, with the
+              tenant as an indexed tenant_key token (migration 011), so the
+              MATCH itself is tenant-scoped
+
+Query syntax (shared by both backends):
+    falcon node        all words, each prefix-matched (falc finds Falcon)
+    "reverse shell"    exact phrase
+"""
+
+import re
+
+from records import LOG_COLUMNS, select_list
+
+_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def parse_query(q):
+    """Split a user query into [(words, is_phrase)], dropping punctuation."""
+    terms = []
+    for phrase, bare in _TOKEN.findall(q or ""):
+        words = tuple(w.lower() for w in _WORD.findall(phrase if phrase else bare))
+        if not words:
+            continue
+        if phrase:
+            terms.append((words, True))
+        else:
+            # "worker-node-1" tokenizes to several words; each must match
+            terms.extend(((w,), False) for w in words)
+    return terms
+
+
+def to_fts5(terms):
+    parts = []
+    for words, is_phrase in terms:
+        if is_phrase:
+            parts.append('"' + " ".join(words) + '"')
+        else:
+            parts.append(f'"{words[0]}"*')
+    return " AND ".join(parts)
+
+
+def tenant_key(tenant_id):
+    """logs_fts.tenant_key for a tenant: SQLite's hex(tenant_id), a single FTS token."""
+    return tenant_id.encode("utf-8").hex()
+
+
+def to_tsquery(terms):
+    parts = []
+    for words, is_phrase in terms:
+        if is_phrase:
+            parts.append("(" + " <-> ".join(f"'{w}'" for w in words) + ")")
+        else:
+            parts.append(f"'{words[0]}':*")
+    return " & ".join(parts)
+
+
+def build_search(backend, tenant_id, q, limit, window=("", ())):
+    """Return (sql, params) for a ranked, tenant-scoped search.
+
+    `window` is an extra (" AND created_at ...", params) time bound, which
+    lets PostgreSQL skip log partitions outside it.
+    """
+    terms = parse_query(q)
+    columns = select_list(LOG_COLUMNS, alias="l", rename={"created_at": "timestamp"})
+    clause, window_params = window
+    if not terms:
+        return (f"SELECT {columns} FROM logs l WHERE l.tenant_id = ?{clause} "
+                "ORDER BY l.created_at DESC, l.id DESC LIMIT ?", [tenant_id, *window_params, limit])
+    if backend == "postgres":
+        return (f"SELECT {columns} FROM logs l, to_tsquery('simple', ?) query "
+                f"WHERE l.tenant_id = ? AND l.search_tsv @@ query{clause} "
+                "ORDER BY ts_rank(l.search_tsv, query) DESC, l.created_at DESC LIMIT ?",
+                [to_tsquery(terms), tenant_id, *window_params, limit])
+    match = f'tenant_key : "{tenant_key(tenant_id)}" AND {{message source}} : ({to_fts5(terms)})'
+    return (f"SELECT {columns} FROM logs_fts JOIN logs l ON l.id = logs_fts.rowid "
+            f"WHERE logs_fts MATCH ? AND l.tenant_id = ?{clause} "
+            "ORDER BY logs_fts.rank, l.created_at DESC LIMIT ?",
+            [match, tenant_id, *window_params, limit])
@@ -0,0 +1,305 @@
+"""
+Anthra Center — Incremental dashboard counters (/api/stats)
+
+The dashboard polls /api/stats constantly. Instead of counting logs,
+alerts, findings and vendors on every call, database triggers keep a small
+stats_counters table up to date on every insert, delete and status change
+(migration 005), so a stats read touches one row per metric and tenant.
+
+Counters are per tenant. Global figures live in stats_totals (migration
+012), rolled up by row triggers on stats_counters, so the global read is
+O(metrics) rather than O(tenants). It includes active_tenants, the number of
+tenants with logs. To avoid one hot row that every insert would lock,
+PostgreSQL spreads each total over TOTAL_SHARDS rows (picked by backend
+pid), and reads sum the shards. SQLite has a single writer anyway and uses
+shard 0.
+
+reconcile_counters() recounts from the base tables and corrects any drift
+(e.g. after a TRUNCATE or manual data fix); the API runs it periodically.
+"""
+
+# Metric expressions per table, evaluated against each inserted/deleted row
+# ({row} is the row alias). NULL means the row does not count toward a metric.
+# The triggers are generated from these; changing them needs a new migration.
+COUNTER_METRICS = {
+    "logs": ("'logs'",),
+    "alerts": ("'alerts'",),
+    "findings": (
+        "CASE WHEN {row}.status = 'open' THEN 'findings_open' END",
+        "'findings_severity:' || {row}.severity",
+        "'findings_source:' || {row}.source",
+    ),
+    "vendors": ("CASE WHEN {row}.status = 'connected' THEN 'vendors_connected' END",),
+}
+
+# Columns whose update can move a row between metrics (SQLite UPDATE OF triggers)
+COUNTER_COLUMNS = {
+    "logs": ("tenant_id",),
+    "alerts": ("tenant_id",),
+    "findings": ("tenant_id", "status", "severity", "source"),
+    "vendors": ("tenant_id", "status"),
+}
+
+_CREATE_TABLE = (
+    "CREATE TABLE IF NOT EXISTS stats_counters ("
+    " tenant_id TEXT NOT NULL, metric TEXT NOT NULL, value BIGINT NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (tenant_id, metric))"
+)
+
+_UPSERT = (
+    " ON CONFLICT (tenant_id, metric) DO UPDATE SET value = stats_counters.value + excluded.value"
+)
+
+TOTAL_SHARDS = 16
+
+_CREATE_TOTALS = (
+    "CREATE TABLE IF NOT EXISTS stats_totals ("
+    " shard INTEGER NOT NULL, metric TEXT NOT NULL, value BIGINT NOT NULL DEFAULT 0,"
+    " PRIMARY KEY (shard, metric))"
+)
+
+_TOTALS_UPSERT = " ON CONFLICT (shard, metric) DO UPDATE SET value = stats_totals.value + excluded.value"
+
+# Backfill for migration 012: current totals from the per-tenant counters
+_BACKFILL_TOTALS = (
+    "INSERT INTO stats_totals (shard, metric, value)"
+    " SELECT 0, metric, SUM(value) FROM stats_counters GROUP BY metric",
+    "INSERT INTO stats_totals (shard, metric, value)"
+    " SELECT 0, 'active_tenants', COUNT(*) FROM stats_counters"
+    " WHERE metric = 'logs' AND value > 0 AND tenant_id <> ''",
+)
+
+
+def _deltas(table, row, sign, source=None):
+    """SELECT of (tenant_id, metric, delta) for each row of `source` (or the trigger row)."""
+    from_clause = f" FROM {source} {row}" if source else ""
+    return " UNION ALL ".join(
+        f"SELECT COALESCE({row}.tenant_id, '') AS tenant_id, {expr.format(row=row)} AS metric,"
+        f" {sign} AS delta{from_clause}"
+        for expr in COUNTER_METRICS[table]
+    )
+
+
+def _pg_apply(deltas):
+    return (
+        "INSERT INTO stats_counters (tenant_id, metric, value)"
+        f" SELECT tenant_id, metric, SUM(delta) FROM ({deltas}) d"
+        " WHERE metric IS NOT NULL GROUP BY tenant_id, metric HAVING SUM(delta) <> 0" + _UPSERT
+    )
+
+
+def postgres_statements(tables=None):
+    """Counter table, statement-level triggers (transition tables) and functions.
+
+    `tables` limits the triggers to those tables, for migrations that rebuild one.
+    """
+    statements = [_CREATE_TABLE]
+    for table in tables or COUNTER_METRICS:
+        function = f"stats_count_{table}"
+        statements.append(f"""CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        {_pg_apply(_deltas(table, 'r', 1, 'new_rows'))};
+    ELSIF TG_OP = 'DELETE' THEN
+        {_pg_apply(_deltas(table, 'r', -1, 'old_rows'))};
+    ELSE
+        {_pg_apply(_deltas(table, 'r', 1, 'new_rows') + ' UNION ALL ' + _deltas(table, 'r', -1, 'old_rows'))};
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""")
+        # One trigger per event: PostgreSQL only allows transition tables on single-event triggers
+        for event, referencing in (("INSERT", "NEW TABLE AS new_rows"),
+                                   ("DELETE", "OLD TABLE AS old_rows"),
+                                   ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows")):
+            name = f"{table}_stats_{event.lower()}"
+            statements.append(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+            statements.append(
+                f"CREATE TRIGGER {name} AFTER {event} ON {table} REFERENCING {referencing}"
+                f" FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+            )
+    return tuple(statements)
+
+
+def discount_statement(table, source):
+    """PostgreSQL: subtract every row of `source` from `table`'s counters.
+
+    For removals that fire no DELETE trigger, such as dropping a partition.
+    """
+    return _pg_apply(_deltas(table, "r", -1, source))
+
+
+def sqlite_statements():
+    """Counter table and row-level triggers."""
+    statements = [_CREATE_TABLE]
+
+    def apply(table, row, sign):
+        # WHERE is required so SQLite parses ON CONFLICT as an upsert clause
+        return (f"INSERT INTO stats_counters (tenant_id, metric, value)"
+                f" SELECT tenant_id, metric, delta FROM ({_deltas(table, row, sign)})"
+                f" WHERE metric IS NOT NULL" + _UPSERT + ";")
+
+    for table, columns in COUNTER_COLUMNS.items():
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_stats_insert AFTER INSERT ON {table} BEGIN "
+            f"{apply(table, 'new', 1)} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_stats_delete AFTER DELETE ON {table} BEGIN "
+            f"{apply(table, 'old', -1)} END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_stats_update AFTER UPDATE OF {', '.join(columns)} ON {table} BEGIN "
+            f"{apply(table, 'old', -1)} {apply(table, 'new', 1)} END",
+        ]
+    return tuple(statements)
+
+
+def postgres_total_statements():
+    """stats_totals and the row trigger rolling stats_counters changes up into it."""
+    return (
+        _CREATE_TOTALS,
+        f"""CREATE OR REPLACE FUNCTION stats_roll_up() RETURNS trigger AS $$
+DECLARE
+    previous BIGINT := 0;
+    target INTEGER := pg_backend_pid() % {TOTAL_SHARDS};
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        previous := OLD.value;
+    END IF;
+    IF NEW.value <> previous THEN
+        INSERT INTO stats_totals (shard, metric, value) VALUES (target, NEW.metric, NEW.value - previous)
+        {_TOTALS_UPSERT};
+    END IF;
+    IF NEW.metric = 'logs' AND NEW.tenant_id <> '' AND (previous > 0) <> (NEW.value > 0) THEN
+        INSERT INTO stats_totals (shard, metric, value)
+        VALUES (target, 'active_tenants', CASE WHEN NEW.value > 0 THEN 1 ELSE -1 END)
+        {_TOTALS_UPSERT};
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql""",
+        "DROP TRIGGER IF EXISTS stats_counters_roll_up ON stats_counters",
+        "CREATE TRIGGER stats_counters_roll_up AFTER INSERT OR UPDATE OF value ON stats_counters"
+        " FOR EACH ROW EXECUTE FUNCTION stats_roll_up()",
+    ) + _BACKFILL_TOTALS
+
+
+def sqlite_total_statements():
+    """stats_totals and the row triggers rolling stats_counters changes up into it."""
+    def roll_up(previous):
+        return (
+            "INSERT INTO stats_totals (shard, metric, value)"
+            f" SELECT 0, new.metric, new.value - {previous} WHERE new.value <> {previous}{_TOTALS_UPSERT};"
+            " INSERT INTO stats_totals (shard, metric, value)"
+            " SELECT 0, 'active_tenants', CASE WHEN new.value > 0 THEN 1 ELSE -1 END"
+            f" WHERE new.metric = 'logs' AND new.tenant_id <> '' AND ({previous} > 0) <> (new.value > 0)"
+            f"{_TOTALS_UPSERT};"
+        )
+
+    return (
+        _CREATE_TOTALS,
+        f"CREATE TRIGGER IF NOT EXISTS stats_counters_roll_up_insert AFTER INSERT ON stats_counters BEGIN "
+        f"{roll_up('0')} END",
+        f"CREATE TRIGGER IF NOT EXISTS stats_counters_roll_up_update AFTER UPDATE OF value ON stats_counters BEGIN "
+        f"{roll_up('old.value')} END",
+    ) + _BACKFILL_TOTALS
+
+
+def reconcile_counters(conn, backend):
+    """Recount every metric from the base tables and fix drifted counters and totals.
+
+    The recount reads one consistent snapshot (REPEATABLE READ on PostgreSQL,
+    a WAL read transaction on SQLite) and takes no locks, so the triggers
+    keep running while the base tables are scanned. Counters and base rows
+    change together in the writers' transactions, so the drift measured in
+    the snapshot is still the drift afterwards. It is applied as increments
+    in a second, short transaction. Returns the number of corrected rows.
+    """
+    cur = conn.cursor()
+    try:
+        if backend == "postgres":
+            cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        else:
+            cur.execute("BEGIN")
+        deltas, actual = _counter_drift(cur)
+        totals = _total_drift(cur, actual)
+        conn.commit()
+        if deltas or totals:
+            if backend != "postgres":
+                cur.execute("BEGIN IMMEDIATE")
+            _apply_drift(cur, backend, deltas, totals)
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(deltas) + len(totals)
+
+
+def _counter_drift(cur):
+    """({(tenant_id, metric): expected - stored}, stored counters) within the current transaction."""
+    expected = {}
+    for table, metrics in COUNTER_METRICS.items():
+        for expr in metrics:
+            cur.execute(
+                f"SELECT COALESCE(tenant_id, ''), {expr.format(row=table)}, COUNT(*) FROM {table} GROUP BY 1, 2"
+            )
+            for tenant_id, metric, count in cur.fetchall():
+                if metric is not None:
+                    expected[(tenant_id, metric)] = count
+
+    cur.execute("SELECT tenant_id, metric, value FROM stats_counters")
+    actual = {(t, m): v for t, m, v in cur.fetchall()}
+    deltas = {key: expected.get(key, 0) - actual.get(key, 0) for key in actual.keys() | expected.keys()}
+    return {key: delta for key, delta in deltas.items() if delta}, actual
+
+
+def _total_drift(cur, counters):
+    """{metric: delta} bringing stats_totals in line with the stored counters.
+
+    Counter corrections reach the totals through the roll-up triggers, so only
+    a mismatch between the two tables themselves is corrected here.
+    """
+    want = {}
+    for (tenant_id, metric), value in counters.items():
+        want[metric] = want.get(metric, 0) + value
+        if metric == "logs" and tenant_id and value > 0:
+            want["active_tenants"] = want.get("active_tenants", 0) + 1
+    cur.execute("SELECT metric, SUM(value) FROM stats_totals GROUP BY metric")
+    have = dict(cur.fetchall())
+    deltas = {metric: want.get(metric, 0) - have.get(metric, 0) for metric in want.keys() | have.keys()}
+    return {metric: delta for metric, delta in deltas.items() if delta}
+
+
+def _apply_drift(cur, backend, deltas, totals=None):
+    placeholder = "%s" if backend == "postgres" else "?"
+    for (tenant_id, metric), delta in deltas.items():
+        cur.execute(
+            "INSERT INTO stats_counters (tenant_id, metric, value)"
+            f" VALUES ({placeholder}, {placeholder}, {placeholder})" + _UPSERT,
+            (tenant_id, metric, delta),
+        )
+    for metric, delta in (totals or {}).items():
+        cur.execute(
+            f"INSERT INTO stats_totals (shard, metric, value) VALUES (0, {placeholder}, {placeholder})"
+            + _TOTALS_UPSERT,
+            (metric, delta),
+        )
+
+
+def correct_drift(cur, backend):
+    """Bring stats_counters in line with the base tables inside the caller's transaction."""
+    deltas, _ = _counter_drift(cur)
+    _apply_drift(cur, backend, deltas)
+    return len(deltas)
+
+
+def read_tenant_counters(conn, tenant_id):
+    """{metric: value} for one tenant."""
+    cur = conn.cursor()
+    cur.execute("SELECT metric, value FROM stats_counters WHERE tenant_id = ?", (tenant_id,))
+    return dict(cur.fetchall())
+
+
+def read_global_counters(conn):
+    """Return ({metric: total over tenants}, number of tenants with logs)."""
+    cur = conn.cursor()
+    cur.execute("SELECT metric, SUM(value) FROM stats_totals GROUP BY metric")
+    counters = {metric: int(value) for metric, value in cur.fetchall()}
+    return counters, counters.pop("active_tenants", 0)
@@ -0,0 +1,181 @@
+"""
+Anthra Center — Write-behind group commit for single-row writes (NIST AU-12)
+
+POST /api/logs, /api/alerts and /api/vendors each insert one row and
+commit, so every request pays its own transaction and fsync. With
+WRITE_BEHIND_ENABLED, those rows go into an in-process buffer instead, and
+one flusher task writes whatever has accumulated in a single transaction,
+every WRITE_BEHIND_FLUSH_MS milliseconds or as soon as
+WRITE_BEHIND_BATCH_SIZE rows are waiting. Concurrent requests therefore
+share commits.
+
+Callers choose durability per request: by default the request waits until
+its batch has committed (still one fsync for the whole batch); with
+?durable=false it returns 202 once the row is buffered. A buffer already
+holding `max_pending` rows makes every caller wait, which pushes back on
+producers instead of growing without bound. Rows a crash catches in the
+buffer are lost, so the non-durable mode suits high-volume telemetry, not
+audit records that must survive the request.
+
+Batches are written with ingest.insert_chunk, so a batch the database
+rejects is retried row by row and one bad row fails only its own request.
+Each table's `after` hook runs on the DB thread once its rows have
+committed, which is where correlation, live publishing and cache
+invalidation happen. This holds even when a connection error cuts the
+retry short: the rows committed before it still get their hooks, and only
+the rest fail. stop() drains the buffer before shutdown.
+
+With write-behind disabled, submit() writes the single row immediately
+through the same path, so hooks run identically in both modes.
+"""
+
+import asyncio
+
+from ingest import ChunkInterrupted, insert_chunk, insert_rows
+
+
+class RowRejected(Exception):
+    """The database refused this row (constraint or data error); the rest of its batch committed."""
+
+
+class WriteBehind:
+    """Buffer single-row inserts and commit them in batches."""
+
+    def __init__(self, run_db, connect, enabled=False, batch_size=500, flush_ms=5.0, max_pending=None):
+        self._run_db = run_db
+        self._connect = connect
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.max_pending = max_pending or batch_size * 20
+        self._tables = {}       # table -> (columns, after hook)
+        self._pending = []      # (table, row, future or None)
+        self._wakeup = None
+        self._task = None
+        self._closing = False
+        self._flushes = self._rows = self._failed = self._lost = 0
+
+    def table(self, table, columns, after=None):
+        """Register an insert target; after(conn, rows) runs on the DB thread after commit."""
+        self._tables[table] = (tuple(columns), after)
+
+    def start(self):
+        if self.enabled:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._flusher())
+
+    async def submit(self, table, row, wait=True):
+        """Write one row. Returns once committed, or once buffered when wait=False.
+
+        The result says whether the row is committed. That can be True even with
+        wait=False, when a full buffer made the caller wait anyway.
+        """
+        if self._task is None or self._closing:
+            await self._flush([(table, tuple(row), None)], raise_errors=True)
+            return True
+        future = None
+        if wait or len(self._pending) >= self.max_pending:
+            future = asyncio.get_running_loop().create_future()
+        self._pending.append((table, tuple(row), future))
+        if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        if future is None:
+            return False
+        await future
+        return True
+
+    async def stop(self):
+        """Flush everything still buffered and stop the flusher."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    async def _flusher(self):
+        while self._pending or not self._closing:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if len(self._pending) < self.batch_size and not self._closing:
+                # Give concurrent requests the flush interval to join this batch
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            await self._flush(batch)
+
+    async def _flush(self, batch, raise_errors=False):
+        try:
+            errors = await self._run_db(self._write, batch)
+        except Exception as exc:
+            errors = [exc] * len(batch)
+        self._flushes += 1
+        for (table, _, future), error in zip(batch, errors):
+            if error is None:
+                self._rows += 1
+                if future is not None and not future.done():
+                    future.set_result(None)
+                continue
+            self._failed += 1
+            if raise_errors:
+                raise error
+            if future is not None:
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                self._lost += 1
+                print(f"ERROR: write-behind insert into {table} failed: {error!r}")
+
+    def _insert(self, conn, entries):
+        """insert_chunk writer for (table, row) entries, one statement per table."""
+        by_table = {}
+        for table, row in entries:
+            by_table.setdefault(table, []).append(row)
+        for table, rows in by_table.items():
+            insert_rows(conn, table, self._tables[table][0], rows)
+
+    def _write(self, batch):
+        """DB thread: commit a batch in one transaction; returns an error (or None) per row."""
+        chunk = [(i, (table, row)) for i, (table, row, _) in enumerate(batch)]
+        errors = [None] * len(batch)
+        with self._connect() as conn:
+            try:
+                _, rejected = insert_chunk(conn, chunk, insert=self._insert)
+            except ChunkInterrupted as exc:
+                # Rows after the last commit fail with the interrupting error; earlier ones stand
+                rejected = exc.errors
+                committed = set(exc.committed)
+                errors = [None if i in committed else exc.__cause__ for i in range(len(batch))]
+            for i, message in rejected:
+                errors[i] = RowRejected(message)
+            by_table = {}
+            for (table, row, _), error in zip(batch, errors):
+                if error is None:
+                    by_table.setdefault(table, []).append(row)
+            for table, rows in by_table.items():
+                after = self._tables[table][1]
+                if after is not None:
+                    try:
+                        after(conn, rows)
+                    except Exception as exc:
+                        # The rows are committed; a failed hook must not fail their requests
+                        print(f"WARN: write-behind hook for {table} failed: {exc!r}")
+        return errors
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "batch_size": self.batch_size,
+            "flush_ms": self.flush_interval * 1000,
+            "flushes": self._flushes,
+            "rows_written": self._rows,
+            "rows_failed": self._failed,
+            "rows_lost": self._lost,
+        }
@@ -1,5 +1,6 @@
 -- Anthra Center database schema
 -- Multi-tenant security monitoring and log aggregation
+-- Indexes and later schema changes are applied by api/migrations.py at API startup
 
 CREATE TABLE IF NOT EXISTS logs (
     id SERIAL PRIMARY KEY,
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark /api/findings serialization on a 10k-row page.
+
+Compares the old path (SELECT *, dicts built by position, FastAPI's
+jsonable_encoder + json.dumps) with the current one (explicit projection,
+records from cursor.description, FastJSONResponse). Uses an in-memory SQLite
+table, so no running API or database is needed.
+
+Usage:
+    python scripts/bench_findings_serialization.py [--rows 10000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from records import FINDING_COLUMNS, FastJSONResponse, fetch_records, orjson, select_list  # noqa: E402
+
+
+def build_db(rows):
+    conn = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+    conn.execute("""
+        CREATE TABLE findings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tenant_id TEXT, source TEXT, finding_type TEXT, severity TEXT,
+            title TEXT, description TEXT, asset_type TEXT, asset_id TEXT,
+            namespace TEXT, cve_id TEXT, mitre_tactic TEXT, mitre_technique TEXT,
+            remediation TEXT, nist_control TEXT, rank TEXT,
+            status TEXT DEFAULT 'open',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fingerprint TEXT, last_seen TIMESTAMP, occurrence_count INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+    start = datetime(2026, 1, 1)
+    severities = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+    conn.executemany(
+        "INSERT INTO findings (tenant_id, source, finding_type, severity, title, description, asset_type,"
+        " asset_id, namespace, cve_id, mitre_tactic, mitre_technique, remediation, nist_control, rank,"
+        " status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [("tenant-1", "trivy", "VULNERABILITY", severities[i % 4], f"CVE-2024-{i:05d}: library flaw",
+          "Buffer overflow in a parsing routine reachable from untrusted input. CVSS 7.5.", "package",
+          f"lib{i % 97}:1.{i % 13}.0", "default", f"CVE-2024-{i:05d}", None, None,
+          "Upgrade to the fixed release", "SI-2", "D", "open", start + timedelta(seconds=i))
+         for i in range(rows)],
+    )
+    return conn
+
+
+def old_path(conn):
+    cur = conn.execute("SELECT * FROM findings WHERE tenant_id = ?", ("tenant-1",))
+    rows = cur.fetchall()
+    payload = {"findings": [{"id": r[0], "tenant_id": r[1], "source": r[2], "finding_type": r[3],
+                             "severity": r[4], "title": r[5], "description": r[6], "asset_type": r[7],
+                             "asset_id": r[8], "namespace": r[9], "cve_id": r[10], "mitre_tactic": r[11],
+                             "mitre_technique": r[12], "remediation": r[13], "nist_control": r[14],
+                             "rank": r[15], "status": r[16], "created_at": r[17], "last_seen": r[19],
+                             "occurrence_count": r[20]} for r in rows],
+               "count": len(rows), "next_cursor": None}
+    # What FastAPI does with a returned dict: jsonable_encoder, then JSONResponse.render
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def new_path(conn):
+    cur = conn.execute(f"SELECT {select_list(FINDING_COLUMNS)} FROM findings WHERE tenant_id = ?", ("tenant-1",))
+    rows = fetch_records(cur)
+    return FastJSONResponse({"findings": rows, "count": len(rows), "next_cursor": None}).body
+
+
+def timeit(fn, conn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn(conn)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), min(samples), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = build_db(args.rows)
+    if json.loads(old_path(conn)) != json.loads(new_path(conn)):
+        sys.exit("old and new paths produced different documents")
+
+    print(f"{args.rows} findings, {args.repeat} runs each, encoder: {'orjson' if orjson else 'stdlib json'}")
+    old_ms, old_min, size = timeit(old_path, conn, args.repeat)
+    new_ms, new_min, _ = timeit(new_path, conn, args.repeat)
+    print(f"  old  SELECT * + positional dicts + jsonable_encoder: median {old_ms:8.1f} ms  (min {old_min:.1f})")
+    print(f"  new  projection + records + FastJSONResponse:        median {new_ms:8.1f} ms  (min {new_min:.1f})")
+    print(f"  speedup {old_ms / new_ms:.1f}x, body {size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
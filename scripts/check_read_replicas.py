@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Check read-replica routing against two local SQLite stand-ins.
+
+The primary and a replica are SQLite files in a temporary directory. The
+replica is a snapshot of the primary plus a few rows that only it holds,
+so every response shows which database served it. A second replica DSN
+points at a file that does not exist and stands in for a replica that is
+down. Through the API, the script checks that:
+
+- reads go to the healthy replica, and the dead one's breaker opens
+- a tenant's reads stay on the primary for the read-your-writes window
+  after it writes, and other tenants keep reading the replica
+- global /api/stats always comes from the primary
+- with every replica's breaker open, reads fall back to the primary
+
+No PostgreSQL is needed. Exits non-zero if any check fails.
+
+Usage:
+    python scripts/check_read_replicas.py [--window 1.0]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api")
+TENANT, OTHER = "replica-check", "replica-check-other"
+REPLICA_ONLY = 5
+
+
+def configure(workdir, window):
+    """Point the API at the stand-ins; must run before main is imported."""
+    os.environ.pop("DB_PASSWORD", None)
+    os.environ["SQLITE_PATH"] = os.path.join(workdir, "primary.db")
+    os.environ["DB_REPLICA_DSNS"] = ",".join(
+        f"sqlite:///{os.path.join(workdir, name)}" for name in ("replica.db", "down.db"))
+    os.environ["DB_READ_YOUR_WRITES_SECONDS"] = str(window)
+    os.environ["DB_BREAKER_BACKOFF_INITIAL"] = "300"   # keep the dead replica's breaker open
+    os.environ["CACHE_BACKEND"] = "none"
+    os.environ["WRITE_BEHIND_ENABLED"] = "false"
+
+
+def snapshot_replica(workdir):
+    """Copy the primary into replica.db and add rows only the replica has."""
+    primary = sqlite3.connect(os.path.join(workdir, "primary.db"))
+    replica = sqlite3.connect(os.path.join(workdir, "replica.db"))
+    try:
+        primary.backup(replica)
+        replica.executemany(
+            "INSERT INTO logs (tenant_id, level, message, source) VALUES (?, 'INFO', 'replica only', 'check')",
+            [(tenant,) for tenant in (TENANT, OTHER) for _ in range(REPLICA_ONLY)],
+        )
+        replica.commit()
+    finally:
+        replica.close()
+        primary.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--window", type=float, default=1.0, help="read-your-writes seconds")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="anthra-replicas-")
+    configure(workdir, args.window)
+    sys.path.insert(0, API_DIR)
+    import main as api  # noqa: E402  (reads its configuration at import)
+    from fastapi.testclient import TestClient  # noqa: E402
+
+    api.sqlite_conns.initialize()
+    snapshot_replica(workdir)
+    healthy, down = api.db_replicas.replicas
+    failures = []
+
+    def check(label, ok, detail=""):
+        print(f"{'PASS' if ok else 'FAIL'}  {label}{f'  ({detail})' if detail and not ok else ''}")
+        if not ok:
+            failures.append(label)
+
+    def served_by(client, tenant_id):
+        messages = {log["message"] for log in client.get("/api/logs", params={"tenant_id": tenant_id}).json()["logs"]}
+        return "replica" if "replica only" in messages else "primary"
+
+    def total_logs(client):
+        return client.get("/api/stats").json()["total_logs"]
+
+    with TestClient(api.app) as client:
+        with api.get_db() as conn:
+            primary_logs = conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+
+        sources = {served_by(client, TENANT) for _ in range(2 * api.DB_BREAKER_THRESHOLD + 2)}
+        check("reads are served by the healthy replica", sources == {"replica"}, sources)
+        check("the missing replica's breaker opens", down.breaker.state == "open", down.breaker.state)
+        check("global stats come from the primary", total_logs(client) == primary_logs,
+              f"{total_logs(client)} != {primary_logs}")
+
+        client.post("/api/logs", json={"tenant_id": TENANT, "level": "INFO", "message": "fresh", "source": "check"})
+        check("the writer's reads are pinned to the primary", served_by(client, TENANT) == "primary")
+        check("other tenants keep reading the replica", served_by(client, OTHER) == "replica")
+        check("global stats see the write at once", total_logs(client) == primary_logs + 1)
+        time.sleep(args.window + 0.2)
+        check("the pin ends with the window", served_by(client, TENANT) == "replica")
+
+        healthy.breaker.trip(RuntimeError("replica stand-in taken down"))
+        check("reads fall back to the primary with every replica down",
+              {served_by(client, TENANT), served_by(client, OTHER)} == {"primary"})
+
+        stats = client.get("/api/metrics").json()["db_replicas"]
+        print({key: value for key, value in stats.items() if key != "replicas"})
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(f"{len(failures)} check(s) failed" if failures else "all checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
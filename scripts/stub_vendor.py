@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Stub vendor API for exercising the connector poller locally.
+
+Serves GET /findings per the contract in api/connectors.py: findings newer
+than ?since= (oldest first), ?limit= per page, with next_cursor paging and a
+watermark. Items use the vendor's native field names, so the poller's
+mapping is exercised too. New findings are generated every --every seconds.
+
+Usage:
+    python scripts/stub_vendor.py --vendor trivy --port 9001 [--count 25] [--every 10]
+
+Then point a connected vendor at it and enable polling:
+    UPDATE vendors SET api_endpoint = 'http://127.0.0.1:9001', status = 'connected' WHERE id = 2;
+    VENDOR_POLL_ENABLED=true VENDOR_POLL_INTERVAL=5 uvicorn main:app
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SEVERITIES = ("CRITICAL", "HIGH", "MEDIUM", "LOW")
+
+
+def make_item(vendor, n, stamp):
+    severity = random.choice(SEVERITIES)
+    if vendor == "falcon":
+        return {"detection_id": f"ldt:{n}", "max_severity_displayname": severity.title(),
+                "display_name": f"Suspicious process {n}", "device": {"hostname": f"node-{n % 5}"},
+                "tactic": "Execution", "technique_id": "T1059", "updated_timestamp": stamp}
+    if vendor == "trivy":
+        return {"VulnerabilityID": f"CVE-2025-{n:05d}", "Severity": severity, "PkgName": f"lib{n % 7}",
+                "Title": f"CVE-2025-{n:05d}: flaw in lib{n % 7}", "Description": "Stub vulnerability.",
+                "LastModifiedDate": stamp}
+    if vendor == "semgrep":
+        return {"check_id": f"python.lang.security.rule-{n}", "path": f"app/module_{n % 9}.py",
+                "extra": {"severity": random.choice(("ERROR", "WARNING", "INFO")), "message": "Stub match."},
+                "updated_at": stamp}
+    return {"title": f"{vendor} finding {n}", "severity": severity, "asset_id": f"asset-{n % 5}",
+            "updated_at": stamp}
+
+
+class Store:
+    def __init__(self, vendor):
+        self.vendor = vendor
+        self.items = []     # (stamp, item), oldest first
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def add(self, count):
+        with self.lock:
+            base = datetime.now(timezone.utc)
+            for i in range(count):
+                stamp = (base + timedelta(microseconds=i)).isoformat()
+                self.items.append((stamp, make_item(self.vendor, len(self.items), stamp)))
+
+    def page(self, since, cursor, limit):
+        with self.lock:
+            self.requests += 1
+            newer = [(s, item) for s, item in self.items if not since or s > since]
+        start = int(cursor or 0)
+        page = newer[start:start + limit]
+        more = start + limit < len(newer)
+        return {"findings": [item for _, item in page],
+                "next_cursor": str(start + limit) if more else None,
+                "watermark": page[-1][0] if page and not more else None}
+
+
+def handler_for(store, token):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, as real vendor APIs
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != "/findings":
+                return self._send(404, {"error": "not found"})
+            if token and self.headers.get("Authorization") != f"Bearer {token}":
+                return self._send(401, {"error": "unauthorized"})
+            query = parse_qs(url.query)
+            self._send(200, store.page(query.get("since", [None])[0], query.get("cursor", [None])[0],
+                                       int(query.get("limit", ["500"])[0])))
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def serve(vendor, port, count=25, every=0.0, token=None):
+    """Start a stub in a background thread; returns (server, store)."""
+    store = Store(vendor)
+    store.add(count)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler_for(store, token))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    if every > 0:
+        def grow():
+            while True:
+                time.sleep(every)
+                store.add(random.randint(1, 3))
+        threading.Thread(target=grow, daemon=True).start()
+    return server, store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vendor", default="trivy")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--count", type=int, default=25, help="findings available at start")
+    parser.add_argument("--every", type=float, default=10.0, help="seconds between new findings (0: never)")
+    parser.add_argument("--token", help="require this Bearer token")
+    args = parser.parse_args()
+
+    server, _ = serve(args.vendor, args.port, args.count, args.every, args.token)
+    print(f"stub {args.vendor} API on http://127.0.0.1:{args.port}/findings")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""LiveHub fan-out: Last-Event-ID replay and buffer eviction (api/live.py)."""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from live import LiveHub  # noqa: E402
+
+
+async def read_events(hub, sub, count):
+    """Collect `count` (id, event type) pairs from the subscription's SSE body."""
+    events = []
+    body = hub.stream(sub, heartbeat=0.05)
+    try:
+        async for frame in body:
+            if frame.startswith("id: "):
+                lines = frame.splitlines()
+                events.append((lines[0][len("id: "):], lines[1][len("event: "):]))
+                if len(events) == count:
+                    break
+    finally:
+        await body.aclose()
+    return events
+
+
+class ReplayTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.hub = LiveHub(buffer_events=1000, queue_size=256)
+        self.hub.bind(asyncio.get_running_loop())
+
+    async def test_client_further_behind_than_its_queue_catches_up(self):
+        self.hub.publish("tenant-1", "log", [{"n": 0}])
+        last_seen = self.hub.event_id(1)
+        self.hub.publish("tenant-1", "log", [{"n": n} for n in range(1, 601)])
+
+        sub = self.hub.subscribe("tenant-1", last_event_id=last_seen)
+        events = await read_events(self.hub, sub, 600)
+
+        self.assertEqual([event_id for event_id, _ in events], [self.hub.event_id(n) for n in range(2, 602)])
+        self.assertNotIn("reset", {event_type for _, event_type in events})
+
+    async def test_live_events_follow_the_replay(self):
+        self.hub.publish("tenant-1", "log", [{"n": n} for n in range(300)])
+        sub = self.hub.subscribe("tenant-1", last_event_id=self.hub.event_id(0))
+        self.hub.publish("tenant-1", "alert", [{"n": 300}])
+
+        events = await read_events(self.hub, sub, 301)
+
+        self.assertEqual(events[-1], (self.hub.event_id(301), "alert"))
+        self.assertEqual(len({event_id for event_id, _ in events}), 301)
+
+    async def test_id_older_than_the_buffer_gets_a_reset(self):
+        hub = LiveHub(buffer_events=10, queue_size=5)
+        hub.bind(asyncio.get_running_loop())
+        hub.publish("tenant-1", "log", [{"n": n} for n in range(20)])
+
+        sub = hub.subscribe("tenant-1", last_event_id=hub.event_id(3))
+
+        self.assertEqual([event_type for _, event_type in await read_events(hub, sub, 1)], ["reset"])
+
+
+class EvictionTest(unittest.IsolatedAsyncioTestCase):
+    async def test_dropped_subscriber_does_not_keep_its_tenant_subscribed(self):
+        hub = LiveHub(buffer_events=10, queue_size=1, max_tenants=1)
+        hub.bind(asyncio.get_running_loop())
+        hub.subscribe("slow")
+        hub.publish("slow", "log", [{"n": 0}, {"n": 1}])   # overflows the queue: dropped
+
+        hub.publish("busy", "log", [{"n": 0}])
+
+        self.assertNotIn("slow", hub._subscribers)
+        self.assertEqual(list(hub._channels), ["busy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+"""PrecompressedJSON content negotiation and revalidation (api/precompressed.py)."""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api"))
+
+from starlette.requests import Request  # noqa: E402
+
+from precompressed import PrecompressedJSON  # noqa: E402
+
+
+def get(document, **headers):
+    scope = {"type": "http", "method": "GET", "path": "/",
+             "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]}
+    return document.response(Request(scope))
+
+
+class RevalidationTest(unittest.TestCase):
+    def setUp(self):
+        self.document = PrecompressedJSON({"controls": ["AC-2", "AU-11"]})
+
+    def test_matching_etag_of_the_negotiated_variant_is_not_modified(self):
+        etag = self.document.variants["gzip"][1]
+        response = get(self.document, accept_encoding="gzip", if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["etag"], etag)
+
+    def test_etag_of_another_encoding_gets_the_full_body(self):
+        gzip_etag = self.document.variants["gzip"][1]
+        response = get(self.document, accept_encoding="identity", if_none_match=gzip_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["etag"], self.document.variants["identity"][1])
+        self.assertNotIn("content-encoding", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
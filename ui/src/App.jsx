@@ -71,11 +71,28 @@ export default function App() {
 
   useEffect(() => { fetchAll(); }, [fetchAll]);
 
+  // Live tail: new logs and alerts arrive over SSE instead of re-polling
+  useEffect(() => {
+    const source = new EventSource(`${API}/live?tenant_id=${tenantId}&types=log,alert`);
+    source.addEventListener("log", (e) => setLogs((prev) => [JSON.parse(e.data), ...prev].slice(0, 100)));
+    source.addEventListener("alert", (e) =>
+      setAlerts((prev) => [{ id: `live-${e.lastEventId}`, ...JSON.parse(e.data) }, ...prev]));
+    source.addEventListener("reset", () => fetchAll());
+    return () => source.close();
+  }, [tenantId, fetchAll]);
+
   async function runScan(vendorId) {
     setScanResult(null);
     const res = await fetch(`${API}/vendors/${vendorId}/scan`, { method: "POST" });
-    const data = await res.json();
-    setScanResult(data);
+    if (!res.ok) return;
+    const { status_url } = await res.json();
+    // Scans run as background jobs; poll until this one finishes
+    let job;
+    do {
+      await new Promise((r) => setTimeout(r, 1000));
+      job = await (await fetch(status_url)).json();
+    } while (job.status === "queued" || job.status === "running");
+    if (job.status === "succeeded") setScanResult(job.result);
     fetchAll();
   }
 